@@ -0,0 +1,390 @@
+"""Processamento em lote sem interface gráfica.
+
+Aplica uma sequência de operações a um diretório (ou glob) de imagens
+usando os modelos do PDI Studio em um pool de processos, sem importar
+tkinter nem criar objetos ``ImageTk.PhotoImage``.
+
+Exemplo:
+    python batch.py scans/ saida/ --ops gray,equalize,otsu,canny:100:200
+
+Com ``--recipe`` a sequência vem de uma receita exportada pela interface
+(Arquivo → Exportar receita..., ver models/recipe.py):
+    python batch.py scans/ saida/ --recipe limiarizacao.json --workers 8
+
+Com ``--tiled`` cada imagem é processada em blocos a partir de um arquivo
+mapeado em memória (ver models/tiled.py), para imagens maiores que a RAM:
+    python batch.py scans/ saida/ --ops equalize,sobel --tiled --ext .npy
+
+Com ``--low-memory`` o Sobel roda em float32 com buffers reaproveitados
+(ver models/edge_model.py), inclusive nos blocos do ``--tiled``.
+
+Cada imagem concluída é registrada no manifesto da pasta de saída
+(``MANIFEST_NAME``, uma linha JSON por imagem, gravada assim que ela
+termina). Rodar o mesmo comando de novo retoma um lote interrompido: são
+puladas as entradas cujo conteúdo (hash) e receita já constam do
+manifesto e cuja saída existe. ``--force`` reprocessa tudo.
+
+A saída tem o nome da entrada com a extensão de ``--ext``; uma entrada com
+outra extensão a mantém no nome (a.jpg → saida/a.jpg.png), de modo que
+a.jpg e a.png não se sobrescrevem. Cada linha ``[ok]`` mostra a vazão
+acumulada (imagens/s) desde o início do lote.
+"""
+import argparse
+import functools
+import glob
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import cv2
+
+from models.model import Toolkit
+from models.operations import COMMANDS
+from models.recipe import load_recipe, recipe_key
+from models.tiled import MAPPED_EXTENSIONS, TileProcessor, open_source, save_image
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp", ".tif", ".tiff")
+MANIFEST_NAME = ".pdi-manifest.jsonl"
+HASH_CHUNK = 1024 * 1024
+
+
+def parse_operations(spec):
+    """Converte "gray,equalize,canny:100:200" em [(operação, parâmetros), ...] do registro.
+
+    Os nomes são os comandos de models.operations; os argumentos
+    posicionais de "nome:a:b" preenchem, em ordem, os parâmetros livres do
+    comando e os omitidos ficam com o padrão do registro.
+    """
+    operations = []
+    for item in spec.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        name, *raw_args = item.split(":")
+        if name not in COMMANDS:
+            raise ValueError(f"Operação desconhecida: {name}")
+        command = COMMANDS[name]
+        free = [param.name for param in command.params]
+        if len(raw_args) > len(free):
+            raise ValueError(f"Argumentos demais para '{name}': {item}")
+        operations.append((command.operation, command.resolve(dict(zip(free, raw_args)))))
+    return operations
+
+
+def collect_inputs(source, extensions=IMAGE_EXTENSIONS):
+    """Lista as imagens de um diretório ou de um padrão glob"""
+    if os.path.isdir(source):
+        paths = [os.path.join(source, name) for name in os.listdir(source)]
+    else:
+        paths = glob.glob(source, recursive=True)
+    return sorted(p for p in paths if p.lower().endswith(extensions) and os.path.isfile(p))
+
+
+def file_hash(path):
+    """Hash do conteúdo do arquivo (lido em blocos)"""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def output_path(path, output_dir, extension):
+    """Saída de ``path`` em ``output_dir``: o nome da entrada com ``extension``.
+
+    Se a extensão da entrada é outra, ela fica no nome (a.jpg → a.jpg.png),
+    para que a.jpg e a.png não gravem o mesmo arquivo.
+    """
+    name = os.path.basename(path)
+    stem, source_extension = os.path.splitext(name)
+    return os.path.join(output_dir, (stem if source_extension == extension else name) + extension)
+
+
+class Manifest:
+    """Checkpoint do lote: entrada → (tamanho, mtime, hash do conteúdo, receita, saída).
+
+    Cada imagem concluída vira uma linha JSON no fim do arquivo, gravada
+    na hora; uma linha incompleta (lote interrompido no meio da escrita) é
+    ignorada na leitura. Para a mesma entrada vale a última linha.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.entries = {}
+        # Linha incompleta no fim: a próxima gravação começa em uma linha nova
+        self._partial = False
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                for line in f:
+                    self._partial = not line.endswith("\n")
+                    try:
+                        entry = json.loads(line)
+                        self.entries[entry['input']] = entry
+                    except (ValueError, KeyError, TypeError):
+                        continue
+        self._file = None
+
+    def done(self, path, key, out_path):
+        """(já feita?, hash conhecido): feita se tamanho e mtime batem e a saída existe;
+        com o arquivo alterado, o hash conhecido deixa o processo conferir o conteúdo"""
+        entry = self.entries.get(os.path.abspath(path))
+        if entry is None or entry.get('recipe') != key or entry.get('output') != os.path.abspath(out_path):
+            return False, None
+        if not os.path.exists(out_path):
+            return False, None
+        stat = os.stat(path)
+        return (entry.get('size') == stat.st_size and entry.get('mtime_ns') == stat.st_mtime_ns), entry.get('hash')
+
+    def record(self, path, digest, key, out_path):
+        stat = os.stat(path)
+        entry = {'input': os.path.abspath(path), 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns,
+                 'hash': digest, 'recipe': key, 'output': os.path.abspath(out_path)}
+        self.entries[entry['input']] = entry
+        if self._file is None:
+            self._file = open(self.path, 'a', encoding='utf-8')
+            if self._partial:
+                self._file.write("\n")
+                self._partial = False
+        self._file.write(json.dumps(entry) + "\n")
+        self._file.flush()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+# ========== Execução nos processos de trabalho ==========
+_models = None
+_tiler = None
+
+
+def _init_worker(tile_size=None, low_memory=False, l1_magnitude=False):
+    global _models, _tiler
+    # Evita que cada processo dispare seu próprio pool de threads do OpenCV
+    cv2.setNumThreads(1)
+    _models = Toolkit(low_memory=low_memory, l1_magnitude=l1_magnitude)
+    _tiler = TileProcessor(tile_size, low_memory, l1_magnitude) if tile_size else None
+
+
+def apply_operations(models, image, operations):
+    """Aplica as operações em sequência, encadeando sobre o resultado anterior.
+
+    Resultados em cinza saem com três canais, como as imagens gravadas pelo Model.
+    """
+    for name, params in operations:
+        image = models.run_operation(name, image, **params)
+    return models.derived.bgr(image)
+
+
+def replay_file(path, operations, out_path, known_hash=None):
+    """Confere o hash da entrada e processa; retorna (entrada, saída, erro, hash, pulada?).
+
+    Se o conteúdo ainda é o de ``known_hash`` (arquivo só tocado) e a saída
+    existe, a imagem não é reprocessada.
+    """
+    try:
+        digest = file_hash(path)
+    except OSError as exc:
+        return path, None, str(exc), None, False
+    if digest == known_hash and os.path.exists(out_path):
+        return path, out_path, None, digest, True
+    process = process_file_tiled if _tiler is not None else process_file
+    path, out_path, error = process(path, operations, out_path)
+    return path, out_path, error, digest, False
+
+
+def _write_output(out_path, write):
+    """Grava com ``write(temporário)`` e renomeia para ``out_path``; retorna o erro ou None.
+
+    O temporário é único por tarefa (``tempfile.mkstemp`` na pasta de saída,
+    com a extensão da saída para o codificador): uma saída interrompida
+    nunca parece pronta e tarefas paralelas nunca disputam o mesmo arquivo.
+    """
+    folder, name = os.path.split(out_path)
+    root, extension = os.path.splitext(name)
+    try:
+        handle, partial = tempfile.mkstemp(suffix=extension, prefix=f".{root}.parcial-", dir=folder or None)
+        os.close(handle)
+    except OSError as exc:
+        return str(exc)
+    try:
+        if not write(partial):
+            return "falha ao gravar a imagem"
+        os.replace(partial, out_path)
+    except (cv2.error, OSError) as exc:
+        return str(exc).strip()
+    finally:
+        if os.path.exists(partial):
+            try:
+                os.remove(partial)
+            except OSError:
+                pass
+    return None
+
+
+def process_file(path, operations, out_path):
+    """Processa uma imagem e grava o resultado em ``out_path``; retorna (entrada, saída, erro)"""
+    if _tiler is not None:
+        return process_file_tiled(path, operations, out_path)
+    image = cv2.imread(path)
+    if image is None:
+        return path, None, "falha ao ler a imagem"
+    try:
+        result = apply_operations(_models, image, operations)
+    except (cv2.error, ValueError) as exc:
+        return path, None, str(exc).strip()
+    error = _write_output(out_path, lambda partial: cv2.imwrite(partial, result))
+    return (path, None, error) if error else (path, out_path, None)
+
+
+def process_file_tiled(path, operations, out_path):
+    """Como ``process_file``, mas em blocos sobre arquivos mapeados (memória limitada ao bloco)"""
+    stem = os.path.splitext(os.path.basename(path))[0]
+    workdir = image = None
+    try:
+        workdir = tempfile.mkdtemp(prefix=f".{stem}-", dir=os.path.dirname(out_path) or None)
+        image = open_source(path, workdir)
+        if image is None:
+            return path, None, "falha ao ler a imagem"
+        for i, (name, params) in enumerate(operations):
+            image = _tiler.run(name, image, os.path.join(workdir, f"etapa{i}.npy"), **params)
+        error = _write_output(out_path, functools.partial(save_image, image))
+    except (cv2.error, ValueError, OSError) as exc:
+        return path, None, str(exc).strip()
+    finally:
+        # Solta os mapeamentos antes de apagar os intermediários
+        image = None
+        if workdir is not None:
+            shutil.rmtree(workdir, ignore_errors=True)
+    return (path, None, error) if error else (path, out_path, None)
+
+
+def run_batch(paths, operations, output_dir, workers=None, max_in_flight=None, extension=".png", log=print,
+              tile_size=None, resume=True, low_memory=False, l1_magnitude=False):
+    """Executa o lote com no máximo ``max_in_flight`` imagens pendentes por vez.
+
+    Com ``tile_size`` cada imagem é processada em blocos desse tamanho (ver models.tiled).
+    Com ``resume`` as imagens já registradas no manifesto com a mesma receita (e os
+    mesmos modos de execução: blocos, Sobel de pouca memória) são puladas.
+    ``low_memory`` e ``l1_magnitude`` ligam o Sobel de pouca memória (ver EdgeModel).
+    Retorna (processadas, puladas, falhas, segundos).
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+    max_in_flight = max_in_flight or workers * 2
+    # O modo do Sobel e os blocos mudam o resultado (o Canny pode diferir nas costuras):
+    # saídas de outro modo ou tamanho de bloco não contam como prontas
+    options = {'low_memory': low_memory, 'l1_magnitude': l1_magnitude} if low_memory or l1_magnitude else {}
+    if tile_size:
+        options['tile_size'] = tile_size
+    key = recipe_key(operations, options)
+    manifest = Manifest(os.path.join(output_dir, MANIFEST_NAME))
+
+    processed = skipped = failed = 0
+    start = time.perf_counter()
+    pending = set()
+    inputs = iter(paths)
+    # Saída → entrada que a grava: duas entradas nunca escrevem o mesmo arquivo
+    claimed = {}
+
+    def rate():
+        return processed / max(time.perf_counter() - start, 1e-9)
+
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(tile_size, low_memory, l1_magnitude)) as executor:
+            while True:
+                # Mantém a fila limitada para não carregar todas as imagens de uma vez
+                while len(pending) < max_in_flight:
+                    path = next(inputs, None)
+                    if path is None:
+                        break
+                    out_path = output_path(path, output_dir, extension)
+                    owner = claimed.setdefault(out_path, os.path.abspath(path))
+                    if owner != os.path.abspath(path):
+                        failed += 1
+                        log(f"[erro] {path}: a saída {out_path} já é de {owner}")
+                        continue
+                    finished, known_hash = manifest.done(path, key, out_path) if resume else (False, None)
+                    if finished:
+                        # Mesmo arquivo (tamanho e mtime) e mesma receita: nem é lido de novo
+                        skipped += 1
+                        log(f"[pulado] {path}")
+                        continue
+                    pending.add(executor.submit(replay_file, path, operations, out_path, known_hash))
+                if not pending:
+                    break
+
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    path, out_path, error, digest, was_skipped = future.result()
+                    if error:
+                        failed += 1
+                        log(f"[erro] {path}: {error}")
+                        continue
+                    manifest.record(path, digest, key, out_path)
+                    if was_skipped:
+                        skipped += 1
+                        log(f"[pulado] {path} (conteúdo igual)")
+                    else:
+                        processed += 1
+                        log(f"[ok] {path} -> {out_path} ({rate():.2f} imagens/s)")
+    finally:
+        manifest.close()
+
+    return processed, skipped, failed, time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Processamento de imagens em lote (sem interface gráfica)")
+    parser.add_argument("input", help="Diretório ou padrão glob das imagens de entrada")
+    parser.add_argument("output", help="Diretório de saída")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--ops",
+                        help="Operações em ordem, ex.: gray,equalize,otsu,canny:100:200 "
+                             f"(disponíveis: {', '.join(COMMANDS)})")
+    source.add_argument("--recipe", help="Receita JSON/YAML exportada pela interface")
+    parser.add_argument("--workers", type=int, default=None, help="Número de processos (padrão: núcleos da CPU)")
+    parser.add_argument("--max-in-flight", type=int, default=None,
+                        help="Máximo de imagens pendentes ao mesmo tempo (padrão: 2x workers)")
+    parser.add_argument("--ext", default=".png", help="Extensão dos arquivos de saída (padrão: .png)")
+    parser.add_argument("--quiet", action="store_true", help="Mostra apenas o resumo final")
+    parser.add_argument("--tiled", action="store_true",
+                        help="Processa em blocos a partir de arquivos mapeados (imagens maiores que a RAM)")
+    parser.add_argument("--tile-size", type=int, default=1024, help="Lado dos blocos em pixels (padrão: 1024)")
+    parser.add_argument("--force", action="store_true",
+                        help="Reprocessa mesmo as imagens já registradas no manifesto da saída")
+    parser.add_argument("--low-memory", action="store_true",
+                        help="Sobel em float32 com buffers reaproveitados (menos memória por imagem)")
+    parser.add_argument("--l1-magnitude", action="store_true",
+                        help="Magnitude do Sobel aproximada por |dx|+|dy| (com --low-memory: int16)")
+    args = parser.parse_args(argv)
+
+    try:
+        operations = load_recipe(args.recipe) if args.recipe else parse_operations(args.ops)
+    except (OSError, ValueError) as exc:
+        parser.error(str(exc))
+    paths = collect_inputs(args.input, IMAGE_EXTENSIONS + MAPPED_EXTENSIONS if args.tiled else IMAGE_EXTENSIONS)
+    if not paths:
+        parser.error(f"Nenhuma imagem encontrada em: {args.input}")
+
+    extension = args.ext if args.ext.startswith(".") else "." + args.ext
+    log = (lambda text: None) if args.quiet else print
+    processed, skipped, failed, elapsed = run_batch(paths, operations, args.output, args.workers,
+                                                    args.max_in_flight, extension, log,
+                                                    args.tile_size if args.tiled else None, not args.force,
+                                                    args.low_memory, args.l1_magnitude)
+    rate = processed / elapsed if elapsed > 0 else 0.0
+    print(f"{processed} imagens processadas, {skipped} já prontas, {failed} falhas em {elapsed:.2f}s "
+          f"({rate:.2f} imagens/s)")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
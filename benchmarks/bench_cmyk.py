@@ -0,0 +1,101 @@
+"""Conversão CMYK: ida e volta em todas as cores e vazão em MP/s.
+
+A precisão é medida sobre as 2^24 cores BGR (uma imagem 4096x4096 com
+cada cor uma vez): BGR → CMYK → BGR deve devolver a cor original, tanto
+no caminho uint8 quanto no float32. A vazão compara as duas variantes de
+ColorModel (com e sem ``out=``) com a implementação anterior, que também
+trocava a ordem dos canais (tratava B como R). Termina com código 1 se a
+ida e volta errar mais que ``--tolerance`` níveis.
+
+Uso:
+    python -m benchmarks.bench_cmyk --megapixels 24
+"""
+import argparse
+import sys
+import tracemalloc
+
+import numpy as np
+
+from benchmarks.common import format_ms, measure, synthetic_image
+from models.color_model import ColorModel
+
+
+def legacy_rgb_to_cmyk(image):
+    """Implementação anterior de ColorModel.rgb_to_cmyk"""
+    rgb = image.astype(np.float32) / 255.0
+    k = 1 - np.max(rgb, axis=2)
+    c = (1 - rgb[:, :, 0] - k) / (1 - k + 1e-8)
+    m = (1 - rgb[:, :, 1] - k) / (1 - k + 1e-8)
+    y = (1 - rgb[:, :, 2] - k) / (1 - k + 1e-8)
+    cmyk = np.stack([c, m, y, k], axis=2)
+    return np.clip(cmyk * 255, 0, 255).astype(np.uint8)
+
+
+def all_colors():
+    """Imagem 4096x4096 BGR com cada uma das 2^24 cores"""
+    values = np.arange(2 ** 24, dtype=np.uint32)
+    planes = [(values >> shift & 255).astype(np.uint8) for shift in (0, 8, 16)]
+    return np.dstack(planes).reshape(4096, 4096, 3)
+
+
+def peak_allocation(func):
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+
+def round_trip(model, tolerance):
+    colors = all_colors()
+    print(f"{'ida e volta (2^24 cores)':<28}{'erro máx.':>10}{'erro médio':>12}")
+    failures = 0
+    for dtype in (np.uint8, np.float32):
+        back = model.cmyk_to_rgb(model.rgb_to_cmyk(colors, dtype=dtype))
+        error = np.abs(back.astype(np.int16) - colors)
+        failures += int(error.max()) > tolerance
+        print(f"{np.dtype(dtype).name:<28}{int(error.max()):10d}{error.mean():12.4f}")
+    return failures
+
+
+def throughput(model, megapixels, repeat):
+    image = synthetic_image(megapixels)
+    cmyk = model.rgb_to_cmyk(image)
+    cmyk_float = model.rgb_to_cmyk(image, dtype=np.float32)
+    out_cmyk = np.empty_like(cmyk)
+    out_float = np.empty_like(cmyk_float)
+    out_bgr = np.empty_like(image)
+    variants = [
+        ("BGR → CMYK antiga", lambda: legacy_rgb_to_cmyk(image)),
+        ("BGR → CMYK uint8", lambda: model.rgb_to_cmyk(image)),
+        ("BGR → CMYK uint8, out=", lambda: model.rgb_to_cmyk(image, out=out_cmyk)),
+        ("BGR → CMYK float32", lambda: model.rgb_to_cmyk(image, dtype=np.float32)),
+        ("BGR → CMYK float32, out=", lambda: model.rgb_to_cmyk(image, out=out_float, dtype=np.float32)),
+        ("CMYK uint8 → BGR", lambda: model.cmyk_to_rgb(cmyk)),
+        ("CMYK uint8 → BGR, out=", lambda: model.cmyk_to_rgb(cmyk, out=out_bgr)),
+        ("CMYK float32 → BGR", lambda: model.cmyk_to_rgb(cmyk_float)),
+    ]
+    print(f"\nImagem {image.shape[1]}x{image.shape[0]} ({image.nbytes / 2 ** 20:.0f} MB)\n")
+    print(f"{'variante':<28}{'tempo':>12}{'MP/s':>9}{'alocado':>12}")
+    for label, func in variants:
+        elapsed = measure(func, repeat)
+        allocated = peak_allocation(func) / 2 ** 20
+        print(f"{label:<28}{format_ms(elapsed):>12}{megapixels / elapsed:9.0f}{allocated:9.0f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--megapixels", type=float, default=24)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--tolerance", type=int, default=0,
+                        help="Maior erro aceito na ida e volta, em níveis de 0..255")
+    args = parser.parse_args()
+    model = ColorModel()
+    failures = round_trip(model, args.tolerance)
+    throughput(model, args.megapixels, args.repeat)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
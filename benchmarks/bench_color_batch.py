@@ -0,0 +1,95 @@
+"""Conversão de cor em lote: laço imagem a imagem x convert_batch x iter_convert.
+
+Converte uma pilha de quadros (N x H x W x 3, já na memória) para
+gray/HSV/LAB e mede quadros/s e o pico de memória alocada pela conversão
+(tracemalloc). O modo gerador com ``reuse_buffers`` deve manter a memória
+constante qualquer que seja o número de quadros. Termina com código 1 se
+algum resultado diferir do cv2.cvtColor direto.
+
+Uso:
+    python -m benchmarks.bench_color_batch --frames 200 --megapixels 1 --workers 4
+"""
+import argparse
+import sys
+import time
+import tracemalloc
+
+import cv2
+import numpy as np
+
+from benchmarks.common import synthetic_image
+from models.color_model import BATCH_CONVERSIONS, ColorModel
+from models.parallel import StripExecutor
+
+CONVERSIONS = ['gray', 'hsv', 'lab']
+
+
+def frame_stack(base, count):
+    """Pilha de quadros: a imagem base deslocada a cada quadro"""
+    stack = np.empty((count,) + base.shape, base.dtype)
+    for i in range(count):
+        stack[i] = np.roll(base, i, axis=1)
+    return stack
+
+
+def timed(func):
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def run(frame_count, megapixels, workers):
+    model = ColorModel(executor=StripExecutor(workers))
+    base = synthetic_image(megapixels)
+    stack = frame_stack(base, frame_count)
+    print(f"{frame_count} quadros {base.shape[1]}x{base.shape[0]}, {model.executor.workers} workers\n")
+    print(f"{'conversão':<10}{'variante':<28}{'quadros/s':>11}{'pico alocado':>15}")
+
+    failures = 0
+    for conversion in CONVERSIONS:
+        code = BATCH_CONVERSIONS[conversion][0]
+
+        def loop():
+            return [cv2.cvtColor(frame, code) for frame in stack]
+
+        def batch():
+            return model.convert_batch(stack, conversion)
+
+        def stream():
+            # Só um checksum por quadro: nada da sequência fica guardado
+            return [int(frame[::97, ::89].sum()) for frame in
+                    model.iter_convert(iter(stack), conversion, reuse_buffers=True)]
+
+        reference, loop_time, loop_peak = timed(loop)
+        results, batch_time, batch_peak = timed(batch)
+        sums, stream_time, stream_peak = timed(stream)
+        same = all(np.array_equal(a, b) for a, b in zip(results, reference))
+        same &= sums == [int(frame[::97, ::89].sum()) for frame in reference]
+        failures += not same
+        for label, elapsed, peak in (("laço, sem pool", loop_time, loop_peak),
+                                     ("convert_batch", batch_time, batch_peak),
+                                     ("iter_convert, reuse_buffers", stream_time, stream_peak)):
+            print(f"{conversion:<10}{label:<28}{frame_count / elapsed:11.1f}{peak / 2 ** 20:12.0f} MB"
+                  + ("" if same else "  !"))
+    model.executor.shutdown()
+    if failures:
+        print("\n! resultado diferente de cv2.cvtColor")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--frames", type=int, default=200)
+    parser.add_argument("--megapixels", type=float, default=1)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+    sys.exit(1 if run(args.frames, args.megapixels, args.workers) else 0)
+
+
+if __name__ == "__main__":
+    main()
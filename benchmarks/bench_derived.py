@@ -0,0 +1,74 @@
+"""Cache de representações derivadas: conversões para cinza e memória dos resultados em cinza.
+
+Roda uma sequência de limiarizações e detecções de borda sobre a mesma
+imagem com e sem models.derived_images.DerivedImages, e compara o tamanho
+dos resultados de limiarização com um canal (como ficam no Model) e
+expandidos para BGR. Confere que os resultados são idênticos; termina com
+código 1 se algum divergir.
+
+Uso:
+    python -m benchmarks.bench_derived --megapixels 24
+"""
+import argparse
+import sys
+
+import numpy as np
+
+from benchmarks.common import format_ms, measure, synthetic_image
+from models.derived_images import DerivedImages
+from models.edge_model import EdgeModel
+from models.threshold_model import ThresholdModel
+
+OPERATIONS = [
+    ("otsu", lambda edge, threshold, img: threshold.otsu_threshold(img)),
+    ("multi_otsu(4)", lambda edge, threshold, img: threshold.multi_otsu_threshold(img, 4)),
+    ("adaptive_mean(11)", lambda edge, threshold, img: threshold.adaptive_threshold_mean(img)),
+    ("sobel(3)", lambda edge, threshold, img: edge.detect_sobel_edges(img, ksize=3)),
+    ("canny", lambda edge, threshold, img: edge.detect_canny_edges(img)),
+]
+
+
+def run_all(edge, threshold, image):
+    return [func(edge, threshold, image) for _, func in OPERATIONS]
+
+
+def run(megapixels, repeat):
+    image = synthetic_image(megapixels)
+    print(f"Imagem {image.shape[1]}x{image.shape[0]}; operações: {', '.join(name for name, _ in OPERATIONS)}\n")
+
+    reference = run_all(EdgeModel(), ThresholdModel(), image)
+    plain = measure(lambda: run_all(EdgeModel(), ThresholdModel(), image), repeat)
+
+    def cached():
+        # Cache novo a cada rodada: mede a conversão feita uma vez, não um cache já quente
+        derived = DerivedImages()
+        return run_all(EdgeModel(derived=derived), ThresholdModel(derived=derived, expand_gray=False), image)
+    results = cached()
+    shared = measure(cached, repeat)
+
+    failures = 0
+    for (label, _), expected, result in zip(OPERATIONS, reference, results):
+        expanded = DerivedImages().bgr(result) if expected.ndim == 3 else result
+        if not np.array_equal(expanded, expected):
+            failures += 1
+            print(f"! {label}: resultado diferente")
+
+    print(f"{'':<28}{'tempo':>12}")
+    print(f"{'convertendo a cada operação':<28}{format_ms(plain):>12}")
+    print(f"{'cinza compartilhado':<28}{format_ms(shared):>12}  ({plain / shared:.2f}x)\n")
+    mask = results[0]
+    print(f"Máscara de Otsu: {mask.nbytes / 2 ** 20:.1f} MB com um canal, "
+          f"{reference[0].nbytes / 2 ** 20:.1f} MB em BGR")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--megapixels", type=float, default=24)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    sys.exit(1 if run(args.megapixels, args.repeat) else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Latência por operação: caminho de exibição antigo x novo.
+
+Antigo: cada operação do Model criava um ``PhotoImage`` em resolução cheia
+(descartado pelo controller) e o controller convertia o array de novo no
+tamanho do painel. Novo: a operação devolve só o ``ndarray`` e o
+``ImageRenderer`` cria o ``PhotoImage`` uma única vez, no tamanho do painel,
+reduzindo direto o buffer BGR (em LANCZOS quando ocioso, com o filtro
+barato enquanto o usuário interage).
+
+Uso:
+    python -m benchmarks.bench_display --megapixels 12 40
+"""
+import argparse
+
+import cv2
+from PIL import Image
+
+from benchmarks.common import format_ms, measure, synthetic_image
+from models.model import Model
+from views.image_renderer import ImageRenderer
+
+PANEL_SIZE = (640, 720)
+
+OPERATIONS = [
+    ("convert_to_hsv", {}),
+    ("convert_to_gray", {}),
+    ("equalize_histogram", {}),
+    ("adjust_brightness", {"brightness": 20}),
+    ("apply_binary_threshold", {"threshold_value": 128}),
+    ("apply_otsu_threshold", {}),
+    ("apply_adaptive_threshold", {"method": "gaussian"}),
+    ("apply_canny", {}),
+]
+
+
+def _legacy_to_tk(cv_image, to_photo, max_width=None, max_height=None):
+    """Reprodução do antigo ``Model.to_tk_image``"""
+    if len(cv_image.shape) == 3:
+        rgb = cv2.cvtColor(cv_image, cv2.COLOR_BGR2RGB)
+    else:
+        rgb = cv_image
+    img = Image.fromarray(rgb)
+    if max_width and max_height:
+        img.thumbnail((max_width, max_height), Image.Resampling.LANCZOS)
+    return to_photo(img)
+
+
+def _photo_factory():
+    """Retorna a função que cria PhotoImage, ou identidade quando não há display"""
+    try:
+        import tkinter as tk
+        from PIL import ImageTk
+
+        root = tk.Tk()
+        root.withdraw()
+        return ImageTk.PhotoImage, True
+    except Exception:
+        return (lambda img: img), False
+
+
+def run(megapixels_list, repeat):
+    to_photo, has_tk = _photo_factory()
+    renderer = ImageRenderer()
+    renderer.to_photo = to_photo
+    if not has_tk:
+        print("Sem display: PhotoImage não é criado; os tempos cobrem conversão + redimensionamento.\n")
+
+    model = Model()
+    for megapixels in megapixels_list:
+        image = synthetic_image(megapixels)
+        print(f"== {megapixels} MP ({image.shape[1]}x{image.shape[0]}) ==")
+        print(f"{'operação':<28}{'antes':>12}{'depois':>12}{'ganho':>9}{'interativo':>12}{'ganho':>9}")
+        for name, kwargs in OPERATIONS:
+            operation = getattr(model, name)
+
+            def legacy():
+                model.original = image
+                model.processed = image
+                operation(**kwargs)
+                _legacy_to_tk(model.processed, to_photo)
+                _legacy_to_tk(model.processed, to_photo, *PANEL_SIZE)
+
+            def current(interactive=False):
+                model.original = image
+                model.processed = image
+                operation(**kwargs)
+                renderer.render(model.processed, *PANEL_SIZE, interactive=interactive)
+
+            before = measure(legacy, repeat)
+            after = measure(current, repeat)
+            interactive = measure(lambda: current(interactive=True), repeat)
+            print(f"{name:<28}{format_ms(before):>12}{format_ms(after):>12}{before / after:8.2f}x"
+                  f"{format_ms(interactive):>12}{before / interactive:8.2f}x")
+        print()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--megapixels", type=float, nargs="+", default=[12, 40])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    run(args.megapixels, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
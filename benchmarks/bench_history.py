@@ -0,0 +1,82 @@
+"""Desfazer/refazer em imagem grande: latência com os orçamentos padrão do Model.
+
+Carrega uma imagem sintética de ``--megapixels`` em um Model com os
+orçamentos padrão (cache do pipeline, histórico e imagens presas), com o
+painel definido, e aplica uma sequência de operações em resolução cheia
+(cada prévia é aplicada logo em seguida, como ao salvar ou ampliar). Mede
+cada desfazer até a imagem carregada e cada refazer até o fim, e confere
+que cada estado restaurado é idêntico ao obtido ao aplicar. Termina com
+código 1 se algum passo passar de ``--budget-ms`` ou divergir.
+
+Uso:
+    python -m benchmarks.bench_history --megapixels 50 --budget-ms 100
+"""
+import argparse
+import sys
+import time
+
+from benchmarks.common import format_ms, synthetic_image
+from models.model import Model
+from models.pipeline import image_key
+
+OPERATIONS = [
+    ("adjust_brightness_contrast", {"brightness": 20, "contrast": 1.3}),
+    ("equalize_histogram", {}),
+    ("apply_sobel", {}),
+    ("convert_to_lab", {}),
+    ("apply_canny", {}),
+]
+VIEWPORT = (1280, 720)
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def run(megapixels, budget_ms):
+    model = Model()
+    model.load_image("sintética", synthetic_image(megapixels))
+    model.set_viewport(*VIEWPORT)
+    keys = [image_key(model.processed)]
+    print(f"Imagem {model.original.shape[1]}x{model.original.shape[0]}, "
+          f"{len(OPERATIONS)} operações aplicadas em resolução cheia\n")
+    print(f"{'passo':<12}{'operação':<32}{'tempo':>12}")
+    for name, params in OPERATIONS:
+        _, seconds = timed(lambda: (model.apply(name, **params), model.commit()))
+        keys.append(image_key(model.processed))
+        print(f"{'aplicar':<12}{name:<32}{format_ms(seconds):>12}")
+
+    failures = []
+
+    def step(kind, action, expected):
+        label, seconds = timed(action)
+        print(f"{kind:<12}{label:<32}{format_ms(seconds):>12}")
+        if seconds * 1000 > budget_ms:
+            failures.append(f"{kind} {label}: {seconds * 1000:.0f} ms > {budget_ms:.0f} ms")
+        if image_key(model.processed) != keys[expected]:
+            failures.append(f"{kind} {label}: imagem diferente da obtida ao aplicar")
+
+    for index in range(len(OPERATIONS) - 1, -1, -1):
+        step("desfazer", model.undo, index)
+    for index in range(1, len(OPERATIONS) + 1):
+        step("refazer", model.redo, index)
+
+    print(f"\ncache do pipeline {model.pipeline.cache.nbytes / 2**20:.0f} MB, "
+          f"imagens mantidas só pelo histórico {model.history.pinned_bytes / 2**20:.0f} MB")
+    for failure in failures:
+        print(f"! {failure}")
+    return len(failures)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--megapixels", type=float, default=50)
+    parser.add_argument("--budget-ms", type=float, default=100)
+    args = parser.parse_args()
+    sys.exit(1 if run(args.megapixels, args.budget_ms) else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Abertura de imagens: imread bloqueante x prévia reduzida + decodificação em segundo plano + pré-carregamento.
+
+Grava uma pasta temporária com ``--files`` JPEGs sintéticos e mede:
+quanto tempo a interface ficava travada no ``cv2.imread`` completo, quanto
+leva a prévia reduzida do ImageLoader (o que a interface espera agora) e
+quanto leva abrir a próxima imagem da pasta depois que o pré-carregamento
+dos vizinhos terminou. Confere que as imagens entregues pelo loader são
+idênticas às do ``cv2.imread``; termina com código 1 se não.
+
+Uso:
+    python -m benchmarks.bench_loading --megapixels 24 --files 4
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import cv2
+import numpy as np
+
+from benchmarks.common import format_ms, measure, synthetic_image
+from models.image_loader import ImageLoader, adjacent_image
+
+PANEL_SIZE = (780, 760)
+
+
+def write_folder(folder, megapixels, count, noise):
+    base = synthetic_image(megapixels, noise=noise)
+    paths = []
+    for i in range(count):
+        path = os.path.join(folder, f"foto_{i:03d}.jpg")
+        cv2.imwrite(path, np.roll(base, i * 101, axis=1), [cv2.IMWRITE_JPEG_QUALITY, 92])
+        paths.append(path)
+    return paths
+
+
+def run(megapixels, count, noise, repeat):
+    loader = ImageLoader()
+    failures = 0
+    with tempfile.TemporaryDirectory() as folder:
+        paths = write_folder(folder, megapixels, count, noise)
+        first = paths[0]
+        full = cv2.imread(first)
+        print(f"{count} JPEGs {full.shape[1]}x{full.shape[0]}, painel {PANEL_SIZE[0]}x{PANEL_SIZE[1]}\n")
+        print(f"{'':<36}{'interface parada':>18}")
+
+        blocking = measure(lambda: cv2.imread(first), repeat)
+        print(f"{'cv2.imread completo':<36}{format_ms(blocking):>18}")
+        preview = measure(lambda: loader.preview(first, *PANEL_SIZE), repeat)
+        reduced = loader.preview(first, *PANEL_SIZE)
+        size = f"{reduced.shape[1]}x{reduced.shape[0]}" if reduced is not None else "sem prévia"
+        print(f"{'prévia reduzida (' + size + ')':<36}{format_ms(preview):>18}  ({blocking / preview:.1f}x)")
+
+        # Abre a primeira, espera os vizinhos e abre a próxima
+        start = time.perf_counter()
+        image = loader.load(first).result()
+        loaded = time.perf_counter() - start
+        failures += not np.array_equal(image, full)
+        print(f"{'decodificação em segundo plano':<36}{format_ms(loaded):>18}  (fora da thread do Tk)")
+
+        for future in loader.prefetch(loader.neighbors(first)):
+            future.result()
+        following = adjacent_image(first, 1)
+        start = time.perf_counter()
+        image = loader.load(following).result()
+        instant = time.perf_counter() - start
+        failures += not np.array_equal(image, cv2.imread(following))
+        print(f"{'próxima imagem, pré-carregada':<36}{format_ms(instant):>18}")
+    loader.shutdown()
+    if failures:
+        print("\n! imagem do loader diferente do cv2.imread")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--megapixels", type=float, default=24)
+    parser.add_argument("--files", type=int, default=4)
+    parser.add_argument("--noise", type=int, default=4,
+                        help="Ruído sintético; ruído alto pesa na decodificação entrópica, que a prévia não reduz")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    sys.exit(1 if run(args.megapixels, args.files, args.noise, args.repeat) else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""Multi-Otsu: programação dinâmica x busca exaustiva dos limiares.
+
+Para cada número de classes, calcula os limiares de
+ThresholdModel.multi_otsu_thresholds e, até ``--max-brute`` classes, os de
+uma busca exaustiva (vetorizada com NumPy) sobre todas as combinações de
+limiares. Confere que a variância entre classes das duas soluções é a
+mesma e mostra os tempos. Termina com código 1 se alguma divergir.
+
+Uso:
+    python -m benchmarks.bench_multi_otsu --megapixels 12 --classes 2 3 4 5 8
+"""
+import argparse
+import itertools
+import sys
+
+import cv2
+import numpy as np
+
+from benchmarks.common import format_ms, measure, synthetic_image
+from models.threshold_model import ThresholdModel
+
+
+def between_class_variance(hist, thresholds):
+    """Variância entre classes dos limiares (valor igual ao limiar fica na classe de baixo)"""
+    p = np.asarray(hist, dtype=np.float64) / np.sum(hist)
+    levels = np.arange(len(p))
+    mean = np.dot(levels, p)
+    bounds = [-1] + list(thresholds) + [len(p) - 1]
+    variance = 0.0
+    for start, end in zip(bounds[:-1], bounds[1:]):
+        weight = p[start + 1:end + 1].sum()
+        if weight > 0:
+            class_mean = np.dot(levels[start + 1:end + 1], p[start + 1:end + 1]) / weight
+            variance += weight * (class_mean - mean) ** 2
+    return variance
+
+
+def brute_force(hist, num_classes):
+    """Testa todas as combinações de limiares crescentes, em lotes vetorizados"""
+    p = np.asarray(hist, dtype=np.float64) / np.sum(hist)
+    weight = np.concatenate(([0.0], np.cumsum(p)))
+    moment = np.concatenate(([0.0], np.cumsum(p * np.arange(len(p)))))
+    best_value, best = -np.inf, None
+    combos = itertools.combinations(range(len(p) - 1), num_classes - 1)
+    while True:
+        batch = np.array(list(itertools.islice(combos, 1 << 18)), dtype=np.int64)
+        if len(batch) == 0:
+            return best
+        bounds = np.hstack([np.zeros((len(batch), 1), np.int64), batch + 1,
+                            np.full((len(batch), 1), len(p), np.int64)])
+        w = weight[bounds[:, 1:]] - weight[bounds[:, :-1]]
+        s = moment[bounds[:, 1:]] - moment[bounds[:, :-1]]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            values = np.where(w > 0, s * s / w, 0.0).sum(axis=1)
+        i = int(np.argmax(values))
+        if values[i] > best_value:
+            best_value, best = values[i], batch[i].tolist()
+
+
+def run(megapixels, class_counts, max_brute, repeat):
+    model = ThresholdModel()
+    image = synthetic_image(megapixels)
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    hist = cv2.calcHist([gray], [0], None, [256], [0, 256]).ravel()
+    print(f"Imagem {image.shape[1]}x{image.shape[0]}\n")
+    print(f"{'classes':>8}{'limiares (PD)':>32}{'PD':>12}{'exaustiva':>13}{'segmentação':>14}")
+
+    failures = 0
+    for num_classes in class_counts:
+        thresholds = model.multi_otsu_thresholds(hist, num_classes)
+        dp_time = measure(lambda: model.multi_otsu_thresholds(hist, num_classes), repeat)
+        segment_time = measure(lambda: model.multi_otsu_threshold(image, num_classes), repeat)
+        brute_cell = f"{'-':>13}"
+        mark = " "
+        if num_classes <= max_brute:
+            reference = brute_force(hist, num_classes)
+            brute_time = measure(lambda: brute_force(hist, num_classes), 1, warmup=0)
+            same = np.isclose(between_class_variance(hist, thresholds),
+                              between_class_variance(hist, reference), rtol=1e-9)
+            failures += not same
+            mark = " " if same else "!"
+            brute_cell = f"{format_ms(brute_time):>13}"
+        label = ",".join(str(t) for t in thresholds)
+        print(f"{num_classes:8d}{label:>32}{format_ms(dp_time):>12}{brute_cell}{format_ms(segment_time):>14}{mark}")
+    if failures:
+        print("\n! variância entre classes diferente da busca exaustiva")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--megapixels", type=float, default=12)
+    parser.add_argument("--classes", type=int, nargs="+", default=[2, 3, 4, 5, 8])
+    parser.add_argument("--max-brute", type=int, default=4,
+                        help="Maior número de classes conferido por busca exaustiva (cresce como 256^(K-1))")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    sys.exit(1 if run(args.megapixels, args.classes, args.max_brute, args.repeat) else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Sobreposição de bordas: implementação antiga x mistura só nos pixels de borda.
+
+Compara tempo e memória alocada (pico do tracemalloc, que acompanha os
+arrays do NumPy e do OpenCV) de EdgeModel.overlay_edges_on_image com a
+implementação anterior, para bordas finas (Canny) e densas (Sobel), com
+máscara, com coordenadas esparsas e gravando em um buffer reaproveitado.
+Termina com código 1 se algum resultado diferir do antigo.
+
+Uso:
+    python -m benchmarks.bench_overlay --megapixels 24
+"""
+import argparse
+import sys
+import tracemalloc
+
+import cv2
+import numpy as np
+
+from benchmarks.common import format_ms, measure, synthetic_image
+from models.edge_model import EdgeModel
+
+
+def legacy_overlay(image_bgr, edges_uint8, color=(0, 0, 255), alpha=0.8):
+    """Implementação anterior de EdgeModel.overlay_edges_on_image"""
+    mask = edges_uint8 > 0
+    overlay = image_bgr.copy()
+    colored = np.zeros_like(image_bgr)
+    colored[:, :] = color
+    overlay[mask] = colored[mask]
+    return cv2.addWeighted(image_bgr, alpha, overlay, 1 - alpha, 0)
+
+
+def peak_allocation(func):
+    """Pico de memória alocada durante ``func()`` (bytes)"""
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+
+def run(megapixels, repeat):
+    model = EdgeModel()
+    image = synthetic_image(megapixels)
+    out = np.empty_like(image)
+    print(f"Imagem {image.shape[1]}x{image.shape[0]} ({image.nbytes / 2 ** 20:.0f} MB)\n")
+    print(f"{'bordas':<8}{'variante':<24}{'tempo':>12}{'alocado':>12}")
+
+    failures = 0
+    for label, edges in (("canny", model.detect_canny_edges(image)), ("sobel", model.detect_sobel_edges(image))):
+        reference = legacy_overlay(image, edges)
+        coordinates = model.edge_coordinates(edges)
+        variants = [
+            ("antiga", lambda: legacy_overlay(image, edges)),
+            ("máscara", lambda: model.overlay_edges_on_image(image, edges)),
+            ("máscara, out=", lambda: model.overlay_edges_on_image(image, edges, out=out)),
+            ("coordenadas", lambda: model.overlay_edges_on_image(image, coordinates)),
+            ("coordenadas, out=", lambda: model.overlay_edges_on_image(image, coordinates, out=out)),
+        ]
+        density = cv2.countNonZero(edges) / edges.size
+        print(f"{label:<8}({density:.1%} dos pixels; coordenadas: {coordinates.nbytes / 2 ** 20:.1f} MB)")
+        for name, func in variants:
+            same = np.array_equal(func(), reference)
+            failures += not same
+            elapsed = measure(func, repeat)
+            allocated = peak_allocation(func)
+            print(f"{'':<8}{name:<24}{format_ms(elapsed):>12}{allocated / 2 ** 20:9.1f} MB" + ("" if same else "  DIFERENTE"))
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--megapixels", type=float, default=24)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    sys.exit(1 if run(args.megapixels, args.repeat) else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Execução em faixas paralelas: escalabilidade de 1 a N threads.
+
+Mede Sobel, Laplaciano e as limiarizações adaptativas com
+models.parallel.StripExecutor para cada número de workers, mostra o ganho
+em relação ao caminho serial e confere que o resultado é idêntico bit a
+bit. Termina com código 1 se algum resultado divergir.
+
+Uso:
+    python -m benchmarks.bench_parallel --megapixels 24 --workers 1 2 4 8
+"""
+import argparse
+import os
+import sys
+
+import cv2
+import numpy as np
+
+from benchmarks.common import format_ms, measure, synthetic_image
+from models.edge_model import EdgeModel
+from models.parallel import StripExecutor
+from models.threshold_model import ThresholdModel
+
+OPERATIONS = [
+    ("sobel(3)", lambda edge, threshold, img: edge.detect_sobel_edges(img, ksize=3)),
+    ("sobel(5)", lambda edge, threshold, img: edge.detect_sobel_edges(img, ksize=5)),
+    ("laplacian(3)", lambda edge, threshold, img: edge.detect_laplacian_edges(img, ksize=3)),
+    ("adaptive_mean(51)", lambda edge, threshold, img: threshold.adaptive_threshold_mean(img, block_size=51)),
+    ("adaptive_gaussian(51)", lambda edge, threshold, img: threshold.adaptive_threshold_gaussian(img, block_size=51)),
+]
+
+
+def run(megapixels, worker_counts, repeat):
+    image = synthetic_image(megapixels)
+    print(f"Imagem {image.shape[1]}x{image.shape[0]}, {os.cpu_count()} núcleos, "
+          f"threads do OpenCV: {cv2.getNumThreads()}\n")
+    print(f"{'operação':<24}{'serial':>11}" + "".join(f"{f'{w} thr.':>18}" for w in worker_counts))
+
+    failures = 0
+    for label, func in OPERATIONS:
+        serial_result = func(EdgeModel(), ThresholdModel(), image)
+        serial_time = measure(lambda: func(EdgeModel(), ThresholdModel(), image), repeat)
+        row = f"{label:<24}{format_ms(serial_time):>11}"
+        for workers in worker_counts:
+            executor = StripExecutor(workers)
+            edge, threshold = EdgeModel(executor), ThresholdModel(executor)
+            same = np.array_equal(func(edge, threshold, image), serial_result)
+            failures += not same
+            elapsed = measure(lambda: func(edge, threshold, image), repeat)
+            row += f"{format_ms(elapsed):>11} {serial_time / elapsed:4.1f}x" + (" " if same else "!")
+            executor.shutdown()
+        print(row)
+    if failures:
+        print("\n! resultado diferente do caminho serial")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--megapixels", type=float, default=24)
+    parser.add_argument("--workers", type=int, nargs="+", default=None,
+                        help="Números de threads a medir (padrão: 1, 2, 4... até os núcleos da CPU)")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    workers = args.workers
+    if not workers:
+        cores = os.cpu_count() or 1
+        workers = sorted({min(2 ** i, cores) for i in range(cores.bit_length() + 1)})
+    sys.exit(1 if run(args.megapixels, workers, args.repeat) else 0)
+
+
+if __name__ == "__main__":
+    main()
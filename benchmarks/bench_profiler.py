@@ -0,0 +1,104 @@
+"""Custo da instrumentação (models.profiler): por span e numa sequência de operações do Model.
+
+Mede o custo de um ``with profiler.span(...)`` desligado e ligado contra
+um bloco sem instrumentação, e o tempo de uma sequência de operações do
+Model (cada uma com spans de op, histograma e proxy) com o perfilamento
+desligado e ligado. Exporta o trace da sequência e confere que é um
+Trace Event válido do Chrome com um evento por span; termina com código
+1 se não for.
+
+Uso:
+    python -m benchmarks.bench_profiler --megapixels 12
+"""
+import argparse
+import json
+import sys
+import time
+
+from benchmarks.common import format_ms, measure, synthetic_image
+from models.model import Model
+from models.profiler import Profiler, profiler
+
+SPANS = 200000
+
+
+def per_call(func, count=SPANS):
+    start = time.perf_counter()
+    func(count)
+    return (time.perf_counter() - start) / count
+
+
+def bare(count):
+    for _ in range(count):
+        pass
+
+
+def spanned(instance):
+    def loop(count):
+        for _ in range(count):
+            with instance.span('op', 'vazio'):
+                pass
+    return loop
+
+
+def session(image):
+    model = Model()
+    model.load_image("sintética", image)
+    model.set_viewport(1280, 720)
+    model.adjust_brightness(20)
+    model.apply_otsu_threshold()
+    model.commit()
+    model.apply_canny()
+    model.calculate_histogram()
+    model.undo()
+    model.executor.shutdown()
+
+
+def check_trace(trace, expected):
+    events = [event for event in trace['traceEvents'] if event['ph'] == 'X']
+    return (len(events) == expected
+            and all(event['dur'] >= 0 and event['ts'] >= 0 and event['cat'] and event['name'] for event in events)
+            and json.loads(json.dumps(trace)) == trace)
+
+
+def run(megapixels, repeat):
+    off = Profiler(enabled=False)
+    on = Profiler(enabled=True, capacity=SPANS)
+    base = per_call(bare)
+    print(f"{'span vazio':<28}{'por chamada':>14}")
+    print(f"{'sem instrumentação':<28}{base * 1e9:11.0f} ns")
+    print(f"{'desligado':<28}{per_call(spanned(off)) * 1e9:11.0f} ns")
+    print(f"{'ligado':<28}{per_call(spanned(on)) * 1e9:11.0f} ns\n")
+
+    image = synthetic_image(megapixels)
+    enabled = profiler.enabled
+    profiler.enabled = False
+    disabled_time = measure(lambda: session(image), repeat)
+    profiler.enabled = True
+    enabled_time = measure(lambda: session(image), repeat)
+    profiler.clear()
+    mark = profiler.mark()
+    session(image)
+    count = len(profiler.spans(since=mark))
+    valid = check_trace(profiler.to_chrome_trace(), count)
+    profiler.enabled = enabled
+
+    print(f"Sequência do Model, imagem {image.shape[1]}x{image.shape[0]} ({count} spans)")
+    print(f"{'perfilamento desligado':<28}{format_ms(disabled_time):>14}")
+    print(f"{'perfilamento ligado':<28}{format_ms(enabled_time):>14}  "
+          f"({(enabled_time / disabled_time - 1) * 100:+.1f}%)")
+    if not valid:
+        print("\n! trace do Chrome inválido")
+    return not valid
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--megapixels", type=float, default=12)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    sys.exit(1 if run(args.megapixels, args.repeat) else 0)
+
+
+if __name__ == "__main__":
+    main()
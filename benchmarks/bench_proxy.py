@@ -0,0 +1,125 @@
+"""Prévia na proxy x resolução cheia: tempo e concordância visual.
+
+Para cada operação do registro (com os parâmetros padrão e alguns casos
+a mais) aplica a operação pelo Model com o painel definido, como a
+interface faz, e compara o tempo da prévia com o da resolução cheia e o
+resultado exibido com o resultado cheio reduzido ao mesmo tamanho
+(diferença média absoluta, 0-255). A coluna ``escala`` é a escala em que
+a prévia rodou: a da proxy, ou maior para as operações que nela
+divergiriam (limiarização adaptativa com bloco pequeno). Termina com
+código 1 se alguma operação passar da tolerância.
+
+Uso:
+    python -m benchmarks.bench_proxy --megapixels 24 --viewport 640 720
+"""
+import argparse
+import sys
+
+import numpy as np
+
+from benchmarks.common import format_ms, measure, synthetic_image
+from models.model import Model
+from models.operations import OPERATIONS
+from models.utils import resize_to_shape
+
+POINT_OPS = [('brightness', 20), ('contrast', 1.3), ('equalize',)]
+# Parâmetros das operações que não têm padrão útil
+REQUIRED = {
+    'adjust_brightness': {'brightness': 20},
+    'adjust_contrast': {'contrast': 1.3},
+    'adjust_brightness_contrast': {'brightness': 20, 'contrast': 1.3},
+    'apply_point_ops': {'ops': POINT_OPS},
+}
+EXTRA = [
+    ("apply_adaptive_threshold", {"method": "gaussian"}),
+    ("apply_adaptive_threshold", {"method": "mean", "block_size": 51}),
+    ("apply_adaptive_threshold", {"method": "gaussian", "block_size": 101}),
+    ("apply_sobel", {"ksize": 5}),
+    ("apply_laplacian", {"ksize": 5}),
+    ("apply_canny", {"blur_ksize": 7}),
+]
+OPERATION_CASES = [(name, REQUIRED.get(name, {})) for name in OPERATIONS] + EXTRA
+
+# Diferença média absoluta máxima aceita entre a prévia e a resolução cheia reduzida.
+# Saídas contínuas (cor, brilho, equalização) só diferem pelo arredondamento.
+TOLERANCE = 3.0
+TOLERANCES = {
+    # Saídas binárias: a diferença fica nos pixels de borda dos objetos, que
+    # na redução viram tons intermediários
+    'apply_binary_threshold': 10.0,
+    'apply_otsu_threshold': 10.0,
+    'apply_multi_otsu_threshold': 10.0,
+    'apply_quantize_threshold': 10.0,
+    'apply_adaptive_threshold': 12.0,
+    # Bordas: o ruído fino gera gradientes na resolução cheia que a proxy já não tem
+    'apply_sobel': 7.5,
+    'apply_laplacian': 4.5,
+    # Matiz é circular: a redução mistura tons vizinhos de 0 e 179
+    'convert_to_hsv': 14.0,
+}
+# Ruído por pixel da imagem sintética: fotos reais têm pouco ruído independente
+# por pixel; com muito ruído a limiarização adaptativa cheia vira pontilhado.
+NOISE = 4
+
+
+def mean_abs_diff(a, b):
+    return float(np.mean(np.abs(a.astype(np.int16) - b.astype(np.int16))))
+
+
+def shown_preview(model, name, params):
+    """Aplica ``name`` a partir da original, como a interface; devolve o que o painel exibe"""
+    model.reset_image()
+    model.apply(name, **params)
+    return model.current if model.pending else model.proxy_processed
+
+
+def cold(model, func):
+    """``func`` sem os caches de representações, histogramas e do pipeline"""
+    def call():
+        model.derived.clear()
+        model.histograms.clear()
+        model.pipeline.cache.clear()
+        return func()
+    return call
+
+
+def run(megapixels, viewport, repeat):
+    model = Model()
+    image = synthetic_image(megapixels, noise=NOISE)
+    model.load_image("sintética", image)
+    model.set_viewport(*viewport)
+    proxy = model.proxy_original
+    print(f"Imagem {image.shape[1]}x{image.shape[0]}, proxy {proxy.shape[1]}x{proxy.shape[0]} "
+          f"(escala {model.proxy_scale:.3f})\n")
+    print(f"{'operação':<42}{'cheia':>11}{'prévia':>11}{'escala':>8}{'dif.':>8}{'tol.':>7}")
+
+    failures = 0
+    for name, params in OPERATION_CASES:
+        full = model.run_operation(name, image, **params)
+        preview = shown_preview(model, name, params)
+        diff = mean_abs_diff(resize_to_shape(full, preview.shape), preview)
+        scale = model._working_scale(name, OPERATIONS[name].resolve(params))
+
+        full_time = measure(cold(model, lambda: model.run_operation(name, image, **params)), repeat)
+        preview_time = measure(cold(model, lambda: shown_preview(model, name, params)), repeat)
+        tolerance = TOLERANCES.get(name, TOLERANCE)
+        status = "ok" if diff <= tolerance else "DIVERGENTE"
+        failures += diff > tolerance
+
+        label = name + ("(" + ",".join(f"{v}" for v in params.values()) + ")" if params else "")
+        print(f"{label[:41]:<42}{format_ms(full_time):>11}{format_ms(preview_time):>11}"
+              f"{scale:8.3f}{diff:8.2f}{tolerance:7.1f}  {status}")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--megapixels", type=float, default=24)
+    parser.add_argument("--viewport", type=int, nargs=2, default=(640, 720), metavar=("LARGURA", "ALTURA"))
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    sys.exit(1 if run(args.megapixels, args.viewport, args.repeat) else 0)
+
+
+if __name__ == "__main__":
+    main()
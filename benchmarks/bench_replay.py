@@ -0,0 +1,111 @@
+"""Repetição de receitas em lote (batch.py --recipe): execução completa, retomada e saídas já prontas.
+
+Grava ``--files`` imagens sintéticas e a receita LAB → equalização →
+limiarização adaptativa Gaussiana (models.recipe) e mede o lote completo,
+a repetição com tudo pronto (pulada pelo manifesto, sem ler as imagens),
+a retomada de um lote interrompido na metade (manifesto truncado com uma
+linha incompleta) e a repetição depois de tocar todas as entradas (o
+conteúdo é conferido pelo hash). Confere as contagens de cada etapa e que
+a saída é idêntica à da interface (Model com os mesmos passos); termina
+com código 1 se não for.
+
+Uso:
+    python -m benchmarks.bench_replay --megapixels 2 --files 16 --workers 2
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import cv2
+import numpy as np
+
+from batch import MANIFEST_NAME, collect_inputs, run_batch
+from benchmarks.common import synthetic_image
+from models.model import Model
+from models.recipe import load_recipe, save_recipe
+
+RECIPE = [
+    ('convert_to_lab', {}),
+    ('equalize_histogram', {}),
+    ('apply_adaptive_threshold', {'method': 'gaussian'}),
+]
+
+
+def write_inputs(folder, megapixels, count):
+    base = synthetic_image(megapixels)
+    for i in range(count):
+        cv2.imwrite(os.path.join(folder, f"img_{i:05d}.png"), np.roll(base, i * 37, axis=1))
+    return collect_inputs(folder)
+
+
+def interrupt(manifest, keep):
+    """Simula um lote interrompido: só as ``keep`` primeiras linhas e uma linha pela metade"""
+    with open(manifest, encoding='utf-8') as f:
+        lines = f.readlines()
+    with open(manifest, 'w', encoding='utf-8') as f:
+        f.writelines(lines[:keep])
+        f.write(lines[keep][:len(lines[keep]) // 2])
+
+
+def gui_result(path, steps):
+    model = Model()
+    model.load_image(path)
+    for name, params in steps:
+        model.apply(name, **params)
+    return model.derived.bgr(model.processed)
+
+
+def run(megapixels, count, workers):
+    failures = []
+    with tempfile.TemporaryDirectory() as folder:
+        inputs = os.path.join(folder, "entrada")
+        output = os.path.join(folder, "saida")
+        os.makedirs(inputs)
+        paths = write_inputs(inputs, megapixels, count)
+        recipe_path = os.path.join(folder, "receita.json")
+        save_recipe(recipe_path, RECIPE)
+        steps = load_recipe(recipe_path)
+        print(f"{count} imagens de {megapixels:g} MP, {workers} processos, receita: "
+              f"{' → '.join(name for name, _ in steps)}\n")
+        print(f"{'etapa':<34}{'tempo':>10}{'processadas':>13}{'puladas':>9}")
+
+        def stage(label, expected_processed, expected_skipped):
+            start = time.perf_counter()
+            processed, skipped, failed, _ = run_batch(paths, steps, output, workers, log=lambda text: None)
+            elapsed = time.perf_counter() - start
+            print(f"{label:<34}{elapsed:9.2f}s{processed:>13}{skipped:>9}")
+            if (processed, skipped, failed) != (expected_processed, expected_skipped, 0):
+                failures.append(f"{label}: {processed} processadas, {skipped} puladas, {failed} falhas "
+                                f"(esperado {expected_processed}/{expected_skipped}/0)")
+
+        stage("lote completo", count, 0)
+        stage("repetição (tudo pronto)", 0, count)
+        keep = count // 2
+        interrupt(os.path.join(output, MANIFEST_NAME), keep)
+        stage(f"retomada após {keep} imagens", count - keep, keep)
+        for path in paths:
+            os.utime(path)
+        stage("entradas tocadas (hash igual)", 0, count)
+
+        expected = gui_result(paths[-1], steps)
+        result = cv2.imread(os.path.join(output, os.path.basename(paths[-1])))
+        if result is None or not np.array_equal(result, expected):
+            failures.append("saída diferente da obtida pela interface")
+    for failure in failures:
+        print(f"\n! {failure}")
+    return len(failures)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--megapixels", type=float, default=2)
+    parser.add_argument("--files", type=int, default=16)
+    parser.add_argument("--workers", type=int, default=2)
+    args = parser.parse_args()
+    sys.exit(1 if run(args.megapixels, args.files, args.workers) else 0)
+
+
+if __name__ == "__main__":
+    main()
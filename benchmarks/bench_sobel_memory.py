@@ -0,0 +1,104 @@
+"""Sobel: pico de memória e tempo do caminho float64 x modo de pouca memória.
+
+Cada modo roda em um processo separado, que carrega a imagem de um
+``.npy`` e mede o aumento do pico de memória residente causado só pela
+detecção (no Linux o pico é zerado antes via /proc/self/clear_refs).
+Também mostra o tempo e a diferença para o caminho float64 padrão (em
+níveis de cinza).
+
+Uso:
+    python -m benchmarks.bench_sobel_memory --megapixels 50 --ksize 3
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+
+import numpy as np
+
+from benchmarks.common import format_ms, measure, synthetic_image
+
+# rótulo: (low_memory, l1_magnitude)
+MODES = {
+    "float64 (padrão)": (False, False),
+    "float32": (True, False),
+    "float64 |dx|+|dy|": (False, True),
+    "int16/float32 |dx|+|dy|": (True, True),
+}
+
+
+def _status_mb(field):
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith(field + ":"):
+                return int(line.split()[1]) / 1024.0
+    return 0.0
+
+
+def reset_peak():
+    """Zera o pico de memória (Linux); retorna a memória residente atual como base"""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return _status_mb("VmRSS")
+    except OSError:
+        # Sem /proc: a base é o pico até aqui (subestima modos que gastam menos que ele)
+        return peak_mb()
+
+
+def peak_mb():
+    if os.path.exists("/proc/self/status"):
+        return _status_mb("VmHWM")
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+
+
+def run_child(image_path, mode, ksize, repeat):
+    from models.edge_model import EdgeModel
+
+    image = np.load(image_path)
+    low_memory, l1_magnitude = MODES[mode]
+    model = EdgeModel(low_memory=low_memory, l1_magnitude=l1_magnitude)
+    baseline = reset_peak()
+    result = model.detect_sobel_edges(image, ksize)
+    extra = peak_mb() - baseline
+    elapsed = measure(lambda: model.detect_sobel_edges(image, ksize), repeat, warmup=0)
+    reference = EdgeModel().detect_sobel_edges(image, ksize) if (low_memory or l1_magnitude) else result
+    diff = np.abs(result.astype(np.int16) - reference.astype(np.int16))
+    print(json.dumps({"extra_mb": extra, "seconds": elapsed,
+                      "max_diff": int(diff.max()), "mean_diff": float(diff.mean())}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--megapixels", type=float, default=50)
+    parser.add_argument("--ksize", type=int, default=3)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--child", nargs=2, metavar=("IMAGEM", "MODO"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child[0], args.child[1], args.ksize, args.repeat)
+        return
+
+    with tempfile.TemporaryDirectory() as workdir:
+        image_path = os.path.join(workdir, "imagem.npy")
+        image = synthetic_image(args.megapixels)
+        np.save(image_path, image)
+        print(f"Imagem {image.shape[1]}x{image.shape[0]} ({image.nbytes / 2 ** 20:.0f} MB), ksize={args.ksize}\n")
+        del image
+        print(f"{'modo':<26}{'memória extra':>15}{'tempo':>12}{'dif. máx.':>11}{'dif. média':>12}")
+        for mode in MODES:
+            output = subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_sobel_memory", "--ksize", str(args.ksize),
+                 "--repeat", str(args.repeat), "--child", image_path, mode],
+                check=True, capture_output=True, text=True).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            print(f"{mode:<26}{result['extra_mb']:12.0f} MB{format_ms(result['seconds']):>12}"
+                  f"{result['max_diff']:11d}{result['mean_diff']:12.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Abertura a frio: tempo de importação até a janela poder ser criada (python -X importtime).
+
+Roda ``python -X importtime -c "import controllers.controller"`` em
+processos novos (o que o main.py importa antes de criar a janela) e lê
+os tempos que o interpretador escreve no stderr. Mostra o total, os
+módulos de topo mais caros e o tempo das importações adiadas (OpenCV,
+NumPy, PIL, matplotlib), que a janela não deve esperar. Termina com
+código 1 se o total passar de ``--budget-ms`` ou se algum desses
+módulos for importado na abertura.
+
+Uso:
+    python -m benchmarks.bench_startup --budget-ms 150
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+from benchmarks.common import format_ms
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STARTUP = "import controllers.controller"
+# Importados depois da janela: na primeira imagem, em segundo plano ou no primeiro desenho do histograma
+DEFERRED = ('cv2', 'numpy', 'PIL', 'matplotlib')
+DEFERRED_IMPORT = "import models.model, models.image_loader, views.image_renderer, matplotlib.backends.backend_tkagg"
+
+
+def import_times(statement):
+    """{módulo: (próprio µs, acumulado µs, profundidade)} de uma importação em um processo novo"""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", statement],
+                            cwd=ROOT, capture_output=True, text=True, check=True)
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        own, cumulative, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        modules[name.strip()] = (int(own), int(cumulative), depth)
+    return modules
+
+
+def total_ms(modules):
+    # Só os de topo: o acumulado deles já inclui os que eles importam
+    return sum(cumulative for _, cumulative, depth in modules.values() if depth == 0) / 1000
+
+
+def run(budget_ms, repeat, top):
+    runs = [import_times(STARTUP) for _ in range(repeat)]
+    startup = statistics.median(total_ms(modules) for modules in runs)
+    modules = min(runs, key=lambda modules: abs(total_ms(modules) - startup))
+
+    print(f"{STARTUP!r}, mediana de {repeat} processos\n")
+    print(f"{'módulo de topo':<40}{'acumulado':>12}")
+    roots = sorted(((cumulative, name) for name, (_, cumulative, depth) in modules.items() if depth == 0),
+                   reverse=True)
+    for cumulative, name in roots[:top]:
+        print(f"{name:<40}{format_ms(cumulative / 1e6):>12}")
+    print(f"{'total':<40}{format_ms(startup / 1000):>12}  (orçamento {budget_ms:.0f} ms)")
+
+    eager = sorted({name.split('.')[0] for name in modules} & set(DEFERRED))
+    deferred = total_ms(import_times(DEFERRED_IMPORT))
+    print(f"\n{'importações adiadas (depois da janela)':<40}{format_ms(deferred / 1000):>12}")
+
+    failures = 0
+    if eager:
+        print(f"\n! importados na abertura: {', '.join(eager)}")
+        failures += 1
+    if startup > budget_ms:
+        print(f"\n! abertura acima do orçamento: {startup:.1f} ms > {budget_ms:.0f} ms")
+        failures += 1
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--budget-ms", type=float, default=150)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+    sys.exit(1 if run(args.budget_ms, args.repeat, args.top) else 0)
+
+
+if __name__ == "__main__":
+    main()
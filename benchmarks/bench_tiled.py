@@ -0,0 +1,90 @@
+"""Processamento em blocos: tempo e pico de memória para imagens de tamanhos crescentes.
+
+Para cada tamanho, grava uma imagem sintética em ``.npy`` (por faixas, sem
+alocá-la inteira) e executa, em um processo separado, uma sequência de
+operações com models.tiled.TileProcessor. O pico de memória residente
+(ru_maxrss) deve ficar praticamente constante, qualquer que seja a imagem.
+
+Uso:
+    python -m benchmarks.bench_tiled --megapixels 25 100 400 --tile 1024
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.common import synthetic_image
+
+OPERATIONS = [
+    ("equalize_histogram", {}),
+    ("apply_sobel", {"ksize": 3}),
+    ("apply_otsu_threshold", {}),
+]
+
+
+def write_source(path, megapixels, strip_megapixels=4):
+    """Grava uma imagem sintética de ``megapixels`` repetindo uma faixa gerada uma única vez"""
+    from models.tiled import create_sink, release
+
+    strip = synthetic_image(strip_megapixels, noise=8)
+    width = strip.shape[1]
+    height = int(round(megapixels * 1e6 / width))
+    sink = create_sink(path, (height, width, 3))
+    for y in range(0, height, strip.shape[0]):
+        rows = min(strip.shape[0], height - y)
+        sink[y:y + rows] = strip[:rows]
+        release(sink)
+    return sink.shape
+
+
+def run_child(source_path, workdir, tile_size):
+    from models.tiled import TileProcessor, open_source
+
+    processor = TileProcessor(tile_size)
+    image = open_source(source_path)
+    start = time.perf_counter()
+    previous = None
+    for i, (name, params) in enumerate(OPERATIONS):
+        sink_path = os.path.join(workdir, f"etapa{i}.npy")
+        image = processor.run(name, image, sink_path, **params)
+        if previous:
+            os.remove(previous)
+        previous = sink_path
+    elapsed = time.perf_counter() - start
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+    print(json.dumps({"seconds": elapsed, "peak_mb": peak_mb}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--megapixels", type=float, nargs="+", default=[25, 100])
+    parser.add_argument("--tile", type=int, default=1024)
+    parser.add_argument("--child", nargs=2, metavar=("ORIGEM", "PASTA"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child[0], args.child[1], args.tile)
+        return
+
+    print(f"Operações: {', '.join(name for name, _ in OPERATIONS)} (bloco {args.tile}px)\n")
+    print(f"{'MP':>8}{'imagem (MB)':>14}{'tempo':>10}{'MP/s':>8}{'pico RSS (MB)':>16}")
+    for megapixels in args.megapixels:
+        with tempfile.TemporaryDirectory() as workdir:
+            source_path = os.path.join(workdir, "origem.npy")
+            shape = write_source(source_path, megapixels)
+            output = subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_tiled", "--tile", str(args.tile),
+                 "--child", source_path, workdir],
+                check=True, capture_output=True, text=True).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+        image_mb = shape[0] * shape[1] * 3 / 2 ** 20
+        rate = megapixels / result["seconds"]
+        print(f"{megapixels:8.0f}{image_mb:14.0f}{result['seconds']:9.1f}s{rate:8.1f}{result['peak_mb']:16.0f}")
+
+
+if __name__ == "__main__":
+    main()
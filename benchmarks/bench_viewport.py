@@ -0,0 +1,146 @@
+"""Viewport com pirâmide de blocos: custo por quadro de zoom e arraste x redimensionar a imagem inteira.
+
+Simula, sem Tk, o que o ImageViewport faz a cada quadro: escolhe o nível
+da TilePyramid pelo zoom, renderiza só os blocos visíveis que não estão no
+LRU (TileCache) e reaproveita os demais. A sequência ajusta a imagem ao
+painel, amplia em passos de 1.25x até 4x em torno de um ponto e arrasta.
+Para comparação, o caminho anterior reduzia a imagem inteira a cada
+atualização (só faz sentido ajustando ao painel). Confere que os blocos
+cobrem o painel sem frestas nem sobreposição e que em 1:1 reproduzem a
+imagem exatamente; termina com código 1 se não.
+
+Uso:
+    python -m benchmarks.bench_viewport --megapixels 100
+"""
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from benchmarks.common import format_ms, measure, synthetic_image
+from views.image_renderer import ImageRenderer
+from views.tile_pyramid import TileCache, TilePyramid
+
+VIEWPORT = (780, 760)
+
+
+def origin_for(image_size, zoom, center):
+    """Mesma conta do ImageViewport: canto da imagem na tela, sem sobrar borda"""
+    origin = []
+    for size, view, value in zip(image_size, VIEWPORT, center):
+        half = view / 2 / zoom
+        value = size / 2 if size <= 2 * half else min(max(value, half), size - half)
+        origin.append(int(round(view / 2 - value * zoom)))
+    return tuple(origin)
+
+
+def frame(pyramid, cache, renderer, zoom, center, interactive=True):
+    """Um quadro: retorna (blocos visíveis, blocos que precisaram ser renderizados)"""
+    height, width = pyramid.image.shape[:2]
+    index = pyramid.level_for_scale(zoom)
+    scale = zoom * (1 << index)
+    tiles = pyramid.visible_tiles(index, scale, origin_for((width, height), zoom, center), VIEWPORT)
+    rendered = []
+    for column, row, x, y, tile_width, tile_height in tiles:
+        key = (index, scale, column, row)
+        tile = cache.get(key)
+        if tile is None:
+            tile = renderer.resize_to(pyramid.tile(index, column, row), (tile_width, tile_height), interactive)
+            cache.put(key, tile)
+            rendered.append(key)
+    return tiles, rendered
+
+
+def session(image, fit):
+    """Ajusta, amplia até 4x em torno de um ponto e arrasta"""
+    height, width = image.shape[:2]
+    point = (width * 0.4, height * 0.6)
+    steps = [(fit, (width / 2, height / 2))]
+    zoom = fit
+    while zoom * 1.25 <= 4.0:
+        zoom *= 1.25
+        steps.append((zoom, point))
+    for i in range(1, 31):
+        steps.append((zoom, (point[0] + i * 12 / zoom, point[1] + i * 5 / zoom)))
+    return steps
+
+
+def check_mosaic(pyramid, renderer, zoom, center):
+    """Blocos cobrem o painel uma única vez; em 1:1 são cópias exatas da imagem"""
+    height, width = pyramid.image.shape[:2]
+    coverage = np.zeros(VIEWPORT[::-1], np.int32)
+    mosaic = np.zeros(VIEWPORT[::-1] + pyramid.image.shape[2:], np.uint8)
+    index = pyramid.level_for_scale(zoom)
+    scale = zoom * (1 << index)
+    origin = origin_for((width, height), zoom, center)
+    for column, row, x, y, tile_width, tile_height in pyramid.visible_tiles(index, scale, origin, VIEWPORT):
+        tile = np.asarray(renderer.resize_to(pyramid.tile(index, column, row), (tile_width, tile_height)))
+        x0, y0 = max(x, 0), max(y, 0)
+        x1, y1 = min(x + tile_width, VIEWPORT[0]), min(y + tile_height, VIEWPORT[1])
+        coverage[y0:y1, x0:x1] += 1
+        mosaic[y0:y1, x0:x1] = tile[y0 - y:y1 - y, x0 - x:x1 - x]
+    # Região do painel ocupada pela imagem
+    shown = coverage[max(origin[1], 0):min(origin[1] + round(height * zoom), VIEWPORT[1]),
+                     max(origin[0], 0):min(origin[0] + round(width * zoom), VIEWPORT[0])]
+    ok = shown.size > 0 and shown.min() == 1 and coverage.max() == 1
+    if zoom == 1.0:
+        expected = pyramid.image[-origin[1]:-origin[1] + VIEWPORT[1], -origin[0]:-origin[0] + VIEWPORT[0]]
+        ok &= np.array_equal(mosaic[..., ::-1] if mosaic.ndim == 3 else mosaic, expected)
+    return ok
+
+
+def run(megapixels, max_tiles):
+    renderer = ImageRenderer()
+    image = synthetic_image(megapixels)
+    height, width = image.shape[:2]
+    fit = min(1.0, VIEWPORT[0] / width, VIEWPORT[1] / height)
+    print(f"Imagem {width}x{height}, painel {VIEWPORT[0]}x{VIEWPORT[1]}, blocos de 256 px\n")
+
+    pyramid = TilePyramid(image)
+    start = time.perf_counter()
+    pyramid.level(pyramid.level_for_scale(fit))
+    build = time.perf_counter() - start
+    print(f"{'pirâmide até o nível do ajuste':<36}{format_ms(build):>12}")
+    for label, interactive in (("imagem inteira, filtro barato", True), ("imagem inteira, qualidade", False)):
+        whole = measure(lambda: renderer.prepare(image, *VIEWPORT, interactive=interactive), 3)
+        print(f"{label:<36}{format_ms(whole):>12}")
+    print()
+
+    cache = TileCache(max_tiles)
+    steps = session(image, fit)
+    times, counts = [], []
+    for zoom, center in steps:
+        start = time.perf_counter()
+        tiles, rendered = frame(pyramid, cache, renderer, zoom, center)
+        times.append(time.perf_counter() - start)
+        counts.append((len(tiles), len(rendered)))
+    # Os 30 últimos quadros são o arraste
+    zoom_frames = len(steps) - 31
+    print(f"{'quadros':<36}{'pior':>12}{'mediana':>12}{'blocos (vis./novos)':>22}")
+    for label, part in (("zoom", slice(0, zoom_frames + 1)), ("arraste", slice(zoom_frames + 1, None))):
+        chunk = sorted(times[part])
+        visible = sum(c[0] for c in counts[part])
+        new = sum(c[1] for c in counts[part])
+        print(f"{label:<36}{format_ms(chunk[-1]):>12}{format_ms(chunk[len(chunk) // 2]):>12}"
+              f"{f'{visible}/{new}':>22}")
+
+    failures = 0
+    for zoom, center in ((fit, (width / 2, height / 2)), (1.0, (width * 0.4, height * 0.6)),
+                         (0.37, (width * 0.3, height * 0.2)), (3.0, (width * 0.7, height * 0.5))):
+        if not check_mosaic(pyramid, renderer, zoom, center):
+            failures += 1
+            print(f"! blocos incorretos no zoom {zoom:.3f}")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--megapixels", type=float, default=100)
+    parser.add_argument("--max-tiles", type=int, default=512)
+    args = parser.parse_args()
+    sys.exit(1 if run(args.megapixels, args.max_tiles) else 0)
+
+
+if __name__ == "__main__":
+    main()
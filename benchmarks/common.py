@@ -0,0 +1,41 @@
+"""Utilitários compartilhados pelos benchmarks"""
+import statistics
+import time
+
+import numpy as np
+
+
+def synthetic_image(megapixels, channels=3, seed=0, noise=24):
+    """Gera uma imagem uint8 sintética com gradientes, blocos e ruído (tem bordas e histograma não trivial)"""
+    height = int(round((megapixels * 1e6 * 3 / 4) ** 0.5))
+    width = int(round(megapixels * 1e6 / height))
+    rng = np.random.default_rng(seed)
+    y = np.linspace(0, 255, height, dtype=np.float32)[:, None]
+    x = np.linspace(0, 255, width, dtype=np.float32)[None, :]
+    base = (0.5 * y + 0.5 * x).astype(np.uint8)
+    # Blocos para gerar bordas fortes
+    base[(np.arange(height) // 64 % 2 == 0)[:, None] & (np.arange(width) // 64 % 2 == 0)[None, :]] //= 2
+    noise = rng.integers(0, noise + 1, size=(height, width), dtype=np.uint8)
+    gray = np.clip(base.astype(np.int16) + noise, 0, 255).astype(np.uint8)
+    if channels == 1:
+        return gray
+    planes = [np.roll(gray, shift=i * 17, axis=1) for i in range(channels)]
+    if channels == 4:
+        planes[3] = np.full_like(gray, 255)
+    return np.dstack(planes)
+
+
+def measure(func, repeat=5, warmup=1):
+    """Executa ``func`` e retorna a mediana do tempo em segundos"""
+    for _ in range(warmup):
+        func()
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def format_ms(seconds):
+    return f"{seconds * 1000:8.1f} ms"
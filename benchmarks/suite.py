@@ -0,0 +1,456 @@
+"""Suíte de desempenho: todos os métodos públicos dos models em vários tamanhos, com comparação contra uma base.
+
+``run`` gera imagens sintéticas (``benchmarks.common.synthetic_image``,
+semente fixa) de 1, 12, 50 e 200 MP em cinza, BGR e BGRA e cronometra
+cada método público de ColorModel, HistogramModel, ThresholdModel,
+EdgeModel e da fachada Model. Para cada (método, tamanho, formato) grava:
+
+- ``seconds``: mediana do tempo de parede de ``--repeat`` execuções (após
+  uma de aquecimento); os objetos são recriados a cada execução, então
+  caches de histogramas, representações derivadas e do pipeline começam
+  vazios;
+- ``mp_per_s``: megapixels da imagem de entrada por segundo;
+- ``rss_peak_mb``: pico de RSS acima do valor antes da chamada (amostrado
+  em /proc em outra thread; None onde não existe);
+- ``alloc_peak_mb`` e ``alloc_blocks``: pico de memória rastreada pelo
+  tracemalloc (inclui os buffers do numpy) e número de blocos alocados na
+  chamada que continuam vivos no final (resultado e caches).
+
+Métodos sem imagem de entrada (undo, commit...) rodam sobre um Model já
+carregado com a imagem. Os métodos públicos sem caso na suíte aparecem
+em ``missing``; uma combinação que a operação não aceita (ex.: HSV de
+uma imagem em cinza) é gravada com ``error``.
+
+``compare`` confronta dois JSON e lista as regressões de tempo e de
+memória acima da tolerância; termina com código 1 se houver alguma.
+
+Uso:
+    python -m benchmarks.suite run --sizes 1 12 --output base.json
+    python -m benchmarks.suite run --sizes 1 12 --output atual.json
+    python -m benchmarks.suite compare base.json atual.json --tolerance 0.15
+"""
+import argparse
+import datetime
+import gc
+import inspect
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+import cv2
+import numpy as np
+
+from benchmarks.common import synthetic_image
+from models.color_model import ColorModel
+from models.edge_model import EdgeModel
+from models.histogram_model import HistogramModel
+from models.histogram_service import HistogramService
+from models.model import Model
+from models.threshold_model import ThresholdModel
+
+SIZES = [1, 12, 50, 200]
+LAYOUTS = {'gray': 1, 'bgr': 3, 'bgra': 4}
+ALL = tuple(LAYOUTS)
+BGR = ('bgr',)
+BGRA = ('bgra',)
+GRAY = ('gray',)
+
+POINT_OPS = [('brightness', 20), ('contrast', 1.3), ('equalize',), ('binary', 128)]
+VIEWPORT = (1280, 720)
+
+# Métodos públicos que não entram na suíte, com o motivo
+SKIPPED = {
+    'EdgeModel.release_buffers': "só descarta buffers, sem processamento",
+}
+
+
+# ========== Preparação (fora do tempo medido) ==========
+def loaded_model(image, viewport=None, ops=()):
+    """Model novo com ``image`` carregada; ``ops``: [(método, kwargs)] aplicados em seguida"""
+    model = Model()
+    model.load_image("sintética", image)
+    if viewport is not None:
+        model.set_viewport(*viewport)
+    for name, kwargs in ops:
+        getattr(model, name)(**kwargs)
+    return model
+
+
+def color(image, workdir):
+    return ColorModel(), image
+
+
+def histogram(image, workdir):
+    return HistogramModel(HistogramService()), image
+
+
+def threshold(image, workdir):
+    return ThresholdModel(), image
+
+
+def edge(image, workdir):
+    return EdgeModel(), image
+
+
+def model(image, workdir):
+    return loaded_model(image), image
+
+
+def model_with(viewport=None, ops=()):
+    return lambda image, workdir: (loaded_model(image, viewport, ops), image)
+
+
+def gray_histogram(image, workdir):
+    gray = image if image.ndim == 2 else cv2.cvtColor(image[:, :, :3], cv2.COLOR_BGR2GRAY)
+    return ThresholdModel(), cv2.calcHist([gray], [0], None, [256], [0, 256]).ravel()
+
+
+def edge_with(prepare):
+    """Setup do EdgeModel que passa, no lugar da imagem, o resultado de ``prepare(model, imagem)``"""
+    def setup(image, workdir):
+        edge_model = EdgeModel()
+        return edge_model, prepare(edge_model, image)
+    return setup
+
+
+def pending_preview(image, workdir):
+    model = loaded_model(image, VIEWPORT)
+    job, token = model.prepare_preview('adjust_brightness', brightness=20)
+    return model, (token, job())
+
+
+def saved_file(image, workdir):
+    path = os.path.join(workdir, "entrada.bmp")
+    cv2.imwrite(path, image)
+    return Model(), path
+
+
+# (nome, formatos, setup(imagem, pasta) → (objeto, argumento), run(objeto, argumento))
+CASES = [
+    # ColorModel
+    ('ColorModel.rgb_to_rgba', BGR, color, lambda m, img: m.rgb_to_rgba(img)),
+    ('ColorModel.rgba_to_rgb', BGRA, color, lambda m, img: m.rgba_to_rgb(img)),
+    ('ColorModel.rgb_to_cmyk', BGR, color, lambda m, img: m.rgb_to_cmyk(img)),
+    ('ColorModel.cmyk_to_rgb', BGRA, color, lambda m, img: m.cmyk_to_rgb(img)),
+    ('ColorModel.rgb_to_hsv', BGR, color, lambda m, img: m.rgb_to_hsv(img)),
+    ('ColorModel.hsv_to_rgb', BGR, color, lambda m, img: m.hsv_to_rgb(img)),
+    ('ColorModel.rgb_to_lab', BGR, color, lambda m, img: m.rgb_to_lab(img)),
+    ('ColorModel.lab_to_rgb', BGR, color, lambda m, img: m.lab_to_rgb(img)),
+    ('ColorModel.rgb_to_gray', BGR, color, lambda m, img: m.rgb_to_gray(img)),
+    ('ColorModel.convert_batch', BGR, color, lambda m, img: m.convert_batch([img, img], 'hsv')),
+    ('ColorModel.iter_convert', BGR, color,
+     lambda m, img: [None for _ in m.iter_convert(iter([img, img]), 'hsv', reuse_buffers=True)]),
+    # HistogramModel
+    ('HistogramModel.adjust_brightness', ALL, histogram, lambda m, img: m.adjust_brightness(img, 30)),
+    ('HistogramModel.adjust_contrast', ALL, histogram, lambda m, img: m.adjust_contrast(img, 1.5)),
+    ('HistogramModel.adjust_brightness_contrast', ALL, histogram,
+     lambda m, img: m.adjust_brightness_contrast(img, 20, 1.3)),
+    ('HistogramModel.equalize_histogram', ALL, histogram, lambda m, img: m.equalize_histogram(img)),
+    ('HistogramModel.apply_point_ops', ALL, histogram, lambda m, img: m.apply_point_ops(img, POINT_OPS)),
+    ('HistogramModel.compile_point_ops', ALL, histogram, lambda m, img: m.compile_point_ops(img, POINT_OPS)),
+    ('HistogramModel.calculate_histogram', ALL, histogram, lambda m, img: m.calculate_histogram(img)),
+    ('HistogramModel.get_histogram_stats', ALL, histogram, lambda m, img: m.get_histogram_stats(img)),
+    # ThresholdModel
+    ('ThresholdModel.binary_threshold', ALL, threshold, lambda m, img: m.binary_threshold(img, 128)),
+    ('ThresholdModel.binary_inverse_threshold', ALL, threshold,
+     lambda m, img: m.binary_inverse_threshold(img, 128)),
+    ('ThresholdModel.truncate_threshold', ALL, threshold, lambda m, img: m.truncate_threshold(img, 128)),
+    ('ThresholdModel.to_zero_threshold', ALL, threshold, lambda m, img: m.to_zero_threshold(img, 128)),
+    ('ThresholdModel.to_zero_inverse_threshold', ALL, threshold,
+     lambda m, img: m.to_zero_inverse_threshold(img, 128)),
+    ('ThresholdModel.range_threshold', ALL, threshold, lambda m, img: m.range_threshold(img, 64, 192)),
+    ('ThresholdModel.otsu_threshold', ALL, threshold, lambda m, img: m.otsu_threshold(img)),
+    ('ThresholdModel.multi_otsu_threshold', ALL, threshold, lambda m, img: m.multi_otsu_threshold(img, 3)),
+    ('ThresholdModel.quantize_threshold', ALL, threshold, lambda m, img: m.quantize_threshold(img, 4)),
+    ('ThresholdModel.adaptive_threshold_mean', ALL, threshold, lambda m, img: m.adaptive_threshold_mean(img)),
+    ('ThresholdModel.adaptive_threshold_gaussian', ALL, threshold,
+     lambda m, img: m.adaptive_threshold_gaussian(img)),
+    ('ThresholdModel.otsu_value_from_histogram', GRAY, gray_histogram,
+     lambda m, hist: m.otsu_value_from_histogram(hist)),
+    ('ThresholdModel.multi_otsu_thresholds', GRAY, gray_histogram,
+     lambda m, hist: m.multi_otsu_thresholds(hist, 4)),
+    # EdgeModel
+    ('EdgeModel.detect_sobel_edges', ALL, edge, lambda m, img: m.detect_sobel_edges(img)),
+    ('EdgeModel.detect_laplacian_edges', ALL, edge, lambda m, img: m.detect_laplacian_edges(img)),
+    ('EdgeModel.detect_canny_edges', ALL, edge, lambda m, img: m.detect_canny_edges(img)),
+    ('EdgeModel.sobel_magnitude', GRAY, edge, lambda m, gray: m.sobel_magnitude(gray)),
+    ('EdgeModel.normalize_magnitude', GRAY, edge_with(lambda m, gray: m.sobel_magnitude(gray)),
+     lambda m, mag: m.normalize_magnitude(mag, float(mag.max()))),
+    ('EdgeModel.edge_coordinates', GRAY, edge_with(lambda m, gray: m.detect_canny_edges(gray)),
+     lambda m, edges: m.edge_coordinates(edges)),
+    ('EdgeModel.overlay_edges_on_image', BGR, edge_with(lambda m, img: (img, m.detect_canny_edges(img))),
+     lambda m, args: m.overlay_edges_on_image(*args)),
+    # Model (fachada): resolução cheia, sem viewport, salvo indicação
+    ('Model.convert_to_rgba', BGR, model, lambda m, img: m.convert_to_rgba()),
+    ('Model.convert_to_cmyk', BGR, model, lambda m, img: m.convert_to_cmyk()),
+    ('Model.convert_to_hsv', BGR, model, lambda m, img: m.convert_to_hsv()),
+    ('Model.convert_to_lab', BGR, model, lambda m, img: m.convert_to_lab()),
+    ('Model.convert_to_gray', ALL, model, lambda m, img: m.convert_to_gray()),
+    ('Model.equalize_histogram', ALL, model, lambda m, img: m.equalize_histogram()),
+    ('Model.adjust_brightness', ALL, model, lambda m, img: m.adjust_brightness(20)),
+    ('Model.adjust_contrast', ALL, model, lambda m, img: m.adjust_contrast(1.5)),
+    ('Model.adjust_brightness_contrast', ALL, model, lambda m, img: m.adjust_brightness_contrast(20, 1.3)),
+    ('Model.apply_point_ops', ALL, model, lambda m, img: m.apply_point_ops(POINT_OPS)),
+    ('Model.apply_binary_threshold', ALL, model, lambda m, img: m.apply_binary_threshold(128)),
+    ('Model.apply_otsu_threshold', ALL, model, lambda m, img: m.apply_otsu_threshold()),
+    ('Model.apply_multi_otsu_threshold', ALL, model, lambda m, img: m.apply_multi_otsu_threshold(3)),
+    ('Model.apply_adaptive_threshold', ALL, model, lambda m, img: m.apply_adaptive_threshold('mean')),
+    ('Model.apply_quantize_threshold', ALL, model, lambda m, img: m.apply_quantize_threshold(4)),
+    ('Model.apply_sobel', ALL, model, lambda m, img: m.apply_sobel()),
+    ('Model.apply_laplacian', ALL, model, lambda m, img: m.apply_laplacian()),
+    ('Model.apply_canny', ALL, model, lambda m, img: m.apply_canny()),
+    ('Model.apply', ALL, model, lambda m, img: m.apply('apply_canny', threshold1=50)),
+    ('Model.run_operation', ALL, model, lambda m, img: m.run_operation('apply_sobel', img)),
+    ('Model.calculate_histogram', ALL, model, lambda m, img: m.calculate_histogram()),
+    ('Model.set_viewport', ALL, model, lambda m, img: m.set_viewport(*VIEWPORT)),
+    ('Model.preview', ALL, model_with(VIEWPORT), lambda m, img: m.preview('adjust_brightness', brightness=20)),
+    ('Model.prepare_preview', ALL, model_with(VIEWPORT),
+     lambda m, img: m.prepare_preview('adjust_brightness', brightness=20)[0]()),
+    ('Model.accept_preview', ALL, pending_preview, lambda m, args: m.accept_preview(*args)),
+    ('Model.commit', ALL, model_with(VIEWPORT, [('adjust_brightness', {'brightness': 20})]),
+     lambda m, img: m.commit()),
+    ('Model.edit_step', ALL, model_with(ops=[('adjust_brightness', {'brightness': 20})]),
+     lambda m, img: m.edit_step(0, brightness=40)),
+    ('Model.remove_step', ALL, model_with(ops=[('apply_sobel', {})]), lambda m, img: m.remove_step(0)),
+    ('Model.undo', ALL, model_with(ops=[('apply_otsu_threshold', {})]), lambda m, img: m.undo()),
+    ('Model.redo', ALL, model_with(ops=[('apply_otsu_threshold', {}), ('undo', {})]), lambda m, img: m.redo()),
+    ('Model.reset_image', ALL, model_with(ops=[('apply_otsu_threshold', {})]), lambda m, img: m.reset_image()),
+    ('Model.save_image', ALL, lambda image, workdir: (loaded_model(image), os.path.join(workdir, "saida.bmp")),
+     lambda m, path: m.save_image(path)),
+    ('Model.load_image', ALL, saved_file, lambda m, path: m.load_image(path)),
+]
+
+CLASSES = [ColorModel, HistogramModel, ThresholdModel, EdgeModel, Model]
+
+
+def public_methods():
+    """Nomes ``Classe.método`` de todos os métodos públicos (propriedades não contam)"""
+    names = []
+    for cls in CLASSES:
+        for name, member in inspect.getmembers(cls, inspect.isfunction):
+            if not name.startswith('_'):
+                names.append(f"{cls.__name__}.{name}")
+    return names
+
+
+# ========== Medição ==========
+def current_rss():
+    """RSS atual em bytes (Linux); None se /proc não existir"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return None
+
+
+class RssSampler:
+    """Amostra o RSS em outra thread enquanto a operação roda (o OpenCV libera o GIL)"""
+
+    def __init__(self, interval=0.002):
+        self.interval = interval
+        self.peak = current_rss()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            rss = current_rss()
+            if rss is not None and rss > self.peak:
+                self.peak = rss
+
+    def __enter__(self):
+        if self.peak is not None:
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        if self.peak is not None:
+            self._stop.set()
+            self._thread.join()
+            rss = current_rss()
+            self.peak = max(self.peak, rss or 0)
+
+
+def release(obj):
+    """Encerra o pool de threads de um Model criado para a medição"""
+    if isinstance(obj, Model):
+        obj.executor.shutdown()
+
+
+def measure_case(setup, run, image, workdir, repeat):
+    """Tempo (mediana) e memória de ``run`` sobre objetos recém-criados por ``setup``"""
+    times = []
+    for i in range(repeat + 1):
+        obj, arg = setup(image, workdir)
+        start = time.perf_counter()
+        run(obj, arg)
+        elapsed = time.perf_counter() - start
+        release(obj)
+        del obj, arg
+        if i:  # a primeira é aquecimento
+            times.append(elapsed)
+
+    # Execução separada para a memória: o tracemalloc deixa as alocações mais lentas
+    obj, arg = setup(image, workdir)
+    gc.collect()
+    before = current_rss()
+    tracemalloc.start()
+    snapshot = tracemalloc.take_snapshot()
+    tracemalloc.reset_peak()
+    with RssSampler() as sampler:
+        result = run(obj, arg)
+    peak = tracemalloc.get_traced_memory()[1]
+    retained = tracemalloc.take_snapshot().compare_to(snapshot, 'filename')
+    tracemalloc.stop()
+    release(obj)
+    del result, obj, arg
+
+    seconds = statistics.median(times)
+    megapixels = image.shape[0] * image.shape[1] / 1e6
+    return {
+        'seconds': seconds,
+        'mp_per_s': megapixels / seconds if seconds > 0 else None,
+        'rss_peak_mb': (sampler.peak - before) / 2 ** 20 if before is not None else None,
+        'alloc_peak_mb': peak / 2 ** 20,
+        'alloc_blocks': sum(max(0, stat.count_diff) for stat in retained),
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def run_suite(sizes, layouts, only, repeat, output):
+    cases = [case for case in CASES if not only or any(pattern in case[0] for pattern in only)]
+    covered = {case[0] for case in CASES} | set(SKIPPED)
+    missing = [name for name in public_methods() if name not in covered]
+    report = {
+        'meta': {
+            'date': datetime.datetime.now().isoformat(timespec='seconds'),
+            'revision': git_revision(),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'opencv': cv2.__version__,
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'repeat': repeat,
+        },
+        'results': [],
+        'skipped': SKIPPED,
+        'missing': missing,
+    }
+    print(f"{'operação':<46}{'MP':>5}{'formato':>8}{'tempo':>11}{'MP/s':>9}{'RSS':>9}{'alocado':>9}")
+    with tempfile.TemporaryDirectory() as workdir:
+        for megapixels in sizes:
+            for layout in layouts:
+                image = synthetic_image(megapixels, channels=LAYOUTS[layout])
+                for name, accepted, setup, run in cases:
+                    if layout not in accepted:
+                        continue
+                    entry = {'op': name, 'megapixels': megapixels, 'layout': layout}
+                    try:
+                        entry.update(measure_case(setup, run, image, workdir, repeat))
+                    except Exception as error:
+                        entry['error'] = f"{type(error).__name__}: {error}"
+                        print(f"{name:<46}{megapixels:>5g}{layout:>8}  erro: {entry['error'][:60]}")
+                        report['results'].append(entry)
+                        continue
+                    report['results'].append(entry)
+                    rss = entry['rss_peak_mb']
+                    print(f"{name:<46}{megapixels:>5g}{layout:>8}{entry['seconds'] * 1000:8.1f} ms"
+                          f"{entry['mp_per_s'] or 0:9.0f}{'' if rss is None else f'{rss:6.0f} MB':>9}"
+                          f"{entry['alloc_peak_mb']:6.0f} MB")
+                    # Grava a cada operação: uma rodada longa interrompida não perde tudo
+                    with open(output, 'w') as f:
+                        json.dump(report, f, indent=1)
+                del image
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=1)
+    if missing:
+        print("\n! métodos públicos sem caso na suíte: " + ", ".join(missing))
+    print(f"\nResultados em {output}")
+    return 0
+
+
+# ========== Comparação ==========
+def compare(baseline_path, current_path, tolerance, min_ms, min_mb):
+    """Lista regressões de ``current`` em relação a ``baseline``; retorna quantas houve"""
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    with open(current_path) as f:
+        current = json.load(f)
+    key = lambda entry: (entry['op'], entry['megapixels'], entry['layout'])
+    base = {key(entry): entry for entry in baseline['results'] if 'error' not in entry}
+
+    regressions, improvements, compared = [], 0, 0
+    for entry in current['results']:
+        old = base.get(key(entry))
+        if old is None:
+            continue
+        if 'error' in entry:
+            regressions.append((key(entry), "erro", entry['error'][:40], ""))
+            continue
+        compared += 1
+        ratio = entry['seconds'] / old['seconds'] if old['seconds'] > 0 else 1.0
+        if ratio > 1 + tolerance and (entry['seconds'] - old['seconds']) * 1000 > min_ms:
+            regressions.append((key(entry), "tempo", f"{old['seconds'] * 1000:.1f} ms",
+                                f"{entry['seconds'] * 1000:.1f} ms ({ratio:.2f}x)"))
+        elif ratio < 1 - tolerance:
+            improvements += 1
+        growth = entry['alloc_peak_mb'] - old['alloc_peak_mb']
+        if growth > min_mb and entry['alloc_peak_mb'] > old['alloc_peak_mb'] * (1 + tolerance):
+            regressions.append((key(entry), "memória", f"{old['alloc_peak_mb']:.0f} MB",
+                                f"{entry['alloc_peak_mb']:.0f} MB"))
+
+    print(f"Base: {baseline['meta'].get('revision')} ({baseline['meta']['date']}); "
+          f"atual: {current['meta'].get('revision')} ({current['meta']['date']})")
+    print(f"{compared} medições comparadas, tolerância {tolerance:.0%}; {improvements} melhoraram\n")
+    if regressions:
+        print(f"{'operação':<46}{'MP':>5}{'formato':>8}  {'tipo':<9}{'base':>12}  atual")
+        for (name, megapixels, layout), kind, old, new in regressions:
+            print(f"{name:<46}{megapixels:>5g}{layout:>8}  {kind:<9}{old:>12}  {new}")
+    else:
+        print("Nenhuma regressão.")
+    return len(regressions)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = commands.add_parser('run', help="mede e grava o JSON")
+    run_parser.add_argument("--sizes", type=float, nargs="+", default=SIZES, help="megapixels")
+    run_parser.add_argument("--layouts", nargs="+", choices=list(LAYOUTS), default=list(LAYOUTS))
+    run_parser.add_argument("--only", nargs="+", help="só operações cujo nome contém um destes trechos")
+    run_parser.add_argument("--repeat", type=int, default=3)
+    run_parser.add_argument("--output", default="benchmark_results.json")
+
+    compare_parser = commands.add_parser('compare', help="compara um JSON com a base")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--tolerance", type=float, default=0.15,
+                                help="aumento relativo aceito (0.15 = 15%%)")
+    compare_parser.add_argument("--min-ms", type=float, default=1.0,
+                                help="diferenças de tempo menores que isso são ruído")
+    compare_parser.add_argument("--min-mb", type=float, default=1.0,
+                                help="aumentos de memória menores que isso são ignorados")
+
+    args = parser.parse_args()
+    if args.command == 'run':
+        sys.exit(run_suite(args.sizes, args.layouts, args.only, args.repeat, args.output))
+    sys.exit(1 if compare(args.baseline, args.current, args.tolerance, args.min_ms, args.min_mb) else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,49 +1,267 @@
+import inspect
+import threading
+import time
 from tkinter import Tk, filedialog, messagebox, simpledialog
-from models.model import Model
+from controllers.preview_scheduler import PreviewScheduler
+from models.operations import COMMANDS
+from models.profiler import profiler
 from views.view import View
 
+# Módulos que a janela não precisa para aparecer (OpenCV, NumPy, PIL)
+HEAVY_MODULES = ('models.model', 'models.image_loader', 'views.image_renderer')
+
+
+def _import_heavy_modules():
+    for name in HEAVY_MODULES:
+        __import__(name)
+
+
 class Controller:
+    # Intervalo para conferir se a decodificação em segundo plano terminou
+    LOAD_POLL_MS = 15
+    # Ações mais rápidas que isso não ganham linha de tempo no log
+    PROFILE_LOG_MS = 1.0
+    PROFILE_SUMMARY_ROWS = 12
+    # Ações cujo primeiro argumento é a chave de um comando do registro (vai no nome do span)
+    COMMAND_ACTIONS = ('run_command', 'apply_command')
+
     def __init__(self):
         self.root = Tk()
         self.root.title("PDI Studio - Sistema Interativo de Processamento de Imagens")
         self.root.geometry("1600x900")
 
-        # Model
-        self.model = Model()
+        # Cada ação da interface vira um span 'action' (antes da View guardar os métodos)
+        self._action_depth = 0
+        self._instrument_actions()
+
+        # Model e loader são criados no primeiro uso (ver ``model`` e ``loader``)
+        self._model = None
+        self._loader = None
 
         # View
         self.view = View(self.root, controller=self)
 
+        # Prévias dos sliders em segundo plano
+        self.preview = PreviewScheduler(self.root)
+
+        self.image_path = None
+        self._load_token = 0
+
+        # A proxy de pré-visualização acompanha o tamanho do painel
+        self.view.image_panel.frame.bind("<Configure>", self._on_viewport_resize)
+        self.view.image_panel.set_zoom_callback(self._on_zoom)
+
+        # Atalhos de desfazer/refazer
+        self.root.bind("<Control-z>", lambda event: self.undo())
+        self.root.bind("<Control-y>", lambda event: self.redo())
+        self.root.bind("<Control-Shift-Z>", lambda event: self.redo())
+        self.root.bind("<Next>", lambda event: self.open_next_image())
+        self.root.bind("<Prior>", lambda event: self.open_previous_image())
+
+        # Com a janela já desenhada, importa em segundo plano o que a primeira imagem vai usar
+        self.root.after_idle(self._warm_up)
+
     # ========== Métodos principais ==========
     def run(self):
         self.root.mainloop()
-    
-    def _get_resized_image(self, cv_image):
-        """Obtém uma versão redimensionada da imagem para exibição"""
-        max_width, max_height = self.view.image_panel._get_max_image_size()
-        return self.model.to_tk_image(cv_image, max_width, max_height)
 
-    def open_image(self):
-        path = filedialog.askopenfilename(
-            title="Selecione uma imagem",
-            filetypes=[("Arquivos de imagem", "*.png;*.jpg;*.jpeg;*.bmp")]
-        )
+    @property
+    def model(self):
+        if self._model is None:
+            from models.model import Model
+            self._model = Model()
+            # O histograma da view lê o mesmo cache dos models
+            self.view.control_panel.set_histogram_service(self._model.histograms)
+        return self._model
+
+    @property
+    def loader(self):
+        """Decodificação em segundo plano e pré-carregamento das imagens vizinhas"""
+        if self._loader is None:
+            from models.image_loader import ImageLoader
+            self._loader = ImageLoader()
+        return self._loader
+
+    def _warm_up(self):
+        threading.Thread(target=_import_heavy_modules, name='warm-up', daemon=True).start()
+
+    def _instrument_actions(self):
+        # Pela classe: ``getmembers`` na instância avaliaria as propriedades (e criaria o Model)
+        for name, _ in inspect.getmembers(type(self), inspect.isfunction):
+            if not name.startswith('_') and name != 'run':
+                setattr(self, name, self._timed_action(name, getattr(self, name)))
+
+    def _timed_action(self, name, method):
+        """Executa a ação dentro de um span; com o perfilamento ligado, o log mostra onde o tempo foi gasto"""
+        keyed = name in self.COMMAND_ACTIONS
+
+        def action(*args, **kwargs):
+            if not profiler.enabled:
+                return method(*args, **kwargs)
+            label = f"{name}:{args[0]}" if keyed and args else name
+            mark = profiler.mark()
+            start = time.perf_counter()
+            self._action_depth += 1
+            try:
+                with profiler.span('action', label):
+                    return method(*args, **kwargs)
+            finally:
+                self._action_depth -= 1
+                elapsed = (time.perf_counter() - start) * 1000
+                # Só a ação mais externa, e só as que custam algo (não cada tick de slider)
+                if self._action_depth == 0 and elapsed >= self.PROFILE_LOG_MS:
+                    self._log_timing(label, elapsed, mark)
+        action.__name__ = name
+        action.__doc__ = method.__doc__
+        return action
+
+    def _log_timing(self, name, elapsed, mark):
+        # Tempo exclusivo: o render não conta de novo os resize/convert que ele contém
+        totals = profiler.category_totals(since=mark, thread=threading.get_ident(), exclusive=True)
+        totals.pop('action', None)
+        parts = ", ".join(f"{category} {ms:.1f}" for category, ms in
+                          sorted(totals.items(), key=lambda item: item[1], reverse=True))
+        self.view.log_action(f"[tempo] {name}: {elapsed:.1f} ms" + (f" ({parts})" if parts else ""))
+
+    # ========== Perfilamento ==========
+    def set_profiling(self, enabled):
+        """Liga/desliga a medição de tempos das ações"""
+        profiler.enabled = enabled
+        self.view.log_action("Medição de tempos " + ("ligada." if enabled else "desligada."))
+
+    def show_profile_summary(self):
+        """Mostra no log os intervalos que mais consumiram tempo"""
+        rows = profiler.summary()
+        if not rows:
+            self.view.log_action("Nenhuma medição registrada.")
+            return
+        self.view.log_action("Tempos (total / média / máx., ms):")
+        for category, name, count, total, mean, peak in rows[:self.PROFILE_SUMMARY_ROWS]:
+            self.view.log_action(f"  {category}/{name} x{count}: {total:.1f} / {mean:.2f} / {peak:.1f}")
+
+    def export_profile_trace(self):
+        """Exporta as medições como trace do Chrome (chrome://tracing ou Perfetto)"""
+        path = filedialog.asksaveasfilename(defaultextension=".json", filetypes=[("Trace JSON", "*.json")])
+        if path:
+            profiler.export_chrome_trace(path)
+            self.view.log_action(f"Trace exportado: {path}")
+
+    def clear_profile(self):
+        profiler.clear()
+        self.view.log_action("Medições descartadas.")
+    
+    def _on_viewport_resize(self, event=None):
+        if self._model is None:
+            # Nenhuma imagem ainda: o viewport é ajustado ao abrir a primeira
+            return
+        if self.model.set_viewport(*self.view.image_panel._get_max_image_size()):
+            self.view.image_panel.show_original_image(self.model.original)
+            self._show_current()
+
+    def _on_zoom(self, zoom):
+        # Ampliando além da resolução da proxy: as prévias passam para a resolução cheia
+        if self.model.pending and zoom > self.model.proxy_scale:
+            self.commit_preview()
+
+    def _show_current(self):
+        self.view.image_panel.show_processed_image(self.model.current)
+        self._update_histogram()
+
+    def _update_histogram(self):
+        # Histograma compartilhado com os models (calculado uma vez por imagem)
+        self.view.control_panel.show_histogram_data(self.model.calculate_histogram())
+
+    def commit_preview(self):
+        """Aplica as prévias pendentes na resolução cheia"""
+        if self.model.pending:
+            self.preview.cancel()
+            self.model.commit()
+            self._show_current()
+            self.view.log_action("Prévias aplicadas em resolução total.")
+
+    def undo(self):
+        """Desfaz a última operação"""
+        self.preview.cancel()
+        label = self.model.undo()
+        if label is not None:
+            self._show_current()
+            self.view.log_action(f"Desfeito: {label}")
+
+    def redo(self):
+        """Refaz a última operação desfeita"""
+        self.preview.cancel()
+        label = self.model.redo()
+        if label is not None:
+            self._show_current()
+            self.view.log_action(f"Refeito: {label}")
+
+    def open_image(self, path=None):
+        """Abre ``path`` (ou pergunta qual) sem travar a interface.
+
+        A decodificação completa roda em segundo plano; enquanto isso um
+        JPEG aparece a partir de uma decodificação reduzida. Imagens
+        vizinhas já pré-carregadas abrem na hora.
+        """
+        if path is None:
+            path = filedialog.askopenfilename(
+                title="Selecione uma imagem",
+                filetypes=[("Arquivos de imagem", "*.png;*.jpg;*.jpeg;*.bmp")]
+            )
         if path:
-            # Carrega imagem original
-            original_image = self.model.load_image(path)
-            if original_image:
-                # Cria versões redimensionadas das imagens
-                original_resized = self._get_resized_image(self.model.original)
-                processed_resized = self._get_resized_image(self.model.processed)
-                
-                # Exibe imagem original e processada
-                self.view.image_panel.show_original_image(original_resized)
-                self.view.image_panel.show_processed_image(processed_resized)
-                
-                # Atualiza histograma
-                self.view.control_panel.update_histogram(self.model.processed)
-                
-                self.view.log_action(f"Imagem carregada: {path}")
+            self.preview.cancel()
+            # Um pedido novo invalida o carregamento que estiver em andamento
+            self._load_token += 1
+            future = self.loader.load(path)
+            if not future.done():
+                reduced = self.loader.preview(path, *self.view.image_panel._get_max_image_size())
+                if reduced is not None:
+                    self.view.image_panel.show_original_image(reduced)
+                    self.view.image_panel.show_processed_image(reduced)
+                self.view.log_action(f"Carregando: {path}")
+            self._wait_for_load(self._load_token, path, future)
+
+    def open_next_image(self):
+        """Abre a próxima imagem da pasta da imagem atual"""
+        self._open_adjacent(1)
+
+    def open_previous_image(self):
+        """Abre a imagem anterior da pasta da imagem atual"""
+        self._open_adjacent(-1)
+
+    def _open_adjacent(self, step):
+        from models.image_loader import adjacent_image
+        path = adjacent_image(self.image_path, step) if self.image_path else None
+        if path is not None:
+            self.open_image(path)
+
+    def _wait_for_load(self, token, path, future):
+        if token != self._load_token:
+            return
+        if not future.done():
+            self.root.after(self.LOAD_POLL_MS, self._wait_for_load, token, path, future)
+            return
+
+        # Carrega imagem original (a proxy é gerada no tamanho atual do painel)
+        self.model.set_viewport(*self.view.image_panel._get_max_image_size())
+        original_image = future.result()
+        if original_image is None:
+            # Volta a exibir a imagem anterior no lugar da prévia reduzida
+            self.view.image_panel.show_original_image(self.model.original)
+            self.view.image_panel.show_processed_image(self.model.current)
+            self.view.log_action(f"Não foi possível abrir: {path}")
+            return
+        self.model.load_image(path, original_image)
+        self.image_path = path
+
+        # Exibe imagem original e processada (renderizadas no tamanho do painel)
+        self.view.image_panel.show_original_image(self.model.original)
+        self.view.image_panel.show_processed_image(self.model.current)
+
+        # Atualiza histograma
+        self._update_histogram()
+
+        self.view.log_action(f"Imagem carregada: {path}")
+        self.loader.prefetch(self.loader.neighbors(path))
 
     def save_image(self):
         if self.model.processed is None:
@@ -54,272 +272,169 @@ class Controller:
             filetypes=[("PNG", "*.png"), ("JPEG", "*.jpg"), ("BMP", "*.bmp")]
         )
         if path:
+            self.preview.cancel()
             self.model.save_image(path)
+            self._show_current()
             self.view.log_action(f"Imagem salva em: {path}")
 
+    # ========== Receitas (models.recipe) ==========
+    def export_recipe(self):
+        """Grava as operações aplicadas como receita, para o batch.py repetir em uma pasta inteira"""
+        self.preview.cancel()
+        self.model.commit()
+        steps = self.model.steps
+        if not steps:
+            messagebox.showwarning("Aviso", "Nenhuma operação aplicada.")
+            return
+        path = filedialog.asksaveasfilename(
+            defaultextension=".json",
+            filetypes=[("Receita JSON", "*.json"), ("Receita YAML", "*.yaml;*.yml")]
+        )
+        if path:
+            from models.recipe import save_recipe
+            try:
+                save_recipe(path, steps)
+            except (OSError, ValueError) as exc:
+                messagebox.showerror("Erro", str(exc))
+                return
+            self._show_current()
+            self.view.log_action(f"Receita exportada ({len(steps)} passos): {path}")
+
+    def apply_recipe(self):
+        """Aplica os passos de uma receita à imagem atual"""
+        if self.model.processed is None:
+            messagebox.showwarning("Aviso", "Nenhuma imagem carregada.")
+            return
+        path = filedialog.askopenfilename(
+            title="Selecione uma receita",
+            filetypes=[("Receitas", "*.json;*.yaml;*.yml")]
+        )
+        if not path:
+            return
+        from models.recipe import load_recipe
+        try:
+            steps = load_recipe(path)
+        except (OSError, ValueError) as exc:
+            messagebox.showerror("Erro", str(exc))
+            return
+        import cv2
+        self.preview.cancel()
+        applied = 0
+        try:
+            for name, params in steps:
+                if self.model.apply(name, **params) is not None:
+                    applied += 1
+        except (ValueError, cv2.error) as exc:
+            # Nada de receita pela metade: volta ao estado de antes do primeiro passo
+            self.model.rollback(applied)
+            self._show_current()
+            message = f"Passo {applied + 1} de {len(steps)} ({name}): {str(exc).strip()}"
+            self.view.log_action(f"Receita não aplicada. {message}")
+            messagebox.showerror("Erro", message)
+            return
+        self._show_current()
+        self.view.log_action(f"Receita aplicada ({len(steps)} passos): {path}")
+
     def reset_image(self):
         """Reset imagem para estado original"""
         # Reset da imagem processada
-        self.model.reset_image()
-        
-        # Cria versões redimensionadas das imagens
-        original_resized = self._get_resized_image(self.model.original)
-        processed_resized = self._get_resized_image(self.model.processed)
-        
-        if original_resized and processed_resized:
-            self.view.image_panel.show_original_image(original_resized)
-            self.view.image_panel.show_processed_image(processed_resized)
-            self.view.control_panel.update_histogram(self.model.processed)
+        self.preview.cancel()
+        if self.model.reset_image() is not None:
+            self.view.image_panel.show_original_image(self.model.original)
+            self.view.image_panel.show_processed_image(self.model.current)
+            self._update_histogram()
             self.view.log_action("Imagem resetada para estado original.")
 
-    # ========== Conversões de Cores ==========
-    def convert_to_rgba(self):
-        result = self.model.convert_to_rgba()
-        if result:
-            resized_result = self._get_resized_image(self.model.processed)
-            self.view.image_panel.show_processed_image(resized_result)
-            self.view.control_panel.update_histogram(self.model.processed)
-            self.view.log_action("Conversão RGB → RGBA aplicada.")
-
-    def convert_to_cmyk(self):
-        result = self.model.convert_to_cmyk()
-        if result:
-            resized_result = self._get_resized_image(self.model.processed)
-            self.view.image_panel.show_processed_image(resized_result)
-            self.view.control_panel.update_histogram(self.model.processed)
-            self.view.log_action("Conversão RGB → CMYK aplicada.")
-
-    def convert_to_hsv(self):
-        result = self.model.convert_to_hsv()
-        if result:
-            resized_result = self._get_resized_image(self.model.processed)
-            self.view.image_panel.show_processed_image(resized_result)
-            self.view.control_panel.update_histogram(self.model.processed)
-            self.view.log_action("Conversão RGB → HSV aplicada.")
-
-    def convert_to_lab(self):
-        result = self.model.convert_to_lab()
-        if result:
-            resized_result = self._get_resized_image(self.model.processed)
-            self.view.image_panel.show_processed_image(resized_result)
-            self.view.control_panel.update_histogram(self.model.processed)
-            self.view.log_action("Conversão RGB → LAB aplicada.")
-
-    def convert_to_gray(self):
-        result = self.model.convert_to_gray()
-        if result:
-            resized_result = self._get_resized_image(self.model.processed)
-            self.view.image_panel.show_processed_image(resized_result)
-            self.view.control_panel.update_histogram(self.model.processed)
-            self.view.log_action("Conversão para tons de cinza aplicada.")
-
-    # ========== Ajustes de Histograma ==========
-    def apply_equalization(self):
-        result = self.model.equalize_histogram()
-        if result:
-            resized_result = self._get_resized_image(self.model.processed)
-            self.view.image_panel.show_processed_image(resized_result)
-            self.view.control_panel.update_histogram(self.model.processed)
-            self.view.log_action("Equalização de histograma aplicada.")
+    # ========== Operações do registro (models.operations) ==========
+    def run_command(self, key):
+        """Executa o comando ``key`` do menu, perguntando os parâmetros livres"""
+        command = COMMANDS[key]
+        params = {}
+        if command.params:
+            if self.model.processed is None:
+                messagebox.showwarning("Aviso", "Nenhuma imagem carregada.")
+                return
+            params = self._ask_params(command)
+            if params is None:
+                return
+        self.apply_command(key, **params)
+
+    def apply_command(self, key, **params):
+        """Aplica o comando ``key`` com ``params`` (os omitidos ficam com o padrão do registro)"""
+        command = COMMANDS[key]
+        params = command.resolve(params)
+        self.preview.cancel()
+        if self.model.apply(command.operation, **params) is not None:
+            self._show_current()
+            self.view.log_action(command.message.format(**params))
+
+    def _ask_params(self, command):
+        """Pergunta cada parâmetro livre em um diálogo; None se o usuário cancelar"""
+        params = {}
+        for param in command.params:
+            ask = simpledialog.askinteger if param.type is int else simpledialog.askfloat
+            minimum = params[param.minimum] if isinstance(param.minimum, str) else param.minimum
+            value = ask(command.label, param.prompt, minvalue=minimum, maxvalue=param.maximum,
+                        initialvalue=max(param.default, minimum) if minimum is not None else param.default)
+            if value is None:
+                return None
+            params[param.name] = value
+        return params
+
+    # ========== Sliders e painel de controles ==========
+    def _schedule_preview(self, name, **params):
+        """Processa a prévia em segundo plano; só o valor mais recente do slider é exibido"""
+        job, token = self.model.prepare_preview(name, replace=True, **params)
+        if job is None:
+            return
+
+        def work():
+            result = job()
+            return result, self.model.calculate_histogram(result)
+
+        def on_done(output):
+            result, histogram = output
+            # Descarta se outra ação (abrir, reset, menus) alterou a imagem nesse meio tempo
+            if not self.model.accept_preview(token, result):
+                return
+            with profiler.span('action', 'exibir prévia'):
+                # Filtro barato enquanto o slider se move; o painel refaz os blocos quando parar
+                self.view.image_panel.show_processed_image(result, interactive=True)
+                self.view.control_panel.show_histogram_data(histogram)
+
+        self.preview.submit(work, on_done)
 
     def update_brightness(self, brightness):
         """Atualiza brilho em tempo real - sempre a partir da imagem original"""
-        # Pega os valores atuais de contraste e threshold
+        # Pega o valor atual de contraste (1.0 equivale a só ajustar o brilho)
         contrast = self.view.control_panel.contrast_var.get()
-        
-        # Se contraste não está no padrão, aplica ambos
-        if contrast != 1.0:
-            result = self.model.adjust_brightness_contrast(brightness, contrast)
-        else:
-            result = self.model.adjust_brightness(brightness)
-        
-        if result:
-            resized_result = self._get_resized_image(self.model.processed)
-            self.view.image_panel.show_processed_image(resized_result)
-            self.view.control_panel.update_histogram(self.model.processed)
+        self._schedule_preview('adjust_brightness_contrast', brightness=brightness, contrast=contrast)
 
     def update_contrast(self, contrast):
         """Atualiza contraste em tempo real - sempre a partir da imagem original"""
-        # Pega os valores atuais de brilho
+        # Pega o valor atual de brilho (0 equivale a só ajustar o contraste)
         brightness = self.view.control_panel.brightness_var.get()
-        
-        # Se brilho não está no padrão, aplica ambos
-        if brightness != 0:
-            result = self.model.adjust_brightness_contrast(brightness, contrast)
-        else:
-            result = self.model.adjust_contrast(contrast)
-        
-        if result:
-            resized_result = self._get_resized_image(self.model.processed)
-            self.view.image_panel.show_processed_image(resized_result)
-            self.view.control_panel.update_histogram(self.model.processed)
+        self._schedule_preview('adjust_brightness_contrast', brightness=brightness, contrast=contrast)
 
     def apply_brightness_contrast(self, brightness, contrast):
-        """Aplica brilho e contraste simultaneamente"""
-        result = self.model.adjust_brightness_contrast(brightness, contrast)
-        if result:
-            self.view.image_panel.show_processed_image(result)
-            self.view.control_panel.update_histogram(self.model.processed)
+        """Aplica brilho e contraste simultaneamente, em resolução total"""
+        self.preview.cancel()
+        result = self.model.adjust_brightness_contrast(brightness, contrast, replace=True)
+        if result is not None:
+            self.model.commit()
+            self._show_current()
             self.view.log_action(f"Brilho: {brightness}, Contraste: {contrast} aplicados.")
 
     def update_threshold(self, threshold):
         """Atualiza threshold em tempo real - sempre a partir da imagem original"""
-        result = self.model.apply_binary_threshold(threshold)
-        if result:
-            resized_result = self._get_resized_image(self.model.processed)
-            self.view.image_panel.show_processed_image(resized_result)
-            self.view.control_panel.update_histogram(self.model.processed)
-
-    # ========== Diálogos de Ajuste ==========
-    def show_brightness_dialog(self):
-        brightness = simpledialog.askfloat("Ajustar Brilho", "Digite o valor de brilho (-100 a +100):", 
-                                          minvalue=-100, maxvalue=100, initialvalue=0)
-        if brightness is not None:
-            result = self.model.adjust_brightness(brightness)
-            if result:
-                resized_result = self._get_resized_image(self.model.processed)
-                self.view.image_panel.show_processed_image(resized_result)
-                self.view.control_panel.update_histogram(self.model.processed)
-                self.view.log_action(f"Brilho ajustado para: {brightness}")
-
-    def show_contrast_dialog(self):
-        contrast = simpledialog.askfloat("Ajustar Contraste", "Digite o valor de contraste (0.5 a 3.0):", 
-                                       minvalue=0.5, maxvalue=3.0, initialvalue=1.0)
-        if contrast is not None:
-            result = self.model.adjust_contrast(contrast)
-            if result:
-                resized_result = self._get_resized_image(self.model.processed)
-                self.view.image_panel.show_processed_image(resized_result)
-                self.view.control_panel.update_histogram(self.model.processed)
-                self.view.log_action(f"Contraste ajustado para: {contrast}")
-
-    def show_brightness_contrast_dialog(self):
-        brightness = simpledialog.askfloat("Ajustar Brilho", "Digite o valor de brilho (-100 a +100):", 
-                                          minvalue=-100, maxvalue=100, initialvalue=0)
-        if brightness is not None:
-            contrast = simpledialog.askfloat("Ajustar Contraste", "Digite o valor de contraste (0.5 a 3.0):", 
-                                           minvalue=0.5, maxvalue=3.0, initialvalue=1.0)
-            if contrast is not None:
-                result = self.model.adjust_brightness_contrast(brightness, contrast)
-                if result:
-                    resized_result = self._get_resized_image(self.model.processed)
-                    self.view.image_panel.show_processed_image(resized_result)
-                    self.view.control_panel.update_histogram(self.model.processed)
-                    self.view.log_action(f"Brilho: {brightness}, Contraste: {contrast} aplicados.")
-
-    def show_binary_threshold_dialog(self):
-        threshold = simpledialog.askinteger("Limiarização Binária", "Digite o valor de threshold (0 a 255):", 
-                                           minvalue=0, maxvalue=255, initialvalue=128)
-        if threshold is not None:
-            result = self.model.apply_binary_threshold(threshold)
-            if result:
-                resized_result = self._get_resized_image(self.model.processed)
-                self.view.image_panel.show_processed_image(resized_result)
-                self.view.control_panel.update_histogram(self.model.processed)
-                self.view.log_action(f"Limiarização binária aplicada com threshold: {threshold}")
-
-    # ========== Operações de Limiarização ==========
-    def apply_otsu_threshold(self):
-        result = self.model.apply_otsu_threshold()
-        if result:
-            resized_result = self._get_resized_image(self.model.processed)
-            self.view.image_panel.show_processed_image(resized_result)
-            self.view.control_panel.update_histogram(self.model.processed)
-            self.view.log_action("Limiarização Otsu aplicada.")
-
-    def apply_adaptive_threshold_mean(self):
-        result = self.model.apply_adaptive_threshold('mean')
-        if result:
-            resized_result = self._get_resized_image(self.model.processed)
-            self.view.image_panel.show_processed_image(resized_result)
-            self.view.control_panel.update_histogram(self.model.processed)
-            self.view.log_action("Limiarização adaptativa (média) aplicada.")
-
-    def apply_adaptive_threshold_gaussian(self):
-        result = self.model.apply_adaptive_threshold('gaussian')
-        if result:
-            resized_result = self._get_resized_image(self.model.processed)
-            self.view.image_panel.show_processed_image(resized_result)
-            self.view.control_panel.update_histogram(self.model.processed)
-            self.view.log_action("Limiarização adaptativa (Gaussiana) aplicada.")
+        self._schedule_preview('apply_binary_threshold', threshold_value=threshold)
 
     # ========== Métodos de compatibilidade ==========
     def apply_gray(self):
-        self.convert_to_gray()
+        self.apply_command('gray')
 
     def display_image(self, image):
         self.view.image_panel.show_processed_image(image)
 
     def log_action(self, text):
         self.view.control_panel.add_log(text)
-
-    # ========== Quantização em tons de cinza ==========
-    def apply_quantize_gray(self, num_levels=None):
-        if num_levels is None and hasattr(self.view.control_panel, 'num_levels_var'):
-            num_levels = self.view.control_panel.num_levels_var.get()
-        if num_levels is None:
-            num_levels = 4
-
-        result = self.model.apply_quantize_threshold(num_levels)
-        if result:
-            resized_result = self._get_resized_image(self.model.processed)
-            self.view.image_panel.show_processed_image(resized_result)
-            self.view.control_panel.update_histogram(self.model.processed)
-            self.view.log_action(f"Quantização em tons de cinza aplicada (N={num_levels}).")
-
-    # ========== Detecção de Bordas ==========
-    def show_sobel_dialog(self):
-        if self.model.processed is None:
-            messagebox.showwarning("Aviso", "Nenhuma imagem carregada.")
-            return
-        ksize = simpledialog.askinteger("Sobel", "Tamanho do kernel (1,3,5,7):", minvalue=1, maxvalue=7, initialvalue=3)
-        if ksize is None:
-            return
-        if ksize % 2 == 0:
-            ksize += 1
-        result = self.model.apply_sobel(ksize=ksize)
-        if result:
-            resized_result = self._get_resized_image(self.model.processed)
-            self.view.image_panel.show_processed_image(resized_result)
-            self.view.control_panel.update_histogram(self.model.processed)
-            self.view.log_action(f"Sobel aplicado (ksize={ksize}).")
-
-    def show_laplacian_dialog(self):
-        if self.model.processed is None:
-            messagebox.showwarning("Aviso", "Nenhuma imagem carregada.")
-            return
-        ksize = simpledialog.askinteger("Laplaciano", "Tamanho do kernel (1,3,5,7):", minvalue=1, maxvalue=7, initialvalue=3)
-        if ksize is None:
-            return
-        if ksize % 2 == 0:
-            ksize += 1
-        result = self.model.apply_laplacian(ksize=ksize)
-        if result:
-            resized_result = self._get_resized_image(self.model.processed)
-            self.view.image_panel.show_processed_image(resized_result)
-            self.view.control_panel.update_histogram(self.model.processed)
-            self.view.log_action(f"Laplaciano aplicado (ksize={ksize}).")
-
-    def show_canny_dialog(self):
-        if self.model.processed is None:
-            messagebox.showwarning("Aviso", "Nenhuma imagem carregada.")
-            return
-        t1 = simpledialog.askinteger("Canny", "Threshold1 (0-255):", minvalue=0, maxvalue=255, initialvalue=100)
-        if t1 is None:
-            return
-        t2 = simpledialog.askinteger("Canny", "Threshold2 (0-255):", minvalue=0, maxvalue=255, initialvalue=200)
-        if t2 is None:
-            return
-        if t2 < t1:
-            t2 = t1
-        k = simpledialog.askinteger("Canny", "Gaussian blur ksize (1,3,5,7):", minvalue=1, maxvalue=7, initialvalue=3)
-        if k is None:
-            return
-        if k % 2 == 0:
-            k += 1
-        result = self.model.apply_canny(threshold1=t1, threshold2=t2, blur_ksize=k)
-        if result:
-            resized_result = self._get_resized_image(self.model.processed)
-            self.view.image_panel.show_processed_image(resized_result)
-            self.view.control_panel.update_histogram(self.model.processed)
-            self.view.log_action(f"Canny aplicado (t1={t1}, t2={t2}, blur={k}).")
\ No newline at end of file
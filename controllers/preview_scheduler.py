@@ -0,0 +1,68 @@
+from concurrent.futures import ThreadPoolExecutor
+
+
+class PreviewScheduler:
+    """Agenda prévias interativas (sliders) fora da thread do Tk.
+
+    - Eventos que chegam dentro de ``delay_ms`` são agrupados em um só.
+    - Só existe um processamento em andamento; pedidos que chegam nesse
+      meio tempo substituem o pendente (os intermediários são descartados).
+    - O resultado volta para a thread do Tk via ``root.after`` e só é
+      entregue se ainda for o pedido mais recente.
+    """
+
+    def __init__(self, root, delay_ms=30, poll_ms=10):
+        self.root = root
+        self.delay_ms = delay_ms
+        self.poll_ms = poll_ms
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="preview")
+        self._generation = 0
+        self._pending = None      # (geração, job, on_done) aguardando despacho
+        self._running = None      # (geração, future, on_done) em processamento
+        self._after_id = None
+
+    def submit(self, job, on_done):
+        """Agenda ``job()`` em segundo plano e entrega o retorno a ``on_done`` na thread do Tk"""
+        self._generation += 1
+        self._pending = (self._generation, job, on_done)
+        if self._after_id is None and self._running is None:
+            self._after_id = self.root.after(self.delay_ms, self._dispatch)
+
+    def cancel(self):
+        """Descarta o pedido pendente e o resultado do que estiver em andamento"""
+        self._generation += 1
+        self._pending = None
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+
+    def shutdown(self):
+        self.cancel()
+        self._executor.shutdown(wait=False)
+
+    def _dispatch(self):
+        self._after_id = None
+        if self._pending is None or self._running is not None:
+            return
+        generation, job, on_done = self._pending
+        self._pending = None
+        self._running = (generation, self._executor.submit(job), on_done)
+        self.root.after(self.poll_ms, self._poll)
+
+    def _poll(self):
+        generation, future, on_done = self._running
+        if not future.done():
+            self.root.after(self.poll_ms, self._poll)
+            return
+        self._running = None
+
+        # Só entrega se nenhum pedido mais novo chegou enquanto processava
+        if generation == self._generation:
+            error = future.exception()
+            if error is not None:
+                self.root.report_callback_exception(type(error), error, error.__traceback__)
+            else:
+                on_done(future.result())
+
+        if self._pending is not None:
+            self._dispatch()
@@ -1,10 +1,29 @@
+from collections import deque
+
 import cv2
 import numpy as np
-from PIL import Image, ImageTk
+
+from models.parallel import StripExecutor
+
+# Conversões em lote: nome → (código do cv2.cvtColor, canais da saída); 'cmyk' usa rgb_to_cmyk
+BATCH_CONVERSIONS = {
+    'gray': (cv2.COLOR_BGR2GRAY, 1),
+    'hsv': (cv2.COLOR_BGR2HSV, 3),
+    'lab': (cv2.COLOR_BGR2LAB, 3),
+    'rgb': (cv2.COLOR_BGR2RGB, 3),
+    'rgba': (cv2.COLOR_BGR2BGRA, 4),
+    'cmyk': (None, 4),
+    'hsv_to_bgr': (cv2.COLOR_HSV2BGR, 3),
+    'lab_to_bgr': (cv2.COLOR_LAB2BGR, 3),
+    'gray_to_bgr': (cv2.COLOR_GRAY2BGR, 3),
+}
 
 class ColorModel:
-    def __init__(self):
-        pass
+    def __init__(self, derived=None, executor=None):
+        # Cache de representações (models.derived_images.DerivedImages); None = converte sempre
+        self.derived = derived
+        # Pool das conversões em lote (models.parallel.StripExecutor); criado no primeiro lote se None
+        self.executor = executor
 
     def rgb_to_rgba(self, image):
         """Converte imagem RGB para RGBA adicionando canal alpha"""
@@ -21,44 +40,71 @@ class ColorModel:
             return image[:, :, :3]
         return image
 
-    def rgb_to_cmyk(self, image):
-        """Converte imagem RGB para CMYK"""
+    def rgb_to_cmyk(self, image, out=None, dtype=np.uint8):
+        """Converte imagem BGR (ordem do OpenCV) para CMYK, canais na ordem C, M, Y, K.
+
+        Com ``dtype=np.uint8`` (padrão) a conversão é só em aritmética de 8
+        bits: K = 255 - max e C = 255 * (max - R) / max, com as operações
+        saturadas do OpenCV. Com ``dtype=np.float32`` os valores ficam em
+        0..1, sem quantização. ``out`` (H x W x 4) recebe o resultado sem
+        alocar uma imagem nova; os temporários são só planos de um canal.
+        """
         if len(image.shape) == 3 and image.shape[2] == 3:
-            # Normaliza para 0-1
-            rgb = image.astype(np.float32) / 255.0
-            
-            # Calcula CMYK
-            k = 1 - np.max(rgb, axis=2)
-            c = (1 - rgb[:, :, 0] - k) / (1 - k + 1e-8)
-            m = (1 - rgb[:, :, 1] - k) / (1 - k + 1e-8)
-            y = (1 - rgb[:, :, 2] - k) / (1 - k + 1e-8)
-            
-            # Converte de volta para 0-255
-            cmyk = np.stack([c, m, y, k], axis=2)
-            cmyk = np.clip(cmyk * 255, 0, 255).astype(np.uint8)
-            return cmyk
+            if np.dtype(dtype) == np.float32:
+                return self._bgr_to_cmyk_float(image, out)
+            blue, green, red = cv2.split(image)
+            max_value = cv2.max(cv2.max(blue, green), red)
+            # (max - canal) / max em cada plano, no próprio plano; divisão por 0 dá 0 no OpenCV
+            for plane in (red, green, blue):
+                cv2.subtract(max_value, plane, dst=plane)
+                cv2.divide(plane, max_value, dst=plane, scale=255)
+            black = cv2.bitwise_not(max_value, dst=max_value)
+            return cv2.merge([red, green, blue, black], dst=out)
         return image
 
-    def cmyk_to_rgb(self, image):
-        """Converte imagem CMYK para RGB"""
+    def _bgr_to_cmyk_float(self, image, out):
+        planes = cv2.split(image)
+        max_value = cv2.max(cv2.max(planes[0], planes[1]), planes[2]).astype(np.float32)
+        # 1 / max; em pixels pretos (max = 0) o numerador também é 0, então qualquer divisor serve
+        inverse = cv2.divide(1.0, cv2.max(max_value, 1.0))
+        channels = []
+        for index in (2, 1, 0):
+            # C, M, Y = (max - canal) / max
+            plane = cv2.subtract(max_value, planes[index], dtype=cv2.CV_32F)
+            channels.append(cv2.multiply(plane, inverse, dst=plane))
+        # K = 1 - max / 255, no próprio plano do máximo
+        max_value *= np.float32(-1 / 255)
+        max_value += 1
+        return cv2.merge(channels + [max_value], dst=out)
+
+    def cmyk_to_rgb(self, image, out=None):
+        """Converte imagem CMYK (C, M, Y, K; uint8 ou float32 em 0..1) para BGR uint8.
+
+        B = 255 * (1 - Y) * (1 - K), e assim por diante; ``out`` (H x W x 3)
+        recebe o resultado.
+        """
         if len(image.shape) == 3 and image.shape[2] == 4:
-            # Normaliza para 0-1
-            cmyk = image.astype(np.float32) / 255.0
-            
-            # Calcula RGB
-            r = (1 - cmyk[:, :, 0]) * (1 - cmyk[:, :, 3])
-            g = (1 - cmyk[:, :, 1]) * (1 - cmyk[:, :, 3])
-            b = (1 - cmyk[:, :, 2]) * (1 - cmyk[:, :, 3])
-            
-            # Converte de volta para 0-255
-            rgb = np.stack([r, g, b], axis=2)
-            rgb = np.clip(rgb * 255, 0, 255).astype(np.uint8)
-            return rgb
+            planes = list(cv2.split(image))
+            if image.dtype == np.uint8:
+                white = cv2.bitwise_not(planes[3])
+                for plane in planes[:3]:
+                    cv2.bitwise_not(plane, dst=plane)
+                    cv2.multiply(plane, white, dst=plane, scale=1 / 255)
+            else:
+                white = np.subtract(1, planes[3], dtype=np.float32)
+                for i, plane in enumerate(planes[:3]):
+                    np.subtract(1, plane, out=plane)
+                    plane *= white
+                    planes[i] = cv2.convertScaleAbs(plane, alpha=255)
+            cyan, magenta, yellow = planes[:3]
+            return cv2.merge([yellow, magenta, cyan], dst=out)
         return image
 
     def rgb_to_hsv(self, image):
         """Converte imagem RGB para HSV"""
         if len(image.shape) == 3 and image.shape[2] == 3:
+            if self.derived is not None:
+                return self.derived.hsv(image)
             return cv2.cvtColor(image, cv2.COLOR_BGR2HSV)
         return image
 
@@ -71,6 +117,8 @@ class ColorModel:
     def rgb_to_lab(self, image):
         """Converte imagem RGB para LAB"""
         if len(image.shape) == 3 and image.shape[2] == 3:
+            if self.derived is not None:
+                return self.derived.lab(image)
             return cv2.cvtColor(image, cv2.COLOR_BGR2LAB)
         return image
 
@@ -83,20 +131,88 @@ class ColorModel:
     def rgb_to_gray(self, image):
         """Converte imagem RGB para tons de cinza"""
         if len(image.shape) == 3:
-            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+            gray = self.derived.gray(image) if self.derived is not None else cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
             # Converte de volta para 3 canais para manter consistência
             return cv2.cvtColor(gray, cv2.COLOR_GRAY2BGR)
         return image
 
-    def to_tk_image(self, cv_image):
-        """Converte imagem OpenCV para formato Tkinter"""
-        if len(cv_image.shape) == 3:
-            if cv_image.shape[2] == 4:  # RGBA
-                rgb = cv2.cvtColor(cv_image, cv2.COLOR_BGRA2RGB)
-            else:  # RGB
-                rgb = cv2.cvtColor(cv_image, cv2.COLOR_BGR2RGB)
-        else:  # Grayscale
-            rgb = cv_image
-        
-        img = Image.fromarray(rgb)
-        return ImageTk.PhotoImage(img)
+    # ========== Conversão em lote ==========
+    def convert_batch(self, images, conversion, out=None, in_flight=None):
+        """Converte uma pilha de imagens BGR (lista ou array N x H x W x C) no pool de workers.
+
+        ``conversion`` é uma chave de BATCH_CONVERSIONS ('gray', 'hsv',
+        'lab', 'cmyk'...). Para um array o resultado é um array N x H x W x C'
+        ('gray' dá N x H x W); para uma lista, uma lista. Cada imagem é
+        convertida direto na sua posição de ``out``, que pode ser passado
+        para reaproveitar a saída entre chamadas.
+        """
+        convert, channels = self._batch_conversion(conversion)
+        if out is None:
+            if isinstance(images, np.ndarray):
+                out = np.empty((len(images),) + self._batch_shape(images.shape[1:], channels), images.dtype)
+            else:
+                out = [np.empty(self._batch_shape(image.shape, channels), image.dtype) for image in images]
+        elif len(out) != len(images):
+            raise ValueError(f"out tem {len(out)} imagens, a entrada tem {len(images)}")
+        outputs = iter(out)
+        for _ in self._convert_stream(images, convert, lambda image: next(outputs), in_flight):
+            pass
+        return out
+
+    def iter_convert(self, images, conversion, in_flight=None, reuse_buffers=False):
+        """Gerador: converte as imagens de qualquer iterável, na ordem, sem carregar a sequência inteira.
+
+        No máximo ``in_flight`` imagens (padrão: 2 por worker) ficam em
+        conversão ao mesmo tempo, então a memória não cresce com o tamanho
+        da sequência. Com ``reuse_buffers=True`` as saídas são recicladas: cada
+        imagem devolvida só vale até o próximo ``next()`` (copie-a para guardar).
+        """
+        convert, channels = self._batch_conversion(conversion)
+        free = {}   # (formato, dtype) → buffers de saída livres
+
+        def output_for(image):
+            key = (self._batch_shape(image.shape, channels), image.dtype)
+            buffers = free.get(key)
+            return buffers.pop() if buffers else np.empty(*key)
+
+        for result in self._convert_stream(images, convert, output_for, in_flight):
+            yield result
+            if reuse_buffers:
+                # O consumidor já pediu a próxima: o buffer volta para o pool
+                free.setdefault((result.shape, result.dtype), []).append(result)
+
+    def _batch_conversion(self, conversion):
+        if conversion not in BATCH_CONVERSIONS:
+            raise ValueError(f"Conversão desconhecida: {conversion}")
+        code, channels = BATCH_CONVERSIONS[conversion]
+        if code is None:
+            return (lambda image, out: self.rgb_to_cmyk(image, out=out)), channels
+        return (lambda image, out: cv2.cvtColor(image, code, dst=out)), channels
+
+    @staticmethod
+    def _batch_shape(shape, channels):
+        return tuple(shape[:2]) if channels == 1 else tuple(shape[:2]) + (channels,)
+
+    def _convert_stream(self, images, convert, output_for, in_flight):
+        """Envia as conversões ao pool mantendo no máximo ``in_flight`` pendentes; devolve na ordem"""
+        if self.executor is None:
+            self.executor = StripExecutor()
+        in_flight = in_flight or 2 * self.executor.workers
+        pending = deque()
+        images = iter(images)
+
+        def run(image, out):
+            result = convert(image, out)
+            if result is not out:
+                out[...] = result
+            return out
+
+        while True:
+            while len(pending) < in_flight:
+                image = next(images, None)
+                if image is None:
+                    break
+                pending.append(self.executor.submit(run, image, output_for(image)))
+            if not pending:
+                return
+            yield pending.popleft().result()
@@ -0,0 +1,123 @@
+import threading
+import weakref
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+
+
+def _expand(image):
+    """BGR com os três canais iguais a partir de uma imagem em cinza"""
+    return cv2.cvtColor(image, cv2.COLOR_GRAY2BGR) if len(image.shape) == 2 else image
+
+
+# tipo → função(imagem) que calcula a representação; imagens em cinza (2D)
+# passam direto pelas conversões que partem de BGR
+CONVERSIONS = {
+    'gray': lambda image: cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if len(image.shape) == 3 else image,
+    'bgr': _expand,
+    'hsv': lambda image: cv2.cvtColor(_expand(image), cv2.COLOR_BGR2HSV),
+    'lab': lambda image: cv2.cvtColor(_expand(image), cv2.COLOR_BGR2LAB),
+    'float32': lambda image: image.astype(np.float32),
+}
+
+
+class DerivedImages:
+    """Representações derivadas de uma imagem (cinza, BGR, HSV, LAB, float32), calculadas uma vez.
+
+    Limiarização, bordas e conversões pedem a versão em cinza da mesma
+    imagem várias vezes; aqui ela é convertida uma única vez e
+    compartilhada. Como em HistogramService, a identidade do array é a
+    versão da imagem (as operações nunca alteram arrays no lugar) e as
+    entradas guardam só uma referência fraca à origem; quem alterar uma
+    imagem no lugar deve chamar ``invalidate``. O total guardado é limitado
+    por ``max_bytes`` (as menos usadas saem primeiro).
+
+    Imagens em cinza ficam com um canal só dentro do Model e viram BGR
+    apenas quando necessário (``bgr``); a expansão já registra a própria
+    imagem em cinza como sua versão ``gray``, sem reconverter.
+    """
+
+    def __init__(self, max_bytes=256 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        # (tipo, id) → (ref. fraca da origem, representação, bytes); a representação
+        # também é uma ref. fraca quando é uma imagem que já existe fora do cache
+        self._entries = OrderedDict()
+        self._lock = threading.RLock()
+
+    def _lookup(self, kind, image):
+        key = (kind, id(image))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0]() is not image:
+                return None
+            value = entry[1]() if isinstance(entry[1], weakref.ref) else entry[1]
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def _store(self, kind, image, value, weak=False):
+        if value is image:
+            # Representação idêntica à origem (ex.: cinza de uma imagem 2D): nada a guardar
+            return value
+        key = (kind, id(image))
+        entries = self._entries
+
+        def forget(_, key=key):
+            with self._lock:
+                entry = entries.get(key)
+                if entry is not None and entry[0]() is None:
+                    self._drop(key)
+
+        with self._lock:
+            self._drop(key)
+            nbytes = 0 if weak else value.nbytes
+            entries[key] = (weakref.ref(image, forget), weakref.ref(value) if weak else value, nbytes)
+            self.nbytes += nbytes
+            while self.nbytes > self.max_bytes and len(entries) > 1:
+                self._drop(next(iter(entries)))
+        return value
+
+    def _drop(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.nbytes -= entry[2]
+
+    def get(self, kind, image):
+        """Representação ``kind`` da imagem, do cache quando possível"""
+        if image is None:
+            return None
+        value = self._lookup(kind, image)
+        if value is None:
+            value = self._store(kind, image, CONVERSIONS[kind](image))
+            if kind == 'bgr' and value is not image:
+                # A expansão aponta de volta para a imagem em cinza sem mantê-la viva
+                self._store('gray', value, image, weak=True)
+        return value
+
+    def gray(self, image):
+        return self.get('gray', image)
+
+    def bgr(self, image):
+        return self.get('bgr', image)
+
+    def hsv(self, image):
+        return self.get('hsv', image)
+
+    def lab(self, image):
+        return self.get('lab', image)
+
+    def float32(self, image):
+        return self.get('float32', image)
+
+    def invalidate(self, image):
+        """Descarta as representações de uma imagem alterada no lugar"""
+        with self._lock:
+            for kind in CONVERSIONS:
+                self._drop((kind, id(image)))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
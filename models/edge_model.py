@@ -1,37 +1,134 @@
+import threading
+
 import cv2
 import numpy as np
 
+_SOBEL_DTYPES = {cv2.CV_16S: np.int16, cv2.CV_32F: np.float32, cv2.CV_64F: np.float64}
+
 
 class EdgeModel:
-    def __init__(self):
-        pass
+    def __init__(self, executor=None, low_memory=False, l1_magnitude=False, derived=None):
+        # Executor de faixas em paralelo (models.parallel.StripExecutor); None = serial
+        self.executor = executor
+        # Cache de representações (models.derived_images.DerivedImages) compartilhado com ThresholdModel
+        self.derived = derived
+        # Sobel em CV_32F/CV_16S com buffers reaproveitados em vez de vários arrays float64
+        self.low_memory = low_memory
+        # Magnitude aproximada por |dx| + |dy| (sem raiz quadrada)
+        self.l1_magnitude = l1_magnitude
+        # Buffers do modo de pouca memória, um conjunto por thread (prévias rodam em outra thread);
+        # os conjuntos de todas as threads ficam listados para release_buffers
+        self._local = threading.local()
+        self._thread_buffers = []
+        self._lock = threading.Lock()
+
+    def _buffer(self, name, shape, dtype):
+        """Buffer reaproveitado entre chamadas; só é realocado quando o formato muda"""
+        buffers = getattr(self._local, 'buffers', None)
+        if buffers is None:
+            buffers = self._local.buffers = {}
+            with self._lock:
+                self._thread_buffers.append(buffers)
+        buffer = buffers.get(name)
+        if buffer is None or buffer.shape != shape or buffer.dtype != dtype:
+            buffer = buffers[name] = np.empty(shape, dtype)
+        return buffer
+
+    def _map(self, func, image, halo):
+        if self.executor is None:
+            return func(image)
+        return self.executor.map(func, image, halo)
+
+    def release_buffers(self):
+        """Libera os buffers do modo de pouca memória de todas as threads (ex.: ao trocar de imagem)"""
+        with self._lock:
+            for buffers in self._thread_buffers:
+                buffers.clear()
 
     def _to_gray(self, image_bgr: np.ndarray) -> np.ndarray:
         if image_bgr is None:
             return None
         if len(image_bgr.shape) == 2:
             return image_bgr
+        if self.derived is not None:
+            return self.derived.gray(image_bgr)
         return cv2.cvtColor(image_bgr, cv2.COLOR_BGR2GRAY)
 
-    def detect_sobel_edges(self, image_bgr: np.ndarray, ksize: int = 3) -> np.ndarray:
-        gray = self._to_gray(image_bgr)
-        if gray is None:
+    def detect_sobel_edges(self, image_bgr: np.ndarray, ksize: int = 3, low_memory: bool = None,
+                           l1_magnitude: bool = None) -> np.ndarray:
+        if image_bgr is None:
             return None
+        low_memory = self.low_memory if low_memory is None else low_memory
+        l1_magnitude = self.l1_magnitude if l1_magnitude is None else l1_magnitude
+        halo = max(1, ksize // 2)
+        if low_memory or l1_magnitude:
+            return self._sobel_edges_low_memory(image_bgr, ksize, low_memory, l1_magnitude, halo)
+        mag = self._map(lambda strip: self.sobel_magnitude(strip, ksize), self._to_gray(image_bgr), halo)
+        max_value = mag.max()
+        return self._map(lambda strip: self.normalize_magnitude(strip, max_value), mag, 0)
+
+    def sobel_magnitude(self, gray: np.ndarray, ksize: int = 3) -> np.ndarray:
+        if self.low_memory or self.l1_magnitude:
+            # No modo da instância (ex.: nos blocos do models.tiled), sem os buffers compartilhados
+            depth = self._sobel_depth(ksize, self.low_memory, self.l1_magnitude)
+            return self._sobel_magnitude_into(gray, ksize, depth, self.l1_magnitude)
         dx = cv2.Sobel(gray, cv2.CV_64F, 1, 0, ksize=ksize)
         dy = cv2.Sobel(gray, cv2.CV_64F, 0, 1, ksize=ksize)
-        mag = cv2.magnitude(dx, dy)
-        mag = np.uint8(np.clip(mag / (mag.max() + 1e-8) * 255.0, 0, 255))
-        return mag
+        return cv2.magnitude(dx, dy)
 
-    def detect_laplacian_edges(self, image_bgr: np.ndarray, ksize: int = 3) -> np.ndarray:
+    def normalize_magnitude(self, mag: np.ndarray, max_value: float) -> np.ndarray:
+        # Separado de detect_sobel_edges para que o máximo possa ser global (ex.: em blocos)
+        if self.low_memory or self.l1_magnitude:
+            # Arredonda como _sobel_edges_low_memory: os blocos dão o mesmo resultado que a imagem inteira
+            return cv2.convertScaleAbs(mag, alpha=255.0 / (max_value + 1e-8))
+        return np.uint8(np.clip(mag / (max_value + 1e-8) * 255.0, 0, 255))
+
+    def _sobel_edges_low_memory(self, image_bgr, ksize, low_memory, l1_magnitude, halo):
+        """Sobel sem temporários float64: dx/dy em CV_32F (CV_16S com |dx|+|dy| e ksize <= 5,
+        onde não há saturação), magnitude no próprio buffer de dx e normalização direto para uint8"""
+        depth = self._sobel_depth(ksize, low_memory, l1_magnitude)
         gray = self._to_gray(image_bgr)
-        if gray is None:
+        if self.executor is not None and len(self.executor.strips(gray.shape[0])) > 1:
+            mag = self._buffer('mag', gray.shape, _SOBEL_DTYPES[depth])
+            self.executor.map(lambda strip: self._sobel_magnitude_into(strip, ksize, depth, l1_magnitude),
+                              gray, halo, out=mag)
+        else:
+            mag = self._sobel_magnitude_into(gray, ksize, depth, l1_magnitude, reuse=True)
+        max_value = cv2.minMaxLoc(mag)[1]
+        # Arredonda (em vez de truncar como normalize_magnitude) sem criar temporários
+        return cv2.convertScaleAbs(mag, np.empty(gray.shape, np.uint8), 255.0 / (max_value + 1e-8))
+
+    def _sobel_depth(self, ksize, low_memory, l1_magnitude):
+        if not low_memory:
+            return cv2.CV_64F
+        if l1_magnitude and ksize <= 5:
+            return cv2.CV_16S
+        return cv2.CV_32F
+
+    def _sobel_magnitude_into(self, gray, ksize, depth, l1_magnitude, reuse=False):
+        dtype = _SOBEL_DTYPES[depth]
+        dx = self._buffer('dx', gray.shape, dtype) if reuse else None
+        dy = self._buffer('dy', gray.shape, dtype) if reuse else None
+        dx = cv2.Sobel(gray, depth, 1, 0, dst=dx, ksize=ksize)
+        dy = cv2.Sobel(gray, depth, 0, 1, dst=dy, ksize=ksize)
+        if l1_magnitude:
+            np.abs(dx, out=dx)
+            np.abs(dy, out=dy)
+            return np.add(dx, dy, out=dx)
+        return cv2.magnitude(dx, dy, dx)
+
+    def detect_laplacian_edges(self, image_bgr: np.ndarray, ksize: int = 3) -> np.ndarray:
+        if image_bgr is None:
             return None
+        return self._map(lambda strip: self._laplacian(strip, ksize), self._to_gray(image_bgr), max(1, ksize // 2))
+
+    def _laplacian(self, gray: np.ndarray, ksize: int) -> np.ndarray:
         lap = cv2.Laplacian(gray, cv2.CV_64F, ksize=ksize)
         edges = cv2.convertScaleAbs(lap)
         return edges
 
-    def detect_canny_edges(self, image_bgr: np.ndarray, threshold1: int = 100, threshold2: int = 200, blur_ksize: int = 3) -> np.ndarray:
+    def detect_canny_edges(self, image_bgr: np.ndarray, threshold1: int = 100, threshold2: int = 200, blur_ksize: int = 3,
+                           sparse: bool = False) -> np.ndarray:
         gray = self._to_gray(image_bgr)
         if gray is None:
             return None
@@ -41,20 +138,54 @@ class EdgeModel:
                 k += 1
             gray = cv2.GaussianBlur(gray, (k, k), 0)
         edges = cv2.Canny(gray, threshold1, threshold2)
-        return edges
+        # Bordas do Canny são finas: as coordenadas ocupam bem menos que a máscara inteira
+        return self.edge_coordinates(edges) if sparse else edges
 
-    def overlay_edges_on_image(self, image_bgr: np.ndarray, edges_uint8: np.ndarray, color=(0, 0, 255), alpha: float = 0.8) -> np.ndarray:
+    def edge_coordinates(self, edges_uint8: np.ndarray) -> np.ndarray:
+        """Representação esparsa das bordas: índices (linha * largura + coluna) dos pixels não nulos"""
+        indices = np.flatnonzero(edges_uint8)
+        return indices.astype(np.int32) if edges_uint8.size < 2 ** 31 else indices
+
+    def overlay_edges_on_image(self, image_bgr: np.ndarray, edges_uint8: np.ndarray, color=(0, 0, 255), alpha: float = 0.8,
+                               out: np.ndarray = None) -> np.ndarray:
+        """Mistura ``color`` à imagem nos pixels de borda: ``alpha * pixel + (1 - alpha) * color``.
+
+        ``edges_uint8`` pode ser a máscara de bordas (H x W), os índices de
+        ``edge_coordinates`` (esparso) ou uma imagem BGR, misturada inteira.
+        Só os pixels de borda são calculados; ``out`` (pode ser a própria
+        imagem) recebe o resultado sem alocar uma imagem nova.
+        """
         if image_bgr is None or edges_uint8 is None:
             return image_bgr
-        if len(edges_uint8.shape) == 2:
-            mask = edges_uint8 > 0
-            overlay = image_bgr.copy()
-            colored = np.zeros_like(image_bgr)
-            colored[:, :] = color
-            overlay[mask] = colored[mask]
-        else:
-            overlay = edges_uint8
-        blended = cv2.addWeighted(image_bgr, alpha, overlay, 1 - alpha, 0)
-        return blended
+        if edges_uint8.ndim == 3:
+            return cv2.addWeighted(image_bgr, alpha, edges_uint8, 1 - alpha, 0, dst=out)
+
+        channels = image_bgr.shape[2] if image_bgr.ndim == 3 else 1
+        if channels == 4 and len(color) == 3:
+            # BGRA (ex.: depois de RGB → RGBA): a borda fica opaca
+            color = tuple(color) + (255,)
+        if channels != len(color):
+            raise ValueError(f"A cor {color} não tem o número de canais da imagem ({channels})")
+        if out is None:
+            out = image_bgr.copy()
+        elif out is not image_bgr:
+            np.copyto(out, image_bgr)
+        lut = self._blend_lut(color, alpha)
+
+        if edges_uint8.ndim == 2 and cv2.countNonZero(edges_uint8) > edges_uint8.size // 4:
+            # Máscara densa (ex.: Sobel): LUT na imagem inteira e cópia só onde há borda
+            return cv2.copyTo(cv2.LUT(image_bgr, lut), edges_uint8, out)
+        indices = edges_uint8 if edges_uint8.ndim == 1 else np.flatnonzero(edges_uint8)
+        if len(indices) == 0:
+            return out
+        pixels = out.reshape(-1, channels)
+        pixels[indices] = cv2.LUT(pixels[indices].reshape(-1, 1, channels), lut).reshape(-1, channels)
+        return out
+
+    def _blend_lut(self, color, alpha):
+        # Mesma aritmética de cv2.addWeighted, aplicada a cada valor possível (0..255) por canal
+        ramp = np.arange(256, dtype=np.uint8).reshape(256, 1)
+        planes = [cv2.addWeighted(ramp, alpha, np.full_like(ramp, value), 1 - alpha, 0) for value in color]
+        return np.dstack(planes) if len(planes) > 1 else planes[0]
 
 
@@ -1,30 +1,20 @@
 import cv2
-import numpy as np
-from PIL import Image, ImageTk
+from models.histogram_service import HistogramService, as_plot_data, histogram_stats
+from models.point_ops import PointOpChain
 
 class HistogramModel:
-    def __init__(self):
-        pass
+    def __init__(self, service=None):
+        # Histogramas compartilhados (calculados uma vez por imagem)
+        self.service = service or HistogramService()
 
     def calculate_histogram(self, image, channels=None):
         """Calcula histograma da imagem"""
-        if len(image.shape) == 3:
-            if channels is None:
-                # Histograma para cada canal separadamente
-                histograms = []
-                colors = ['B', 'G', 'R']
-                for i in range(3):
-                    hist = cv2.calcHist([image], [i], None, [256], [0, 256])
-                    histograms.append((colors[i], hist.flatten()))
-                return histograms
-            else:
-                # Histograma para canal específico
-                hist = cv2.calcHist([image], [channels], None, [256], [0, 256])
-                return hist.flatten()
-        else:
-            # Imagem em escala de cinza
-            hist = cv2.calcHist([image], [0], None, [256], [0, 256])
-            return hist.flatten()
+        hists = self.service.histograms(image)
+        if channels is not None and len(image.shape) == 3:
+            # Histograma para canal específico
+            return hists[channels]
+        # Lista (canal, hist) para imagens coloridas; um único hist para cinza
+        return as_plot_data(hists)
 
     def equalize_histogram(self, image):
         """Aplica equalização de histograma"""
@@ -82,37 +72,24 @@ class HistogramModel:
         
         return adjusted
 
+    def compile_point_ops(self, image, ops):
+        """Compila operações pontuais em LUTs: (LUTs por canal, LUT sobre cinza ou None)"""
+        return PointOpChain(ops).compile(image)
+
+    def apply_point_ops(self, image, ops):
+        """Aplica uma cadeia de operações pontuais em uma única passada de LUT.
+
+        ``ops`` é uma lista de tuplas, ex.: [('brightness', 20), ('contrast', 1.5),
+        ('equalize',), ('binary', 128)]. O resultado é idêntico a aplicar as
+        operações uma a uma (ver models.point_ops.PointOpChain).
+        """
+        return PointOpChain(ops).apply(image)
+
     def get_histogram_stats(self, image):
         """Retorna estatísticas do histograma"""
+        hists = self.service.histograms(image)
         if len(image.shape) == 3:
             # Para imagens coloridas, calcula para cada canal
-            stats = {}
-            colors = ['B', 'G', 'R']
-            for i, color in enumerate(colors):
-                hist = cv2.calcHist([image], [i], None, [256], [0, 256])
-                stats[color] = {
-                    'mean': np.mean(hist),
-                    'std': np.std(hist),
-                    'min': np.min(hist),
-                    'max': np.max(hist)
-                }
-            return stats
-        else:
-            # Para imagens em escala de cinza
-            hist = cv2.calcHist([image], [0], None, [256], [0, 256])
-            return {
-                'mean': np.mean(hist),
-                'std': np.std(hist),
-                'min': np.min(hist),
-                'max': np.max(hist)
-            }
-
-    def to_tk_image(self, cv_image):
-        """Converte imagem OpenCV para formato Tkinter"""
-        if len(cv_image.shape) == 3:
-            rgb = cv2.cvtColor(cv_image, cv2.COLOR_BGR2RGB)
-        else:
-            rgb = cv_image
-        
-        img = Image.fromarray(rgb)
-        return ImageTk.PhotoImage(img)
+            return {color: histogram_stats(hist) for color, hist in zip('BGR', hists)}
+        # Para imagens em escala de cinza
+        return histogram_stats(hists[0])
@@ -0,0 +1,119 @@
+import threading
+import weakref
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+
+from models.point_ops import remap_histogram
+
+CHANNEL_NAMES = ('B', 'G', 'R', 'A')
+
+
+def compute_histograms(image):
+    """Histogramas de todos os canais em um array (canais, 256) float32"""
+    if len(image.shape) == 2:
+        return cv2.calcHist([image], [0], None, [256], [0, 256]).reshape(1, 256)
+    return np.stack([cv2.calcHist([image], [i], None, [256], [0, 256]).ravel()
+                     for i in range(image.shape[2])])
+
+
+def histogram_stats(hist):
+    """Estatísticas (média, desvio, mínimo, máximo) de um histograma de 256 posições"""
+    return {
+        'mean': np.mean(hist),
+        'std': np.std(hist),
+        'min': np.min(hist),
+        'max': np.max(hist)
+    }
+
+
+def as_plot_data(hists):
+    """Formato de HistogramModel.calculate_histogram: lista (canal, hist) ou um único hist"""
+    if len(hists) == 1:
+        return hists[0]
+    return [(CHANNEL_NAMES[i], hist) for i, hist in enumerate(hists[:3])]
+
+
+class HistogramService:
+    """Histogramas calculados uma vez por imagem e compartilhados entre view e models.
+
+    As imagens nunca são alteradas no lugar (cada operação gera um array
+    novo), então a própria identidade do array identifica a versão da
+    imagem. As entradas guardam só uma referência fraca: somem junto com a
+    imagem e não a mantêm viva.
+
+    Para operações de LUT (brilho, contraste, limiarização, quantização,
+    equalização) o histograma do resultado é derivado do histograma da
+    entrada em O(256), sem reler os pixels: ver ``derive``.
+    """
+
+    def __init__(self, max_entries=64):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()   # (tipo, id) → (ref. fraca, histogramas)
+        self._lock = threading.RLock()
+
+    def _lookup(self, kind, image):
+        key = (kind, id(image))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0]() is not image:
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def _store(self, kind, image, hists):
+        key = (kind, id(image))
+        entries = self._entries
+
+        def forget(_, key=key):
+            with self._lock:
+                entry = entries.get(key)
+                if entry is not None and entry[0]() is None:
+                    del entries[key]
+
+        with self._lock:
+            entries[key] = (weakref.ref(image, forget), hists)
+            entries.move_to_end(key)
+            while len(entries) > self.max_entries:
+                entries.popitem(last=False)
+        return hists
+
+    def histograms(self, image):
+        """Histogramas (canais, 256) da imagem, do cache quando possível"""
+        hists = self._lookup('channels', image)
+        if hists is None:
+            hists = self._store('channels', image, compute_histograms(image))
+        return hists
+
+    def gray_histogram(self, image):
+        """Histograma da versão em tons de cinza (base das limiarizações)"""
+        if len(image.shape) == 2:
+            return self.histograms(image)[0]
+        hist = self._lookup('gray', image)
+        if hist is None:
+            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+            hist = self._store('gray', image, compute_histograms(gray)[0])
+        return hist
+
+    def derive(self, source, result, luts, gray=False):
+        """Registra o histograma de ``result`` = LUT(s) aplicadas a ``source``.
+
+        ``luts`` tem uma LUT por canal (ou uma só, usada em todos). Com
+        ``gray=True`` a LUT age sobre a versão em cinza de ``source`` e o
+        resultado tem os canais iguais, como em ThresholdModel.
+        """
+        if gray:
+            hist = remap_histogram(self.gray_histogram(source), luts[0]).astype(np.float32)
+            channels = result.shape[2] if len(result.shape) == 3 else 1
+            hists = np.tile(hist, (channels, 1))
+        else:
+            source_hists = self.histograms(source)
+            if len(luts) == 1:
+                luts = list(luts) * len(source_hists)
+            hists = np.stack([remap_histogram(h, lut) for h, lut in zip(source_hists, luts)]).astype(np.float32)
+        return self._store('channels', result, hists)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,104 @@
+class History:
+    """Pilha de desfazer/refazer com orçamento de memória.
+
+    Cada entrada guarda um estado compacto do Model: a lista de operações
+    (nome e parâmetros) aplicadas em resolução cheia e as prévias pendentes
+    na proxy. Só as proxies (do tamanho do painel) contam em ``max_bytes``.
+
+    A imagem cheia de cada estado fica presa à entrada (``pinned``, a
+    mesma imagem do Model, sem cópia) enquanto couber em
+    ``max_pinned_bytes``, um orçamento à parte de ``max_bytes``; acima disso
+    as entradas mais distantes da atual a soltam e, ao desfazer até elas, o
+    Model a obtém do cache do pipeline ou a recalcula a partir da lista de
+    operações. ``retained(imagem)`` diz se a imagem já é mantida em outro
+    lugar (ex.: no cache do pipeline): prendê-la não custa memória, então
+    ela não conta no orçamento.
+    """
+
+    def __init__(self, max_entries=100, max_bytes=64 * 1024 * 1024, max_pinned_bytes=256 * 1024 * 1024,
+                 retained=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_pinned_bytes = max_pinned_bytes
+        self.retained = retained or (lambda image: False)
+        self.clear()
+
+    def clear(self):
+        self._entries = []   # lista de (estado, rótulo, mesclável, bytes, imagem presa)
+        self._index = -1
+
+    @property
+    def can_undo(self):
+        return self._index > 0
+
+    @property
+    def can_redo(self):
+        return self._index < len(self._entries) - 1
+
+    @property
+    def nbytes(self):
+        return sum(entry[3] for entry in self._entries)
+
+    @property
+    def pinned_bytes(self):
+        """Memória mantida só pelo histórico"""
+        # Estados seguidos costumam prender a mesma imagem: cada uma conta uma vez
+        images = {id(entry[4]): entry[4] for entry in self._entries if entry[4] is not None}
+        return sum(image.nbytes for image in images.values() if not self.retained(image))
+
+    @property
+    def current(self):
+        return self._entries[self._index][0] if self._entries else None
+
+    def push(self, state, label, nbytes=0, mergeable=False, pinned=None):
+        """Registra um novo estado; descarta o que havia para refazer.
+
+        Estados mescláveis com o mesmo rótulo do topo (ex.: ticks de um
+        slider) substituem o topo em vez de criar uma nova entrada.
+        """
+        del self._entries[self._index + 1:]
+        if mergeable and self._entries and self._entries[-1][1] == label and self._entries[-1][2]:
+            self._entries[-1] = (state, label, True, nbytes, pinned)
+        else:
+            self._entries.append((state, label, mergeable, nbytes, pinned))
+        self._index = len(self._entries) - 1
+        self._trim()
+
+    def amend(self, state, nbytes=0, pinned=None):
+        """Substitui o estado atual sem criar um passo de desfazer"""
+        if self._entries:
+            _, label, mergeable, _, _ = self._entries[self._index]
+            self._entries[self._index] = (state, label, mergeable, nbytes, pinned)
+            self._trim()
+
+    def undo(self):
+        """Retorna (estado, rótulo desfeito, imagem presa ou None) ou None"""
+        if not self.can_undo:
+            return None
+        label = self._entries[self._index][1]
+        self._index -= 1
+        state, _, _, _, pinned = self._entries[self._index]
+        return state, label, pinned
+
+    def redo(self):
+        """Retorna (estado, rótulo refeito, imagem presa ou None) ou None"""
+        if not self.can_redo:
+            return None
+        self._index += 1
+        state, label, _, _, pinned = self._entries[self._index]
+        return state, label, pinned
+
+    def _trim(self):
+        # Descarta as entradas mais antigas até respeitar os limites (mantém a atual)
+        while len(self._entries) > 1 and self._index > 0 and (
+                len(self._entries) > self.max_entries or self.nbytes > self.max_bytes):
+            del self._entries[0]
+            self._index -= 1
+        # Solta as imagens cheias das entradas mais distantes da atual primeiro
+        order = sorted(range(len(self._entries)), key=lambda i: abs(i - self._index), reverse=True)
+        for i in order:
+            if self.pinned_bytes <= self.max_pinned_bytes or i == self._index:
+                break
+            pinned = self._entries[i][4]
+            if pinned is not None and not self.retained(pinned):
+                self._entries[i] = self._entries[i][:4] + (None,)
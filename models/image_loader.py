@@ -0,0 +1,128 @@
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+from PIL import Image
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp')
+# O libjpeg decodifica direto em 1/2, 1/4 ou 1/8 (escalando a DCT), bem mais rápido que a imagem cheia
+REDUCED_READS = ((8, cv2.IMREAD_REDUCED_COLOR_8), (4, cv2.IMREAD_REDUCED_COLOR_4),
+                 (2, cv2.IMREAD_REDUCED_COLOR_2))
+
+
+def _signature(path):
+    """Identifica a versão do arquivo no disco (muda se ele for regravado)"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def sibling_images(path):
+    """Imagens da mesma pasta de ``path``, em ordem alfabética"""
+    folder = os.path.dirname(os.path.abspath(path))
+    try:
+        names = os.listdir(folder)
+    except OSError:
+        return []
+    names = sorted((name for name in names if name.lower().endswith(IMAGE_EXTENSIONS)), key=str.lower)
+    return [os.path.join(folder, name) for name in names]
+
+
+def adjacent_image(path, step):
+    """Imagem ``step`` posições depois (ou antes, se negativo) de ``path`` na pasta, ou None"""
+    siblings = sibling_images(path)
+    target = os.path.abspath(path)
+    if target not in siblings:
+        return None
+    index = siblings.index(target) + step
+    return siblings[index] if 0 <= index < len(siblings) else None
+
+
+class ImageLoader:
+    """Decodifica imagens fora da thread do Tk.
+
+    ``load`` devolve um ``Future`` com a imagem cheia (como ``cv2.imread``);
+    ``preview`` faz, enquanto isso, uma decodificação reduzida de JPEGs no
+    tamanho do painel. ``prefetch`` decodifica em segundo plano as imagens
+    vizinhas na pasta, para abrir a próxima/anterior ser imediato; só as
+    últimas pedidas ficam guardadas, e uma entrada é descartada se o
+    arquivo mudar no disco.
+    """
+
+    def __init__(self, prefetch=1, workers=2):
+        # Vizinhos pré-carregados de cada lado
+        self.prefetch_count = prefetch
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="carregamento")
+        self._lock = threading.Lock()
+        # caminho: (assinatura do arquivo, future da decodificação)
+        self._prefetched = OrderedDict()
+
+    def load(self, path):
+        """``Future`` com a imagem cheia; usa o pré-carregamento se o arquivo não mudou"""
+        path = os.path.abspath(path)
+        with self._lock:
+            entry = self._prefetched.pop(path, None)
+        if entry is not None and entry[0] == _signature(path):
+            return entry[1]
+        return self._pool.submit(cv2.imread, path)
+
+    def preview(self, path, max_width, max_height):
+        """Decodificação reduzida de um JPEG, ainda com pelo menos a resolução do painel.
+
+        Retorna None quando não compensa (outros formatos, ou imagem que já
+        cabe no painel): aí só resta esperar a decodificação completa.
+        """
+        if not path.lower().endswith(('.jpg', '.jpeg')):
+            return None
+        try:
+            with Image.open(path) as header:
+                width, height = header.size
+        except (OSError, ValueError):
+            return None
+        fit = min(max_width / width, max_height / height)
+        for factor, flag in REDUCED_READS:
+            if factor * fit <= 1.0:
+                return cv2.imread(path, flag)
+        return None
+
+    def neighbors(self, path):
+        """Vizinhos de ``path`` na pasta, do mais próximo ao mais distante (próximo antes do anterior)"""
+        siblings = sibling_images(path)
+        target = os.path.abspath(path)
+        if target not in siblings:
+            return []
+        index = siblings.index(target)
+        paths = []
+        for distance in range(1, self.prefetch_count + 1):
+            for neighbor in (index + distance, index - distance):
+                if 0 <= neighbor < len(siblings):
+                    paths.append(siblings[neighbor])
+        return paths
+
+    def prefetch(self, paths):
+        """Decodifica ``paths`` em segundo plano e retorna os futures.
+
+        Os pré-carregamentos que não estão na lista são descartados.
+        """
+        paths = [os.path.abspath(path) for path in paths]
+        with self._lock:
+            for path in list(self._prefetched):
+                if path not in paths:
+                    self._prefetched.pop(path)[1].cancel()
+            for path in paths:
+                signature = _signature(path)
+                entry = self._prefetched.get(path)
+                if entry is None or entry[0] != signature:
+                    self._prefetched[path] = (signature, self._pool.submit(cv2.imread, path))
+            return [self._prefetched[path][1] for path in paths]
+
+    def shutdown(self):
+        with self._lock:
+            for _, future in self._prefetched.values():
+                future.cancel()
+            self._prefetched.clear()
+        self._pool.shutdown(wait=False)
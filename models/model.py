@@ -1,178 +1,467 @@
+import functools
+import inspect
+
 import cv2
-from PIL import Image, ImageTk
 import numpy as np
 from models.color_model import ColorModel
+from models.derived_images import DerivedImages
 from models.histogram_model import HistogramModel
+from models.histogram_service import HistogramService, as_plot_data
 from models.threshold_model import ThresholdModel
 from models.edge_model import EdgeModel
+from models.history import History
+from models.parallel import StripExecutor
+from models.operations import OPERATIONS
+from models.pipeline import Pipeline
+from models.profiler import profiler
+from models.utils import fit_scale, resize_to_scale, resize_to_shape
+
+class Toolkit:
+    """Modelos especializados sobre os quais as operações do registro (models.operations) rodam.
+
+    O Model é um Toolkit com proxy, pipeline e histórico por cima; o
+    batch.py usa um Toolkit simples em cada processo. ``low_memory`` e
+    ``l1_magnitude`` ligam o modo de pouca memória do Sobel (ver EdgeModel).
+    """
+
+    def __init__(self, executor=None, low_memory=False, l1_magnitude=False):
+        self.executor = executor
+        # Representações derivadas (cinza, BGR, HSV, LAB...) calculadas uma vez por imagem.
+        # Resultados em cinza (limiarizações, conversão para cinza) ficam com um canal
+        # só e viram BGR apenas quando uma operação precisa (``self.derived.bgr``)
+        self.derived = DerivedImages()
+
+        # Modelos especializados
+        self.color_model = ColorModel(self.derived, executor)
+        self.histograms = HistogramService()
+        self.histogram_model = HistogramModel(self.histograms)
+        self.threshold_model = ThresholdModel(executor, self.derived, expand_gray=False)
+        self.edge_model = EdgeModel(executor, low_memory, l1_magnitude, derived=self.derived)
+
+    def run_operation(self, name, image, scale=1.0, **params):
+        """Executa a operação ``name`` do registro sobre ``image`` (sem pipeline nem histórico)"""
+        operation = OPERATIONS[name]
+        return operation.func(self, image, scale, **operation.resolve(params))
+
+
+class Model(Toolkit):
+    """Imagem em edição: proxy para as prévias, pipeline de operações e histórico.
+
+    Os orçamentos de memória são separados e somam-se:
+
+    - ``cache_bytes``: saídas intermediárias do pipeline (``ResultCache``);
+    - ``history_bytes``: proxies guardadas nos estados do histórico;
+    - ``pinned_bytes``: imagens cheias presas aos estados do histórico além
+      das que o cache do pipeline (ou a original) já mantém; a do estado
+      atual sempre fica. Padrão (None): ``PINNED_IMAGES`` vezes o tamanho da
+      imagem carregada;
+    - as representações derivadas (``DerivedImages``) têm o próprio limite.
+    """
 
-class Model:
-    def __init__(self):
+    # Imagens cheias que o histórico pode manter além do cache do pipeline (padrão de ``pinned_bytes``)
+    PINNED_IMAGES = 2
+
+    def __init__(self, cache_bytes=512 * 1024 * 1024, history_bytes=64 * 1024 * 1024,
+                 pinned_bytes=None, workers=None, low_memory=False, l1_magnitude=False):
         self.original = None
+        self.version = 0
         self.processed = None
-        
-        # Modelos especializados
-        self.color_model = ColorModel()
-        self.histogram_model = HistogramModel()
-        self.threshold_model = ThresholdModel()
-        self.edge_model = EdgeModel()
 
-    def load_image(self, path):
-        """Carrega imagem e define como original"""
-        self.original = cv2.imread(path)
-        self.processed = self.original.copy() if self.original is not None else None
-        return self.to_tk_image(self.original) if self.original is not None else None
+        # Bordas e limiarização adaptativa rodam em faixas paralelas (``workers`` threads)
+        super().__init__(StripExecutor(workers), low_memory, l1_magnitude)
+
+        # Prévia em baixa resolução (proxy do tamanho do painel)
+        self.proxy_enabled = True
+        self.viewport = None
+        self.proxy_scale = 1.0
+        self.proxy_original = None
+        self.proxy_processed = None
+        # Operações vistas só na proxy, ainda não aplicadas na resolução cheia:
+        # lista de (nome, parâmetros, resultado na proxy)
+        self.pending = []
+
+        # nome: (função(imagem, escala, **params), parte da imagem original?), do registro
+        self._operations = {name: (functools.partial(operation.func, self), operation.from_original)
+                            for name, operation in OPERATIONS.items()}
+
+        # Operações aplicadas em resolução cheia, com cache dos intermediários
+        self.pipeline = Pipeline(self._operations, cache_bytes)
+
+        # Desfazer/refazer: guarda a lista de operações e as prévias na proxy, e
+        # prende a imagem cheia de cada estado até ``pinned_bytes`` (sem cópia);
+        # as soltas vêm do cache do pipeline ou são recalculadas
+        self.pinned_bytes = pinned_bytes
+        self.history = History(max_bytes=history_bytes, max_pinned_bytes=pinned_bytes or 0,
+                               retained=lambda image: image is self.original or self.pipeline.cache.holds(image))
+
+    @property
+    def processed(self):
+        return self._processed
+
+    @processed.setter
+    def processed(self, image):
+        """Toda alteração da imagem processada gera uma nova versão"""
+        self._processed = image
+        self.version += 1
+
+    def load_image(self, path, image=None):
+        """Carrega imagem e define como original (``image``: já decodificada, ex.: pelo ImageLoader)"""
+        # Os buffers do Sobel de pouca memória têm o tamanho da imagem anterior
+        self.edge_model.release_buffers()
+        self.original = image if image is not None else cv2.imread(path)
+        if self.pinned_bytes is None and self.original is not None:
+            self.history.max_pinned_bytes = self.PINNED_IMAGES * self.original.nbytes
+        self.pipeline.set_source(self.original)
+        self.processed = self.pipeline.output()
+        self.pending = []
+        self._rebuild_proxies()
+        self.history.clear()
+        self._record('load_image')
+        return self.original
 
     def save_image(self, path):
-        """Salva a imagem processada"""
+        """Salva a imagem processada (em resolução cheia)"""
+        self.commit()
         if self.processed is not None:
-            cv2.imwrite(path, self.processed)
+            # Resultados em cinza são gravados em BGR, como as demais imagens
+            cv2.imwrite(path, self.derived.bgr(self.processed))
 
     def reset_image(self):
         """Reset imagem processada para o estado original"""
         if self.original is not None:
-            self.processed = self.original.copy()
-            return self.to_tk_image(self.processed)
+            self.edge_model.release_buffers()
+            self.pending = []
+            self._sync_source()
+            self.pipeline.clear()
+            self.processed = self.pipeline.output()
+            self.proxy_processed = self.proxy_original
+            self._record('reset_image')
+            return self.processed
         return None
 
-    def get_original_tk_image(self):
-        """Retorna imagem original em formato Tkinter"""
-        return self.to_tk_image(self.original) if self.original is not None else None
+    @property
+    def current(self):
+        """Imagem a exibir: a prévia mais recente ou a processada"""
+        return self.pending[-1][2] if self.pending else self.processed
 
-    def get_processed_tk_image(self):
-        """Retorna imagem processada em formato Tkinter"""
-        return self.to_tk_image(self.processed) if self.processed is not None else None
+    # ========== Proxy de pré-visualização ==========
+    def set_viewport(self, max_width, max_height):
+        """Define o tamanho de exibição; retorna True se as proxies foram refeitas.
 
-    # ========== Conversões de Cores ==========
-    def convert_to_rgba(self):
-        if self.processed is not None:
-            self.processed = self.color_model.rgb_to_rgba(self.processed)
-            return self.to_tk_image(self.processed)
-        return None
+        Se o painel crescer além da resolução da proxy, as prévias pendentes
+        são aplicadas na resolução cheia antes de gerar a nova proxy.
+        """
+        self.viewport = (max_width, max_height)
+        if self.original is None:
+            return False
+        scale = self._target_proxy_scale()
+        # Tolera reduções de até 2x para não refazer a proxy a cada redimensionamento
+        if self.proxy_scale / 2 < scale <= self.proxy_scale:
+            return False
+        if scale > self.proxy_scale:
+            self.commit()
+        self._rebuild_proxies()
+        return True
 
-    def convert_to_cmyk(self):
-        if self.processed is not None:
-            self.processed = self.color_model.rgb_to_cmyk(self.processed)
-            return self.to_tk_image(self.processed)
-        return None
+    def _target_proxy_scale(self):
+        if not self.proxy_enabled or self.viewport is None or self.original is None:
+            return 1.0
+        return fit_scale(self.original.shape, *self.viewport)
 
-    def convert_to_hsv(self):
-        if self.processed is not None:
-            self.processed = self.color_model.rgb_to_hsv(self.processed)
-            return self.to_tk_image(self.processed)
-        return None
+    def _rebuild_proxies(self):
+        """Reduz original e processada para o tamanho do painel e refaz as prévias pendentes"""
+        if self.original is None:
+            self.proxy_scale, self.proxy_original, self.proxy_processed = 1.0, None, None
+            return
+        self.proxy_scale = self._target_proxy_scale()
+        with profiler.span('resize', 'proxies', scale=self.proxy_scale):
+            self.proxy_original = resize_to_scale(self.original, self.proxy_scale)
+            self.proxy_processed = resize_to_scale(self.processed, self.proxy_scale)
+        self._replay_pending(self.pending)
+        self._amend_history()
 
-    def convert_to_lab(self):
-        if self.processed is not None:
-            self.processed = self.color_model.rgb_to_lab(self.processed)
-            return self.to_tk_image(self.processed)
-        return None
+    def _replay_pending(self, steps):
+        """Recalcula as prévias pendentes sobre as proxies atuais"""
+        self.pending = []
+        for name, params, _ in steps:
+            job, token = self.prepare_preview(name, **params)
+            if job is not None:
+                self._accept_preview(token, job())
 
-    def convert_to_gray(self):
-        if self.processed is not None:
-            self.processed = self.color_model.rgb_to_gray(self.processed)
-            return self.to_tk_image(self.processed)
-        return None
+    def _preview_state(self, name, replace=False):
+        """Estado (proxies e prévias mantidas) sobre o qual a prévia de ``name`` é calculada"""
+        steps = self.pending
+        if replace and steps and steps[-1][0] == name:
+            steps = steps[:-1]
+        return [self.proxy_original, self.proxy_processed] + [step[2] for step in steps]
 
-    # ========== Operações de Histograma ==========
-    def equalize_histogram(self):
-        if self.processed is not None:
-            self.processed = self.histogram_model.equalize_histogram(self.processed)
-            return self.to_tk_image(self.processed)
-        return None
+    def prepare_preview(self, name, replace=False, **params):
+        """Prepara a prévia de uma operação para rodar fora da thread principal.
 
-    def adjust_brightness(self, brightness):
-        """Ajusta brilho sempre a partir da imagem original"""
-        if self.original is not None:
-            self.processed = self.histogram_model.adjust_brightness(self.original.copy(), brightness)
-            return self.to_tk_image(self.processed)
-        return None
+        Retorna ``(job, token)``: ``job()`` calcula o resultado na proxy sem
+        alterar o estado; ``accept_preview(token, resultado)`` o registra.
+        Com ``replace=True`` a prévia substitui a anterior da mesma operação
+        (ex.: arrastar um slider).
+        """
+        params = OPERATIONS[name].resolve(params)
+        func, from_original = self._operations[name]
+        scale = self._working_scale(name, params)
+        if scale > self.proxy_scale and not from_original:
+            # A prévia parte da processada em resolução cheia: as prévias anteriores
+            # são aplicadas antes (a substituída é descartada)
+            if replace and self.pending and self.pending[-1][0] == name:
+                self.pending = self.pending[:-1]
+            self.commit()
+        state = self._preview_state(name, replace)
+        base = state[0] if from_original else state[-1]
+        if base is None:
+            return None, None
+        if scale > self.proxy_scale:
+            source = resize_to_scale(self.original if from_original else self.processed, scale)
+        else:
+            source = base
 
-    def adjust_contrast(self, contrast):
-        """Ajusta contraste sempre a partir da imagem original"""
-        if self.original is not None:
-            self.processed = self.histogram_model.adjust_contrast(self.original.copy(), contrast)
-            return self.to_tk_image(self.processed)
-        return None
+        def job():
+            with profiler.span('op', name, scale=scale):
+                result = func(source, scale, **params)
+                if source is not base:
+                    result = resize_to_shape(result, base.shape)
+                self._derive_histogram(name, params, base, result)
+            return result
+        return job, (name, params, replace, state)
 
-    def adjust_brightness_contrast(self, brightness, contrast):
-        """Ajusta brilho e contraste sempre a partir da imagem original"""
-        if self.original is not None:
-            self.processed = self.histogram_model.adjust_brightness_contrast(self.original.copy(), brightness, contrast)
-            return self.to_tk_image(self.processed)
-        return None
+    def _working_scale(self, name, params):
+        """Escala da prévia de ``name``: a da proxy, ou maior se nela o resultado divergiria"""
+        preview_scale = OPERATIONS[name].preview_scale
+        if preview_scale is None:
+            return self.proxy_scale
+        scale = preview_scale(**params)
+        # Acima da metade da resolução, reduzir a imagem custa tanto quanto rodar na cheia
+        return max(self.proxy_scale, 1.0 if scale > 0.5 else scale)
 
-    def calculate_histogram(self):
-        if self.processed is not None:
-            return self.histogram_model.calculate_histogram(self.processed)
-        return None
+    def accept_preview(self, token, result):
+        """Registra o resultado de ``prepare_preview``; False se o estado mudou nesse meio tempo"""
+        if not self._accept_preview(token, result):
+            return False
+        name, _, replace, _ = token
+        # Ticks seguidos do mesmo slider viram um único passo de desfazer
+        self._record(name, mergeable=replace)
+        return True
 
-    # ========== Operações de Limiarização ==========
-    def apply_binary_threshold(self, threshold_value):
-        """Aplica threshold sempre a partir da imagem original"""
-        if self.original is not None:
-            self.processed = self.threshold_model.binary_threshold(self.original.copy(), threshold_value)
-            return self.to_tk_image(self.processed)
-        return None
+    def _accept_preview(self, token, result):
+        name, params, replace, state = token
+        current = self._preview_state(name, replace)
+        if result is None or len(current) != len(state) or any(a is not b for a, b in zip(current, state)):
+            return False
+        if replace and self.pending and self.pending[-1][0] == name:
+            self.pending.pop()
+        if self._operations[name][1]:
+            # Recomeça da original: as prévias anteriores não afetam mais o resultado
+            self.pending = []
+        self.pending.append((name, params, result))
+        return True
 
-    def apply_otsu_threshold(self):
-        if self.processed is not None:
-            self.processed = self.threshold_model.otsu_threshold(self.processed)
-            return self.to_tk_image(self.processed)
-        return None
+    def preview(self, name, replace=False, **params):
+        """Calcula e registra a prévia de uma operação na proxy"""
+        job, token = self.prepare_preview(name, replace, **params)
+        if job is None:
+            return None
+        result = job()
+        self.accept_preview(token, result)
+        return result
 
-    def apply_adaptive_threshold(self, method='mean'):
-        if self.processed is not None:
-            if method == 'mean':
-                self.processed = self.threshold_model.adaptive_threshold_mean(self.processed)
-            else:
-                self.processed = self.threshold_model.adaptive_threshold_gaussian(self.processed)
-            return self.to_tk_image(self.processed)
-        return None
+    def commit(self):
+        """Aplica as prévias pendentes na resolução cheia"""
+        steps, self.pending = self.pending, []
+        if not steps:
+            return self.processed
+        for name, params, result in steps:
+            # Com escala 1 a proxy já é a imagem cheia: o resultado é reaproveitado
+            self._run(name, result=result if self.proxy_scale >= 1.0 else None, **params)
+        self.proxy_processed = resize_to_scale(self.processed, self.proxy_scale)
+        # O conteúdo não muda, só passa a existir em resolução cheia
+        self._amend_history()
+        return self.processed
 
-    def apply_quantize_threshold(self, num_levels=4):
-        """Aplica quantização em N tons de cinza sempre a partir da original"""
-        if self.original is not None:
-            self.processed = self.threshold_model.quantize_threshold(self.original.copy(), num_levels)
-            return self.to_tk_image(self.processed)
-        return None
+    def _sync_source(self):
+        """Garante que o pipeline parte da original atual (ex.: atribuída diretamente)"""
+        if self.pipeline.source is not self.original:
+            self.pipeline.set_source(self.original)
 
-    # ========== Detecção de Bordas (sobreposição na imagem processada) ==========
-    def apply_sobel(self, ksize=3):
-        if self.processed is not None:
-            edges = self.edge_model.detect_sobel_edges(self.processed, ksize=ksize)
-            self.processed = self.edge_model.overlay_edges_on_image(self.processed, edges)
-            return self.to_tk_image(self.processed)
-        return None
+    def _run(self, name, result=None, **params):
+        """Executa a operação na resolução cheia, acrescentando-a ao pipeline"""
+        if self.original is None:
+            return None
+        self._sync_source()
+        base = self.original if self._operations[name][1] else self.processed
+        with profiler.span('op', name, scale=1.0):
+            self.processed = self.pipeline.append(name, params, result)
+            self._derive_histogram(name, params, base, self.processed)
+        return self.processed
 
-    def apply_laplacian(self, ksize=3):
-        if self.processed is not None:
-            edges = self.edge_model.detect_laplacian_edges(self.processed, ksize=ksize)
-            self.processed = self.edge_model.overlay_edges_on_image(self.processed, edges)
-            return self.to_tk_image(self.processed)
-        return None
+    def _derive_histogram(self, name, params, base, result):
+        """Registra o histograma de uma operação de LUT a partir do histograma da entrada"""
+        luts = OPERATIONS[name].luts
+        if luts is None or result is None or result is base:
+            return
+        luts, gray = luts(lambda: self.histograms.histograms(base), **params)
+        self.histograms.derive(base, result, luts, gray)
 
-    def apply_canny(self, threshold1=100, threshold2=200, blur_ksize=3):
-        if self.processed is not None:
-            edges = self.edge_model.detect_canny_edges(self.processed, threshold1=threshold1, threshold2=threshold2, blur_ksize=blur_ksize)
-            self.processed = self.edge_model.overlay_edges_on_image(self.processed, edges)
-            return self.to_tk_image(self.processed)
-        return None
+    # ========== Edição do pipeline ==========
+    @property
+    def steps(self):
+        """Operações aplicadas em resolução cheia: lista de (nome, parâmetros)"""
+        return self.pipeline.steps
+
+    def edit_step(self, index, **params):
+        """Altera os parâmetros do passo ``index``; só os passos seguintes são recalculados"""
+        self.commit()
+        self.processed = self.pipeline.update(index, **params)
+        self.proxy_processed = resize_to_scale(self.processed, self.proxy_scale)
+        self._record('edit_step')
+        return self.processed
+
+    def remove_step(self, index):
+        """Remove o passo ``index`` do pipeline"""
+        self.commit()
+        self.processed = self.pipeline.remove(index)
+        self.proxy_processed = resize_to_scale(self.processed, self.proxy_scale)
+        self._record('remove_step')
+        return self.processed
 
-    # ========== Conversão ==========
-    def to_tk_image(self, cv_image, max_width=None, max_height=None):
-        if cv_image is None:
+    def apply(self, name, replace=False, **params):
+        """Executa a operação ``name`` do registro: como prévia na proxy (modo
+        interativo, com viewport definido) ou direto na resolução cheia (ex.:
+        uso sem interface). Parâmetros omitidos recebem o padrão do registro;
+        ``replace=True`` substitui a prévia anterior da mesma operação."""
+        params = OPERATIONS[name].resolve(params)
+        if self.original is None:
             return None
-        
-        if len(cv_image.shape) == 3:
-            rgb = cv2.cvtColor(cv_image, cv2.COLOR_BGR2RGB)
+        # Operações cuja prévia só é fiel na resolução cheia vão direto para ela
+        full_resolution = self.proxy_scale < 1.0 <= self._working_scale(name, params)
+        if self.proxy_enabled and self.viewport is not None and not full_resolution:
+            return self.preview(name, replace, **params)
+        self.commit()
+        result = self._run(name, **params)
+        self.proxy_processed = resize_to_scale(self.processed, self.proxy_scale)
+        self._record(name)
+        return result
+
+    # ========== Desfazer / Refazer ==========
+    def _snapshot(self):
+        """Estado compacto para o histórico: (operações, prévias, proxy processada, escala).
+
+        Só guarda arrays quando são proxies reduzidas; com escala 1 eles teriam
+        o tamanho da imagem cheia e são recalculados ao restaurar.
+        """
+        if self.proxy_scale < 1.0:
+            state = (self.pipeline.steps, list(self.pending), self.proxy_processed, self.proxy_scale)
+            nbytes = sum(step[2].nbytes for step in self.pending)
+            if self.proxy_processed is not None:
+                nbytes += self.proxy_processed.nbytes
+            return state, nbytes
+        pending = [(name, params, None) for name, params, _ in self.pending]
+        return (self.pipeline.steps, pending, None, self.proxy_scale), 0
+
+    def _record(self, label, mergeable=False):
+        state, nbytes = self._snapshot()
+        self.history.push(state, label, nbytes, mergeable, pinned=self.processed)
+
+    def _amend_history(self):
+        state, nbytes = self._snapshot()
+        self.history.amend(state, nbytes, pinned=self.processed)
+
+    def _restore(self, state, pinned=None):
+        steps, pending, proxy_processed, proxy_scale = state
+        self._sync_source()
+        # A imagem presa ao estado evita recalcular o que o cache do pipeline já descartou
+        self.processed = self.pipeline.restore(steps, pinned)
+        if proxy_processed is not None and proxy_scale == self.proxy_scale:
+            self.proxy_processed = proxy_processed
+            self.pending = list(pending)
         else:
-            rgb = cv_image
-        
-        img = Image.fromarray(rgb)
-        
-        # Redimensiona se especificado
-        if max_width and max_height:
-            img.thumbnail((max_width, max_height), Image.Resampling.LANCZOS)
-        
-        return ImageTk.PhotoImage(img)
+            # Proxy de outra escala (painel redimensionado) ou não guardada: recalcula
+            self.proxy_processed = resize_to_scale(self.processed, self.proxy_scale)
+            self._replay_pending(pending)
+            self._amend_history()
+
+    def rollback(self, count):
+        """Desfaz os ``count`` últimos passos e volta ao estado registrado, descartando
+        o que um passo que falhou deixou pela metade (ex.: no meio de uma receita)"""
+        entry = None
+        for _ in range(count):
+            entry = self.history.undo() or entry
+        state, _, pinned = entry if entry is not None else (self.history.current, None, None)
+        if state is not None:
+            self._restore(state, pinned)
+
+    @property
+    def can_undo(self):
+        return self.history.can_undo
+
+    @property
+    def can_redo(self):
+        return self.history.can_redo
+
+    def undo(self):
+        """Desfaz a última alteração; retorna o rótulo da operação desfeita ou None"""
+        entry = self.history.undo()
+        if entry is None:
+            return None
+        state, label, pinned = entry
+        self._restore(state, pinned)
+        return label
+
+    def redo(self):
+        """Refaz a última alteração desfeita; retorna o rótulo da operação ou None"""
+        entry = self.history.redo()
+        if entry is None:
+            return None
+        state, label, pinned = entry
+        self._restore(state, pinned)
+        return label
+
+    # ========== Operações ==========
+    # Os métodos das operações do registro (convert_to_gray, apply_canny...)
+    # são gerados no fim do módulo; aqui ficam os que tratam os argumentos
+
+    def apply_point_ops(self, ops):
+        """Aplica uma cadeia de operações pontuais (brilho, contraste, equalização,
+        limiarizações, quantização) fundida em LUT sobre a imagem processada"""
+        return self.apply('apply_point_ops', ops=[tuple(op) for op in ops])
+
+    def calculate_histogram(self, image=None):
+        """Histograma da imagem exibida, ou de ``image`` (calculado uma vez por versão da imagem)"""
+        image = self.current if image is None else image
+        if image is None:
+            return None
+        with profiler.span('histogram'):
+            if len(image.shape) == 2:
+                # Resultado em cinza guardado com um canal: exibido como os três canais iguais do BGR
+                return as_plot_data(np.repeat(self.histograms.histograms(image), 3, axis=0))
+            return self.histogram_model.calculate_histogram(image)
+
+
+def _operation_method(operation):
+    """Método ``Model.<operação>(*params, replace=False)`` com a assinatura dos parâmetros do registro"""
+    names = [param.name for param in operation.params]
+
+    def method(self, *args, replace=False, **params):
+        if len(args) > len(names):
+            raise TypeError(f"{operation.name}() recebe no máximo {len(names)} argumentos")
+        params.update(zip(names, args))
+        return self.apply(operation.name, replace, **params)
+
+    method.__name__ = method.__qualname__ = operation.name
+    method.__doc__ = f"Aplica ``{operation.name}`` (ver models.operations)"
+    method.__signature__ = inspect.Signature(
+        [inspect.Parameter('self', inspect.Parameter.POSITIONAL_OR_KEYWORD)]
+        + [inspect.Parameter(param.name, inspect.Parameter.POSITIONAL_OR_KEYWORD, default=param.default)
+           for param in operation.params]
+        + [inspect.Parameter('replace', inspect.Parameter.KEYWORD_ONLY, default=False)])
+    return method
+
+
+for _operation in OPERATIONS.values():
+    if _operation.name not in Model.__dict__:
+        setattr(Model, _operation.name, _operation_method(_operation))
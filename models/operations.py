@@ -0,0 +1,299 @@
+"""Registro das operações de imagem: um ponto só para Model, pipeline, menus, diálogos e batch.py.
+
+Cada ``Operation`` declara o nome usado no pipeline e no histórico, os
+parâmetros (tipo, padrão, faixa e pergunta do diálogo), a função que a
+executa e se ela parte sempre da imagem original. Cada ``Command`` é uma
+entrada da interface e da linha de comando (``gray``, ``canny``,
+``adaptive_mean``...) que aponta para uma operação, com parâmetros fixos,
+rótulo, menu e mensagem do log.
+
+As funções recebem ``(modelos, imagem, escala, **params)``, onde
+``modelos`` é um ``models.model.Toolkit`` (o próprio Model ou o do
+batch.py) e ``escala`` é a da proxy de pré-visualização (1 na resolução
+cheia). O módulo não importa OpenCV nem NumPy: o menu é montado com ele
+antes da janela aparecer.
+"""
+
+
+class Param:
+    """Parâmetro de uma operação.
+
+    ``minimum`` pode ser o nome de um parâmetro anterior (não aceita valor
+    menor que ele); ``odd`` arredonda para o ímpar seguinte (tamanhos de
+    kernel); ``choices`` lista os valores aceitos. A faixa e as opções
+    valem para todas as entradas: diálogo, ``Model.apply``, receitas e
+    batch.py.
+    """
+
+    def __init__(self, name, type, default, minimum=None, maximum=None, prompt=None, odd=False, choices=None):
+        self.name = name
+        self.type = type
+        self.default = default
+        self.minimum = minimum
+        self.maximum = maximum
+        self.prompt = prompt or name
+        self.odd = odd
+        self.choices = choices
+
+    def convert(self, value, params=None):
+        """Valor no tipo do parâmetro; ValueError fora da faixa ou das opções.
+
+        ``params``: valores já resolvidos dos parâmetros anteriores (para
+        ``minimum`` dado pelo nome de outro parâmetro).
+        """
+        try:
+            value = self.type(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"{self.name}: valor inválido: {value!r}") from None
+        if self.odd and value % 2 == 0:
+            value += 1
+        if self.choices is not None and value not in self.choices:
+            raise ValueError(f"{self.name}: {value!r} não é uma das opções ({', '.join(map(str, self.choices))})")
+        minimum = (params or {}).get(self.minimum) if isinstance(self.minimum, str) else self.minimum
+        if minimum is not None and value < minimum:
+            source = f" ({self.minimum})" if isinstance(self.minimum, str) else ""
+            raise ValueError(f"{self.name}: {value} é menor que o mínimo{source} {minimum}")
+        if self.maximum is not None and value > self.maximum:
+            raise ValueError(f"{self.name}: {value} é maior que o máximo {self.maximum}")
+        return value
+
+
+class Operation:
+    """Operação do pipeline: ``func(modelos, imagem, escala, **params)``.
+
+    ``from_original``: sempre parte da original (brilho, threshold...), e não
+    da imagem processada. ``luts(histogramas, **params)`` devolve (LUTs, age
+    sobre cinza?) para as operações de LUT, cujo histograma do resultado é
+    derivado do da entrada sem reler os pixels. ``preview_scale(**params)``
+    é a menor escala em que a prévia acompanha a resolução cheia (None:
+    qualquer escala, inclusive a da proxy).
+    """
+
+    def __init__(self, name, func, params=(), from_original=False, luts=None, preview_scale=None):
+        self.name = name
+        self.func = func
+        self.params = params
+        self.from_original = from_original
+        self.luts = luts
+        self.preview_scale = preview_scale
+
+    def resolve(self, params):
+        """Parâmetros completos: os padrões mais ``params``, convertidos e validados.
+
+        TypeError para nomes desconhecidos; ValueError para valores fora da
+        faixa ou das opções (inclusive um padrão abaixo de um mínimo dado
+        por outro parâmetro, ex.: threshold2 < threshold1 do Canny).
+        """
+        unknown = set(params) - {param.name for param in self.params}
+        if unknown:
+            raise TypeError(f"{self.name}: parâmetros desconhecidos: {', '.join(sorted(unknown))}")
+        resolved = {}
+        for param in self.params:
+            if param.name in params:
+                resolved[param.name] = param.convert(params[param.name], resolved)
+            else:
+                resolved[param.name] = param.default
+                if isinstance(param.minimum, str):
+                    param.convert(param.default, resolved)
+        return resolved
+
+
+class Command:
+    """Entrada do menu e do batch.py: uma operação com parâmetros fixos.
+
+    Os parâmetros que não são fixos são perguntados no diálogo (ou vêm,
+    em ordem, de ``nome:a:b`` no batch.py). ``message`` é formatada com os
+    parâmetros para o log; ``separator`` põe um separador antes no menu.
+    """
+
+    def __init__(self, key, operation, label, message, menu=None, fixed=None, separator=False):
+        self.key = key
+        self.operation = operation
+        self.label = label
+        self.message = message
+        self.menu = menu
+        self.fixed = fixed or {}
+        self.separator = separator
+
+    @property
+    def params(self):
+        """Parâmetros livres (perguntados ou passados pelo usuário), em ordem"""
+        return [param for param in OPERATIONS[self.operation].params if param.name not in self.fixed]
+
+    def resolve(self, params):
+        return OPERATIONS[self.operation].resolve(dict(params, **self.fixed))
+
+
+# ========== Funções das operações ==========
+def _color(conversion):
+    # Conversões de cor partem do BGR (resultados em cinza são expandidos, com cache)
+    return lambda tools, image, scale: getattr(tools.color_model, conversion)(tools.derived.bgr(image))
+
+
+# Menor bloco (em pixels da imagem em que roda) com que a limiarização adaptativa
+# reproduz o resultado da resolução cheia reduzido: com blocos menores o resultado
+# é um pontilhado do ruído fino, que a proxy não tem (ver bench_proxy)
+ADAPTIVE_PREVIEW_BLOCK = 31
+
+
+def _adaptive_threshold(tools, image, scale, method='mean', block_size=11):
+    from models.utils import scaled_kernel_size
+    # O bloco acompanha a escala para cobrir a mesma vizinhança da resolução cheia;
+    # a escala nunca fica abaixo de _adaptive_preview_scale
+    block_size = scaled_kernel_size(block_size, scale, minimum=3)
+    if method == 'mean':
+        return tools.threshold_model.adaptive_threshold_mean(image, block_size=block_size)
+    return tools.threshold_model.adaptive_threshold_gaussian(image, block_size=block_size)
+
+
+def _adaptive_preview_scale(block_size=11, **params):
+    return ADAPTIVE_PREVIEW_BLOCK / block_size
+
+
+def _sobel(tools, image, scale, ksize=3):
+    # O kernel não acompanha a escala: as derivadas são tomadas na vizinhança de
+    # cada pixel, e a proxy (reduzida por média) já é a cena vista nessa escala
+    # As bordas são desenhadas em cor: a base em cinza é expandida (o cinza vem do cache)
+    image = tools.derived.bgr(image)
+    edges = tools.edge_model.detect_sobel_edges(image, ksize=ksize)
+    return tools.edge_model.overlay_edges_on_image(image, edges)
+
+
+def _laplacian(tools, image, scale, ksize=3):
+    image = tools.derived.bgr(image)
+    edges = tools.edge_model.detect_laplacian_edges(image, ksize=ksize)
+    return tools.edge_model.overlay_edges_on_image(image, edges)
+
+
+def _canny(tools, image, scale, threshold1=100, threshold2=200, blur_ksize=3):
+    # A suavização não é reduzida: na proxy ela continua suprimindo as bordas finas
+    # que, na resolução cheia, somem ao reduzir para exibição (ver bench_proxy)
+    image = tools.derived.bgr(image)
+    edges = tools.edge_model.detect_canny_edges(image, threshold1=threshold1, threshold2=threshold2,
+                                                blur_ksize=blur_ksize, sparse=True)
+    return tools.edge_model.overlay_edges_on_image(image, edges)
+
+
+# ========== LUTs equivalentes (histograma derivado) ==========
+def _brightness_luts(hists, brightness):
+    from models.point_ops import brightness_lut
+    return [brightness_lut(brightness)], False
+
+
+def _contrast_luts(hists, contrast):
+    from models.point_ops import contrast_lut
+    return [contrast_lut(contrast)], False
+
+
+def _brightness_contrast_luts(hists, brightness, contrast):
+    from models.point_ops import brightness_contrast_lut
+    return [brightness_contrast_lut(brightness, contrast)], False
+
+
+def _equalize_luts(hists):
+    from models.point_ops import equalize_lut
+    return [equalize_lut(hist) for hist in hists()], False
+
+
+def _binary_luts(hists, threshold_value):
+    from models.point_ops import threshold_lut
+    return [threshold_lut('binary', threshold_value)], True
+
+
+def _quantize_luts(hists, num_levels):
+    from models.point_ops import quantize_lut
+    return [quantize_lut(num_levels)], True
+
+
+BRIGHTNESS = Param('brightness', float, 0, -100, 100, "Digite o valor de brilho (-100 a +100):")
+CONTRAST = Param('contrast', float, 1.0, 0.5, 3.0, "Digite o valor de contraste (0.5 a 3.0):")
+KSIZE = Param('ksize', int, 3, 1, 7, "Tamanho do kernel (1,3,5,7):", odd=True)
+
+OPERATIONS = {operation.name: operation for operation in [
+    Operation('convert_to_rgba', _color('rgb_to_rgba')),
+    Operation('convert_to_cmyk', _color('rgb_to_cmyk')),
+    Operation('convert_to_hsv', _color('rgb_to_hsv')),
+    Operation('convert_to_lab', _color('rgb_to_lab')),
+    Operation('convert_to_gray', lambda tools, image, scale: tools.derived.gray(image)),
+    Operation('equalize_histogram', lambda tools, image, scale: tools.histogram_model.equalize_histogram(image),
+              luts=_equalize_luts),
+    Operation('adjust_brightness', lambda tools, image, scale, brightness:
+              tools.histogram_model.adjust_brightness(image, brightness),
+              (BRIGHTNESS,), from_original=True, luts=_brightness_luts),
+    Operation('adjust_contrast', lambda tools, image, scale, contrast:
+              tools.histogram_model.adjust_contrast(image, contrast),
+              (CONTRAST,), from_original=True, luts=_contrast_luts),
+    Operation('adjust_brightness_contrast', lambda tools, image, scale, brightness, contrast:
+              tools.histogram_model.adjust_brightness_contrast(image, brightness, contrast),
+              (BRIGHTNESS, CONTRAST), from_original=True, luts=_brightness_contrast_luts),
+    Operation('apply_point_ops', lambda tools, image, scale, ops: tools.histogram_model.apply_point_ops(image, ops),
+              (Param('ops', list, ()),)),
+    Operation('apply_binary_threshold', lambda tools, image, scale, threshold_value:
+              tools.threshold_model.binary_threshold(image, threshold_value),
+              (Param('threshold_value', int, 128, 0, 255, "Digite o valor de threshold (0 a 255):"),),
+              from_original=True, luts=_binary_luts),
+    Operation('apply_otsu_threshold', lambda tools, image, scale: tools.threshold_model.otsu_threshold(image)),
+    Operation('apply_multi_otsu_threshold', lambda tools, image, scale, num_classes:
+              tools.threshold_model.multi_otsu_threshold(image, num_classes),
+              (Param('num_classes', int, 3, 2, 8, "Número de classes (2 a 8):"),)),
+    Operation('apply_adaptive_threshold', _adaptive_threshold, (
+        Param('method', str, 'mean', choices=('mean', 'gaussian')),
+        Param('block_size', int, 11, 3, 255, "Tamanho do bloco (3 a 255, ímpar):", odd=True),
+    ),
+              preview_scale=_adaptive_preview_scale),
+    Operation('apply_quantize_threshold', lambda tools, image, scale, num_levels:
+              tools.threshold_model.quantize_threshold(image, num_levels),
+              (Param('num_levels', int, 4, 2, 16, "Número de níveis (2 a 16):"),),
+              from_original=True, luts=_quantize_luts),
+    Operation('apply_sobel', _sobel, (KSIZE,)),
+    Operation('apply_laplacian', _laplacian, (KSIZE,)),
+    Operation('apply_canny', _canny, (
+        Param('threshold1', int, 100, 0, 255, "Threshold1 (0-255):"),
+        Param('threshold2', int, 200, 'threshold1', 255, "Threshold2 (0-255):"),
+        Param('blur_ksize', int, 3, 1, 7, "Gaussian blur ksize (1,3,5,7):", odd=True),
+    )),
+]}
+
+COLOR_MENU = "Conversão de Cores"
+ADJUSTMENTS_MENU = "Ajustes"
+SEGMENTATION_MENU = "Segmentação"
+EDGES_MENU = "Detecção de Bordas"
+
+COMMANDS = {command.key: command for command in [
+    Command('rgba', 'convert_to_rgba', "RGB → RGBA", "Conversão RGB → RGBA aplicada.", COLOR_MENU),
+    Command('cmyk', 'convert_to_cmyk', "RGB → CMYK", "Conversão RGB → CMYK aplicada.", COLOR_MENU),
+    Command('hsv', 'convert_to_hsv', "RGB → HSV", "Conversão RGB → HSV aplicada.", COLOR_MENU),
+    Command('lab', 'convert_to_lab', "RGB → LAB", "Conversão RGB → LAB aplicada.", COLOR_MENU),
+    Command('gray', 'convert_to_gray', "Converter para tons de cinza", "Conversão para tons de cinza aplicada.",
+            COLOR_MENU, separator=True),
+    Command('brightness', 'adjust_brightness', "Ajustar Brilho", "Brilho ajustado para: {brightness}",
+            ADJUSTMENTS_MENU),
+    Command('contrast', 'adjust_contrast', "Ajustar Contraste", "Contraste ajustado para: {contrast}",
+            ADJUSTMENTS_MENU),
+    Command('brightness_contrast', 'adjust_brightness_contrast', "Brilho e Contraste",
+            "Brilho: {brightness}, Contraste: {contrast} aplicados.", ADJUSTMENTS_MENU),
+    Command('equalize', 'equalize_histogram', "Equalizar Histograma", "Equalização de histograma aplicada.",
+            ADJUSTMENTS_MENU, separator=True),
+    Command('binary', 'apply_binary_threshold', "Limiarização Binária",
+            "Limiarização binária aplicada com threshold: {threshold_value}", SEGMENTATION_MENU),
+    Command('otsu', 'apply_otsu_threshold', "Limiarização Otsu", "Limiarização Otsu aplicada.", SEGMENTATION_MENU),
+    Command('multi_otsu', 'apply_multi_otsu_threshold', "Limiarização Multi-Otsu...",
+            "Limiarização Multi-Otsu aplicada ({num_classes} classes).", SEGMENTATION_MENU),
+    Command('adaptive_mean', 'apply_adaptive_threshold', "Limiarização Adaptativa (Média)",
+            "Limiarização adaptativa (média) aplicada (bloco {block_size}).", SEGMENTATION_MENU,
+            fixed={'method': 'mean'}),
+    Command('adaptive_gaussian', 'apply_adaptive_threshold', "Limiarização Adaptativa (Gaussiana)",
+            "Limiarização adaptativa (Gaussiana) aplicada (bloco {block_size}).", SEGMENTATION_MENU,
+            fixed={'method': 'gaussian'}),
+    Command('quantize', 'apply_quantize_threshold', "Quantização em tons de cinza",
+            "Quantização em tons de cinza aplicada (N={num_levels}).", SEGMENTATION_MENU),
+    Command('sobel', 'apply_sobel', "Aplicar Detecção (Sobel)", "Sobel aplicado (ksize={ksize}).", EDGES_MENU),
+    Command('laplacian', 'apply_laplacian', "Laplaciano", "Laplaciano aplicado (ksize={ksize}).", EDGES_MENU),
+    Command('canny', 'apply_canny', "Canny",
+            "Canny aplicado (t1={threshold1}, t2={threshold2}, blur={blur_ksize}).", EDGES_MENU),
+]}
+
+
+def menu_commands(menu):
+    """Comandos de um menu, na ordem do registro"""
+    return [command for command in COMMANDS.values() if command.menu == menu]
@@ -0,0 +1,68 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+
+class StripExecutor:
+    """Divide a imagem em faixas horizontais e processa as faixas em um pool de threads.
+
+    Cada faixa é lida com ``halo`` linhas extras acima e abaixo (o raio do
+    kernel da operação) e só a parte central do resultado é usada; nas
+    bordas da imagem a faixa termina junto com ela. Assim o resultado é
+    idêntico, bit a bit, ao da imagem inteira. As funções do OpenCV liberam
+    o GIL, então as faixas rodam de fato em paralelo.
+    """
+
+    def __init__(self, workers=None, min_strip_rows=64):
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self.min_strip_rows = min_strip_rows
+        self._pool = None
+        self._lock = threading.Lock()
+
+    def _get_pool(self):
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="faixas")
+            return self._pool
+
+    def strips(self, height):
+        """Limites (y0, y1) das faixas: uma por worker, sem faixas menores que ``min_strip_rows``"""
+        count = max(1, min(self.workers, height // self.min_strip_rows))
+        edges = np.linspace(0, height, count + 1).astype(int)
+        return list(zip(edges[:-1], edges[1:]))
+
+    def map(self, func, image, halo=0, out=None):
+        """Aplica ``func`` por faixas e junta os resultados (mesmo resultado de ``func(image)``).
+
+        Com ``out`` cada faixa é gravada direto nele, sem alocar o resultado inteiro.
+        """
+        height = image.shape[0]
+        strips = self.strips(height)
+        if len(strips) == 1:
+            if out is None:
+                return func(image)
+            out[...] = func(image)
+            return out
+
+        def run(bounds):
+            y0, y1 = bounds
+            top = max(0, y0 - halo)
+            result = func(image[top:min(height, y1 + halo)])[y0 - top:y0 - top + (y1 - y0)]
+            if out is None:
+                return result
+            out[y0:y1] = result
+
+        results = list(self._get_pool().map(run, strips))
+        return out if out is not None else np.concatenate(results, axis=0)
+
+    def submit(self, func, *args):
+        """Executa ``func(*args)`` no mesmo pool (tarefas inteiras, ex.: lotes de imagens); retorna o Future"""
+        return self._get_pool().submit(func, *args)
+
+    def shutdown(self):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False)
+                self._pool = None
@@ -0,0 +1,179 @@
+import hashlib
+from collections import OrderedDict
+
+from models.operations import OPERATIONS
+
+
+def image_key(image):
+    """Hash do conteúdo de uma imagem (pixels, formato e tipo)"""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(repr((image.shape, str(image.dtype))).encode())
+    digest.update(memoryview(image).cast("B") if image.flags.c_contiguous else image.tobytes())
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """Cache LRU de imagens limitado pela memória ocupada (em bytes)"""
+
+    def __init__(self, max_bytes=512 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self._items = OrderedDict()
+
+    def __contains__(self, key):
+        return key in self._items
+
+    def __len__(self):
+        return len(self._items)
+
+    def holds(self, image):
+        """A própria ``image`` (não uma cópia) está no cache?"""
+        return any(item is image for item in self._items.values())
+
+    def get(self, key):
+        image = self._items.get(key)
+        if image is not None:
+            self._items.move_to_end(key)
+        return image
+
+    def put(self, key, image):
+        if key in self._items:
+            self.nbytes -= self._items.pop(key).nbytes
+        if image.nbytes > self.max_bytes:
+            return
+        self._items[key] = image
+        self.nbytes += image.nbytes
+        # Remove os menos usados até caber no limite
+        while self.nbytes > self.max_bytes:
+            _, old = self._items.popitem(last=False)
+            self.nbytes -= old.nbytes
+
+    def clear(self):
+        self._items.clear()
+        self.nbytes = 0
+
+
+class PipelineNode:
+    """Uma operação aplicada, com seus parâmetros"""
+
+    def __init__(self, name, params, from_original=False):
+        self.name = name
+        self.params = dict(params)
+        self.from_original = from_original
+        self.key = None
+
+    def __repr__(self):
+        return f"PipelineNode({self.name!r}, {self.params!r})"
+
+
+class Pipeline:
+    """Sequência não destrutiva de operações com cache dos resultados intermediários.
+
+    Cada nó lê a saída do nó anterior, ou a imagem de origem quando a
+    operação sempre parte da original (brilho, threshold...), formando um
+    DAG a partir da origem. A saída de cada nó fica no cache sob uma chave
+    que combina nome e parâmetros do nó com a chave da saída de onde ele lê;
+    a chave da origem é o hash dos pixels. Assim, alterar o passo k só
+    recalcula os passos k..n que dependem dele.
+
+    ``operations`` mapeia nome → (função(imagem, escala, **params), parte da original?),
+    como em ``Model._operations``.
+    """
+
+    def __init__(self, operations, cache_bytes=512 * 1024 * 1024):
+        self.operations = operations
+        self.cache = ResultCache(cache_bytes)
+        self.nodes = []
+        self.source = None
+        self.source_key = None
+
+    def set_source(self, image):
+        """Define a imagem de origem e remove todos os nós"""
+        self.nodes = []
+        self.source = image
+        self.source_key = image_key(image) if image is not None else None
+
+    def _node_key(self, node, upstream_key):
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(repr((node.name, sorted(node.params.items()), upstream_key)).encode())
+        return digest.hexdigest()
+
+    def _refresh_keys(self, start=0):
+        upstream = self.nodes[start - 1].key if start > 0 else self.source_key
+        for node in self.nodes[start:]:
+            node.key = self._node_key(node, self.source_key if node.from_original else upstream)
+            upstream = node.key
+
+    def output(self, index=None):
+        """Saída do nó ``index`` (padrão: o último), usando o cache sempre que possível"""
+        if self.source is None:
+            return None
+        if index is None:
+            index = len(self.nodes) - 1
+        if index < 0:
+            return self.source
+
+        node = self.nodes[index]
+        cached = self.cache.get(node.key)
+        if cached is not None:
+            return cached
+        upstream = self.source if node.from_original else self.output(index - 1)
+        func, _ = self.operations[node.name]
+        result = func(upstream, 1.0, **node.params)
+        self.cache.put(node.key, result)
+        return result
+
+    def append(self, name, params=None, result=None):
+        """Acrescenta uma operação; ``result`` evita recalcular quando a saída já é conhecida"""
+        _, from_original = self.operations[name]
+        self.nodes.append(PipelineNode(name, params or {}, from_original))
+        self._refresh_keys(len(self.nodes) - 1)
+        if result is not None:
+            self.cache.put(self.nodes[-1].key, result)
+        return self.output()
+
+    def update(self, index, **params):
+        """Altera parâmetros do passo ``index``; só ele e os seguintes são recalculados.
+
+        Os parâmetros combinados são validados pelo registro antes de tocar o
+        nó: um valor inválido (TypeError/ValueError) deixa o passo como estava.
+        """
+        node = self.nodes[index]
+        node.params = OPERATIONS[node.name].resolve({**node.params, **params})
+        self._refresh_keys(index)
+        return self.output()
+
+    def insert(self, index, name, params=None):
+        """Insere uma operação na posição ``index``, com os parâmetros validados pelo registro"""
+        _, from_original = self.operations[name]
+        params = OPERATIONS[name].resolve(params or {})
+        self.nodes.insert(index, PipelineNode(name, params, from_original))
+        self._refresh_keys(index)
+        return self.output()
+
+    def remove(self, index):
+        del self.nodes[index]
+        self._refresh_keys(index)
+        return self.output()
+
+    def restore(self, steps, output=None):
+        """Substitui os nós por uma lista de (nome, parâmetros); saídas já calculadas vêm do cache.
+
+        ``output``: saída já conhecida do último nó (ex.: guardada pelo
+        histórico), devolvida no lugar de buscá-la ou recalculá-la.
+        """
+        self.nodes = [PipelineNode(name, params, self.operations[name][1]) for name, params in steps]
+        self._refresh_keys()
+        if output is not None and self.nodes:
+            self.cache.put(self.nodes[-1].key, output)
+            return output
+        return self.output()
+
+    def clear(self):
+        """Remove todos os nós (a saída volta a ser a origem)"""
+        self.nodes = []
+
+    @property
+    def steps(self):
+        """Lista de (nome, parâmetros) na ordem de aplicação"""
+        return [(node.name, dict(node.params)) for node in self.nodes]
@@ -0,0 +1,201 @@
+import cv2
+import numpy as np
+
+# Rampa 0..255: aplicar uma operação pontual a ela gera a LUT exata da operação
+_RAMP = np.arange(256, dtype=np.uint8).reshape(1, 256)
+
+# Operações que, como em ThresholdModel, trabalham sobre a imagem em tons de cinza
+GRAY_OPERATIONS = ('binary', 'binary_inv', 'truncate', 'to_zero', 'to_zero_inv', 'quantize')
+
+_THRESHOLD_TYPES = {
+    'binary': cv2.THRESH_BINARY,
+    'binary_inv': cv2.THRESH_BINARY_INV,
+    'truncate': cv2.THRESH_TRUNC,
+    'to_zero': cv2.THRESH_TOZERO,
+    'to_zero_inv': cv2.THRESH_TOZERO_INV,
+}
+
+
+def brightness_lut(brightness):
+    """LUT equivalente a HistogramModel.adjust_brightness"""
+    return cv2.convertScaleAbs(_RAMP, alpha=1.0, beta=int(brightness * 2.55))[0]
+
+
+def contrast_lut(contrast):
+    """LUT equivalente a HistogramModel.adjust_contrast"""
+    return cv2.convertScaleAbs(_RAMP, alpha=float(contrast), beta=0)[0]
+
+
+def brightness_contrast_lut(brightness, contrast):
+    """LUT equivalente a HistogramModel.adjust_brightness_contrast"""
+    return cv2.convertScaleAbs(_RAMP, alpha=float(contrast), beta=int(brightness * 2.55))[0]
+
+
+def threshold_lut(kind, threshold_value, max_value=255):
+    """LUT das limiarizações simples de ThresholdModel (binary, truncate, to_zero...)"""
+    _, lut = cv2.threshold(_RAMP, threshold_value, max_value, _THRESHOLD_TYPES[kind])
+    return lut[0]
+
+
+def quantize_lut(num_levels=4):
+    """LUT equivalente a ThresholdModel.quantize_threshold"""
+    num_levels = max(2, min(256, int(num_levels)))
+    level_size = max(1, 256 // num_levels)
+    return ((_RAMP[0] // level_size) * level_size).astype(np.uint8)
+
+
+def multi_otsu_lut(thresholds, num_classes=None):
+    """LUT da segmentação multi-Otsu: valores até o limiar ``t`` vão para a classe de baixo"""
+    num_classes = num_classes or len(thresholds) + 1
+    classes = np.searchsorted(np.asarray(thresholds), _RAMP[0], side='left')
+    return ((255 * (classes + 1)) // num_classes).astype(np.uint8)
+
+
+def equalize_lut(hist):
+    """LUT de cv2.equalizeHist calculada a partir de um histograma de 256 posições"""
+    hist = np.asarray(hist, dtype=np.int64).ravel()
+    lut = np.zeros(256, dtype=np.uint8)
+    nonzero = np.flatnonzero(hist)
+    if len(nonzero) == 0:
+        return lut
+    first = nonzero[0]
+    total = hist.sum()
+    if hist[first] == total:
+        # Imagem constante: equalizeHist preenche com o próprio valor
+        lut[:] = first
+        return lut
+    # Mesma aritmética (float32) da implementação do OpenCV
+    scale = np.float32(255.0 / (total - hist[first]))
+    cumulative = np.cumsum(hist[first + 1:]).astype(np.float32) * scale
+    lut[first + 1:] = np.clip(np.rint(cumulative), 0, 255).astype(np.uint8)
+    return lut
+
+
+def remap_histogram(hist, lut):
+    """Histograma da imagem depois de aplicar ``lut``, sem reler os pixels (O(256))"""
+    return np.bincount(np.asarray(lut).ravel(), weights=np.asarray(hist, dtype=np.float64).ravel(),
+                       minlength=256)
+
+
+class PointOpChain:
+    """Compila uma sequência de operações pontuais (uint8 → uint8) em LUTs.
+
+    Brilho, contraste, quantização, limiarizações simples e equalização
+    são compostos em uma LUT de 256 posições por canal e aplicados com um
+    único ``cv2.LUT``; compor operações custa O(256), não O(pixels).
+
+    As operações são tuplas ``(nome, *args)``, por exemplo::
+
+        [('brightness', 20), ('contrast', 1.5), ('equalize',), ('binary', 128)]
+
+    Operações de limiarização/quantização, como em ThresholdModel, atuam
+    sobre a imagem em tons de cinza e devolvem BGR. Em imagens coloridas a
+    conversão para cinza acontece no ponto em que a primeira delas aparece:
+    o que vem antes é fundido em uma LUT por canal e o restante em uma LUT
+    sobre o cinza (duas passadas no total).
+    """
+
+    def __init__(self, ops=None):
+        self.ops = [tuple(op) for op in (ops or [])]
+
+    def add(self, name, *args):
+        self.ops.append((name,) + args)
+        return self
+
+    def _split(self, image):
+        """Separa as operações em (por canal, sobre cinza)"""
+        if len(image.shape) == 2:
+            return [], self.ops
+        for i, op in enumerate(self.ops):
+            if op[0] in GRAY_OPERATIONS:
+                return self.ops[:i], self.ops[i:]
+        return self.ops, []
+
+    @staticmethod
+    def _compose(ops, luts, histograms_of):
+        """Aplica as operações às LUTs (uma por canal) sem tocar nos pixels"""
+        for name, *args in ops:
+            if name == 'equalize':
+                hists = histograms_of()
+                luts = [equalize_lut(remap_histogram(h, lut))[lut] for h, lut in zip(hists, luts)]
+                continue
+            if name == 'brightness':
+                op_lut = brightness_lut(*args)
+            elif name == 'contrast':
+                op_lut = contrast_lut(*args)
+            elif name == 'brightness_contrast':
+                op_lut = brightness_contrast_lut(*args)
+            elif name == 'quantize':
+                op_lut = quantize_lut(*args)
+            elif name in _THRESHOLD_TYPES:
+                op_lut = threshold_lut(name, *args)
+            else:
+                raise ValueError(f"Operação pontual desconhecida: {name}")
+            luts = [op_lut[lut] for lut in luts]
+        return luts
+
+    def compile(self, image, histograms=None, gray_histogram=None):
+        """Retorna (LUTs por canal, LUT sobre cinza ou None) para esta imagem.
+
+        A imagem só é lida se houver equalização (para obter o histograma).
+        ``histograms()`` e ``gray_histogram(LUTs por canal)`` substituem o
+        cálculo dos histogramas (ex.: somados bloco a bloco em models.tiled).
+        """
+        channel_ops, gray_ops = self._split(image)
+        channels = image.shape[2] if len(image.shape) == 3 else 1
+
+        if histograms is None:
+            def histograms():
+                if channels == 1:
+                    return [cv2.calcHist([image], [0], None, [256], [0, 256]).ravel()]
+                return [cv2.calcHist([image], [i], None, [256], [0, 256]).ravel() for i in range(channels)]
+        if gray_histogram is None:
+            def gray_histogram(luts):
+                return self._gray_hist(image, luts)
+
+        identity = _RAMP[0]
+        if channels == 1:
+            return self._compose(gray_ops, [identity], histograms), None
+
+        channel_luts = self._compose(channel_ops, [identity] * channels, histograms)
+        if not gray_ops:
+            return channel_luts, None
+        gray_lut = self._compose(gray_ops, [identity], lambda: [gray_histogram(channel_luts)])[0]
+        return channel_luts, gray_lut
+
+    @staticmethod
+    def _gray_hist(image, channel_luts):
+        gray = cv2.cvtColor(PointOpChain._apply_luts(image, channel_luts), cv2.COLOR_BGR2GRAY)
+        return cv2.calcHist([gray], [0], None, [256], [0, 256]).ravel()
+
+    @staticmethod
+    def _apply_luts(image, luts):
+        if len(luts) == 1:
+            return cv2.LUT(image, luts[0])
+        if all(lut is luts[0] or np.array_equal(lut, luts[0]) for lut in luts[1:]):
+            return cv2.LUT(image, luts[0])
+        return cv2.LUT(image, np.dstack(luts).reshape(256, 1, len(luts)))
+
+    def apply(self, image):
+        """Aplica a cadeia inteira à imagem"""
+        if not self.ops:
+            return image.copy()
+        return self.apply_compiled(image, *self.compile(image))
+
+    def apply_compiled(self, image, channel_luts, gray_lut=None):
+        """Aplica LUTs já compiladas (de ``compile``) à imagem"""
+        if len(image.shape) == 2:
+            result = cv2.LUT(image, channel_luts[0])
+            # Como em ThresholdModel, limiarizações devolvem BGR
+            if any(op[0] in GRAY_OPERATIONS for op in self.ops):
+                return cv2.cvtColor(result, cv2.COLOR_GRAY2BGR)
+            return result
+        if gray_lut is None:
+            return self._apply_luts(image, channel_luts)
+
+        identity = _RAMP[0]
+        if all(np.array_equal(lut, identity) for lut in channel_luts):
+            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        else:
+            gray = cv2.cvtColor(self._apply_luts(image, channel_luts), cv2.COLOR_BGR2GRAY)
+        return cv2.cvtColor(cv2.LUT(gray, gray_lut), cv2.COLOR_GRAY2BGR)
@@ -0,0 +1,172 @@
+"""Instrumentação: intervalos cronometrados (spans) guardados em um buffer circular.
+
+Uso::
+
+    from models.profiler import profiler
+
+    with profiler.span('op', 'apply_canny'):
+        ...
+
+As categorias usadas na aplicação são ``action`` (cada método do
+Controller chamado pela interface), ``op`` (operação do Model, na
+resolução cheia ou na proxy), ``histogram``, ``resize``, ``convert``
+(array → PIL → PhotoImage) e ``render`` (blocos do viewport, desenho do
+histograma). Desligado, ``span`` devolve sempre o mesmo objeto vazio: o
+custo fica em uma chamada de método e um teste.
+"""
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+
+
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ('profiler', 'category', 'name', 'args', 'start')
+
+    def __init__(self, profiler, category, name, args):
+        self.profiler = profiler
+        self.category = category
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.record(self.category, self.name, self.start, time.perf_counter_ns(), self.args)
+        return False
+
+
+class Profiler:
+    """Guarda os últimos ``capacity`` spans e os exporta como trace do Chrome (chrome://tracing, Perfetto).
+
+    Pode ser usado de várias threads: cada span registra a thread em que
+    rodou (a prévia dos sliders, por exemplo, aparece na thread ``preview``).
+    """
+
+    def __init__(self, capacity=20000, enabled=False):
+        self.enabled = enabled
+        self._spans = deque(maxlen=capacity)
+        # Total de spans já registrados (o buffer só guarda os últimos)
+        self._count = 0
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter_ns()
+
+    def span(self, category, name=None, **args):
+        """Context manager que cronometra o bloco (não faz nada se desligado)"""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, category, name or category, args)
+
+    def record(self, category, name, start_ns, end_ns, args=None):
+        thread = threading.current_thread()
+        with self._lock:
+            self._spans.append((category, name, start_ns, end_ns - start_ns, thread.ident, thread.name, args))
+            self._count += 1
+
+    def wrap(self, func, category, name=None):
+        """Função que chama ``func`` dentro de um span (o teste de ``enabled`` é feito a cada chamada)"""
+        name = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not self.enabled:
+                return func(*args, **kwargs)
+            with _Span(self, category, name, None):
+                return func(*args, **kwargs)
+        return wrapper
+
+    def mark(self):
+        """Posição atual no registro, para ``spans(since=...)``"""
+        with self._lock:
+            return self._count
+
+    def spans(self, since=None):
+        """Spans guardados: (categoria, nome, início ns, duração ns, thread, nome da thread, args)"""
+        with self._lock:
+            spans = list(self._spans)
+            if since is not None:
+                spans = spans[max(0, len(spans) - (self._count - since)):]
+        return spans
+
+    def clear(self):
+        with self._lock:
+            self._spans.clear()
+
+    def summary(self, since=None):
+        """Totais por (categoria, nome), do maior tempo total para o menor.
+
+        Lista de (categoria, nome, chamadas, total ms, média ms, máximo ms).
+        """
+        totals = {}
+        for category, name, _, duration, _, _, _ in self.spans(since):
+            entry = totals.setdefault((category, name), [0, 0, 0])
+            entry[0] += 1
+            entry[1] += duration
+            entry[2] = max(entry[2], duration)
+        rows = [(category, name, count, total / 1e6, total / count / 1e6, peak / 1e6)
+                for (category, name), (count, total, peak) in totals.items()]
+        return sorted(rows, key=lambda row: row[3], reverse=True)
+
+    def category_totals(self, since=None, thread=None, exclusive=False):
+        """Tempo total (ms) por categoria; ``thread`` restringe a uma thread.
+
+        Com ``exclusive`` cada span conta só o tempo fora dos spans internos
+        a ele na mesma thread (ex.: ``render`` sem os seus ``resize`` e
+        ``convert``), e os totais somam no máximo o tempo de parede.
+        """
+        spans = [span for span in self.spans(since) if thread is None or span[4] == thread]
+        durations = [span[3] for span in spans]
+        if exclusive:
+            # Spans de uma thread são aninhados (context managers): pilha dos que contêm o atual
+            open_spans = {}
+            for i in sorted(range(len(spans)), key=lambda i: (spans[i][2], -spans[i][3])):
+                _, _, start, duration, ident, _, _ = spans[i]
+                stack = open_spans.setdefault(ident, [])
+                while stack and spans[stack[-1]][2] + spans[stack[-1]][3] <= start:
+                    stack.pop()
+                if stack:
+                    durations[stack[-1]] -= duration
+                stack.append(i)
+        totals = {}
+        for span, duration in zip(spans, durations):
+            totals[span[0]] = totals.get(span[0], 0.0) + duration / 1e6
+        return totals
+
+    def to_chrome_trace(self):
+        """Dicionário no formato Trace Event do Chrome (eventos completos ``ph: X``, em µs)"""
+        pid = os.getpid()
+        events, threads = [], {}
+        for category, name, start, duration, ident, thread_name, args in self.spans():
+            threads[ident] = thread_name
+            event = {'name': name, 'cat': category, 'ph': 'X', 'pid': pid, 'tid': ident,
+                     'ts': (start - self._origin) / 1000, 'dur': duration / 1000}
+            if args:
+                event['args'] = {key: str(value) for key, value in args.items()}
+            events.append(event)
+        for ident, thread_name in threads.items():
+            events.append({'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': ident,
+                           'args': {'name': thread_name}})
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def export_chrome_trace(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.to_chrome_trace(), f)
+
+
+# Instância usada pela aplicação; PDI_PROFILE=1 liga desde o início
+profiler = Profiler(enabled=os.environ.get('PDI_PROFILE', '') not in ('', '0'))
@@ -0,0 +1,102 @@
+"""Receitas: a sequência de operações do pipeline gravada em arquivo (JSON, ou YAML com PyYAML).
+
+Formato (versão 1)::
+
+    {"format": "pdi-recipe", "version": 1,
+     "steps": [{"operation": "convert_to_lab", "params": {}},
+               {"operation": "equalize_histogram", "params": {}},
+               {"operation": "apply_adaptive_threshold", "params": {"method": "gaussian"}}]}
+
+Os nomes e parâmetros são os do registro (models.operations). Ao
+carregar, cada passo é validado contra o registro e os parâmetros
+omitidos recebem o padrão, então a receita sempre descreve o resultado
+por completo. ``recipe_key`` identifica o conteúdo da receita (usado pelo
+batch.py para saber se uma saída já foi gerada com ela).
+"""
+import hashlib
+import json
+import os
+
+from models.operations import OPERATIONS
+
+RECIPE_FORMAT = "pdi-recipe"
+RECIPE_VERSION = 1
+YAML_EXTENSIONS = (".yaml", ".yml")
+
+
+def _yaml():
+    try:
+        import yaml
+    except ImportError:
+        raise ValueError("Receitas YAML precisam do PyYAML (pip install pyyaml)") from None
+    return yaml
+
+
+def _plain(value):
+    # Tuplas (ex.: apply_point_ops) viram listas, como ficam no JSON/YAML
+    if isinstance(value, (list, tuple)):
+        return [_plain(item) for item in value]
+    return value
+
+
+def recipe_from_steps(steps):
+    """Receita a partir de uma lista de (operação, parâmetros), ex.: ``Model.steps``"""
+    return {
+        'format': RECIPE_FORMAT,
+        'version': RECIPE_VERSION,
+        'steps': [{'operation': name, 'params': {key: _plain(value) for key, value in params.items()}}
+                  for name, params in steps],
+    }
+
+
+def steps_from_recipe(recipe):
+    """Lista de (operação, parâmetros completos); ValueError se a receita for inválida"""
+    if not isinstance(recipe, dict) or recipe.get('format') != RECIPE_FORMAT:
+        raise ValueError("Arquivo não é uma receita do PDI Studio")
+    version = recipe.get('version')
+    if not isinstance(version, int) or version > RECIPE_VERSION:
+        raise ValueError(f"Versão de receita sem suporte: {version} (máximo {RECIPE_VERSION})")
+    steps = []
+    for i, step in enumerate(recipe.get('steps') or []):
+        name = step.get('operation') if isinstance(step, dict) else None
+        if name not in OPERATIONS:
+            raise ValueError(f"Passo {i + 1}: operação desconhecida: {name}")
+        try:
+            params = OPERATIONS[name].resolve(step.get('params') or {})
+        except (TypeError, ValueError) as exc:
+            raise ValueError(f"Passo {i + 1}: {exc}") from None
+        steps.append((name, {key: _plain(value) for key, value in params.items()}))
+    return steps
+
+
+def recipe_key(steps, options=None):
+    """Hash do conteúdo da receita (operações e parâmetros completos, em ordem) e das
+    ``options`` de execução que mudam o resultado (ex.: o Sobel de pouca memória do batch.py)"""
+    content = [[name, params] for name, params in steps] + ([options] if options else [])
+    text = json.dumps(content, sort_keys=True, separators=(",", ":"))
+    return hashlib.blake2b(f"{RECIPE_VERSION}:{text}".encode(), digest_size=16).hexdigest()
+
+
+def save_recipe(path, steps):
+    """Grava ``steps`` como receita; YAML pela extensão (.yaml/.yml), senão JSON"""
+    recipe = recipe_from_steps(steps)
+    # PyYAML é conferido antes de abrir: sem ele o arquivo existente fica intacto
+    yaml = _yaml() if os.path.splitext(path)[1].lower() in YAML_EXTENSIONS else None
+    with open(path, 'w', encoding='utf-8') as f:
+        if yaml is not None:
+            yaml.safe_dump(recipe, f, allow_unicode=True, sort_keys=False)
+        else:
+            json.dump(recipe, f, ensure_ascii=False, indent=2)
+            f.write("\n")
+    return recipe
+
+
+def load_recipe(path):
+    """Lê uma receita e devolve a lista de (operação, parâmetros) validada"""
+    yaml = _yaml() if os.path.splitext(path)[1].lower() in YAML_EXTENSIONS else None
+    with open(path, encoding='utf-8') as f:
+        try:
+            recipe = yaml.safe_load(f) if yaml else json.load(f)
+        except (ValueError, getattr(yaml, 'YAMLError', ValueError)) as exc:
+            raise ValueError(f"Receita inválida: {exc}") from None
+    return steps_from_recipe(recipe)
@@ -1,160 +1,190 @@
 import cv2
 import numpy as np
-from PIL import Image, ImageTk
+
+from models.point_ops import multi_otsu_lut
 
 class ThresholdModel:
-    def __init__(self):
-        pass
+    def __init__(self, executor=None, derived=None, expand_gray=True):
+        # Executor de faixas em paralelo (models.parallel.StripExecutor); None = serial
+        self.executor = executor
+        # Cache de representações (models.derived_images.DerivedImages): a conversão
+        # para cinza de uma mesma imagem é feita uma vez e compartilhada com EdgeModel
+        self.derived = derived
+        # False: os resultados ficam com um canal só (o Model expande para BGR só
+        # quando precisa); True: devolve BGR, como sempre
+        self.expand_gray = expand_gray
+
+    def _gray(self, image):
+        if len(image.shape) == 2:
+            return image
+        if self.derived is not None:
+            return self.derived.gray(image)
+        return cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+
+    def _output(self, gray):
+        """Resultado em cinza: convertido de volta para 3 canais para manter consistência"""
+        if not self.expand_gray:
+            return gray
+        return cv2.cvtColor(gray, cv2.COLOR_GRAY2BGR)
+
+    def _map(self, func, image, halo):
+        if self.executor is None:
+            return func(image)
+        return self.executor.map(func, image, halo)
 
     def binary_threshold(self, image, threshold_value):
         """Aplica limiarização binária simples"""
-        if len(image.shape) == 3:
-            # Converte para escala de cinza primeiro
-            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-        else:
-            gray = image.copy()
+        gray = self._gray(image)
         
         # Aplica limiarização binária
         _, binary = cv2.threshold(gray, threshold_value, 255, cv2.THRESH_BINARY)
         
         # Converte de volta para 3 canais para manter consistência
-        return cv2.cvtColor(binary, cv2.COLOR_GRAY2BGR)
+        return self._output(binary)
 
     def binary_inverse_threshold(self, image, threshold_value):
         """Aplica limiarização binária inversa"""
-        if len(image.shape) == 3:
-            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-        else:
-            gray = image.copy()
+        gray = self._gray(image)
         
         _, binary = cv2.threshold(gray, threshold_value, 255, cv2.THRESH_BINARY_INV)
-        return cv2.cvtColor(binary, cv2.COLOR_GRAY2BGR)
+        return self._output(binary)
 
     def truncate_threshold(self, image, threshold_value):
         """Aplica limiarização truncada"""
-        if len(image.shape) == 3:
-            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-        else:
-            gray = image.copy()
+        gray = self._gray(image)
         
         _, truncated = cv2.threshold(gray, threshold_value, 255, cv2.THRESH_TRUNC)
-        return cv2.cvtColor(truncated, cv2.COLOR_GRAY2BGR)
+        return self._output(truncated)
 
     def to_zero_threshold(self, image, threshold_value):
         """Aplica limiarização to zero"""
-        if len(image.shape) == 3:
-            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-        else:
-            gray = image.copy()
+        gray = self._gray(image)
         
         _, to_zero = cv2.threshold(gray, threshold_value, 255, cv2.THRESH_TOZERO)
-        return cv2.cvtColor(to_zero, cv2.COLOR_GRAY2BGR)
+        return self._output(to_zero)
 
     def to_zero_inverse_threshold(self, image, threshold_value):
         """Aplica limiarização to zero inversa"""
-        if len(image.shape) == 3:
-            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-        else:
-            gray = image.copy()
+        gray = self._gray(image)
         
         _, to_zero_inv = cv2.threshold(gray, threshold_value, 255, cv2.THRESH_TOZERO_INV)
-        return cv2.cvtColor(to_zero_inv, cv2.COLOR_GRAY2BGR)
+        return self._output(to_zero_inv)
 
     def otsu_threshold(self, image):
         """Aplica limiarização automática usando método Otsu"""
-        if len(image.shape) == 3:
-            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-        else:
-            gray = image.copy()
+        gray = self._gray(image)
         
         _, otsu = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
-        return cv2.cvtColor(otsu, cv2.COLOR_GRAY2BGR)
+        return self._output(otsu)
+
+    def otsu_value_from_histogram(self, hist):
+        """Limiar de Otsu a partir de um histograma de 256 posições.
+
+        Mesma aritmética de cv2.threshold(..., THRESH_OTSU): permite obter o
+        limiar de imagens processadas em blocos somando os histogramas.
+        """
+        hist = np.asarray(hist, dtype=np.float64).ravel()
+        scale = 1.0 / hist.sum()
+        mu = float(np.dot(np.arange(256), hist)) * scale
+        eps = float(np.finfo(np.float32).eps)
+        mu1 = q1 = max_sigma = 0.0
+        max_val = 0
+        for i in range(256):
+            p_i = hist[i] * scale
+            mu1 *= q1
+            q1 += p_i
+            q2 = 1.0 - q1
+            if min(q1, q2) < eps or max(q1, q2) > 1.0 - eps:
+                continue
+            mu1 = (mu1 + i * p_i) / q1
+            mu2 = (mu - q1 * mu1) / q2
+            sigma = q1 * q2 * (mu1 - mu2) * (mu1 - mu2)
+            if sigma > max_sigma:
+                max_sigma = sigma
+                max_val = i
+        return max_val
 
     def adaptive_threshold_mean(self, image, max_value=255, block_size=11, c=2):
         """Aplica limiarização adaptativa usando média"""
-        if len(image.shape) == 3:
-            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-        else:
-            gray = image.copy()
-        
-        adaptive = cv2.adaptiveThreshold(
-            gray, max_value, cv2.ADAPTIVE_THRESH_MEAN_C, 
-            cv2.THRESH_BINARY, block_size, c
-        )
-        return cv2.cvtColor(adaptive, cv2.COLOR_GRAY2BGR)
+        return self._adaptive_threshold(image, cv2.ADAPTIVE_THRESH_MEAN_C, max_value, block_size, c)
 
     def adaptive_threshold_gaussian(self, image, max_value=255, block_size=11, c=2):
         """Aplica limiarização adaptativa usando Gaussiana"""
-        if len(image.shape) == 3:
-            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-        else:
-            gray = image.copy()
-        
-        adaptive = cv2.adaptiveThreshold(
-            gray, max_value, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, 
+        return self._adaptive_threshold(image, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, max_value, block_size, c)
+
+    def _adaptive_threshold(self, image, method, max_value, block_size, c):
+        # Converte uma vez e divide o cinza em faixas (não a imagem colorida)
+        adaptive = self._map(lambda strip: cv2.adaptiveThreshold(
+            strip, max_value, method,
             cv2.THRESH_BINARY, block_size, c
-        )
-        return cv2.cvtColor(adaptive, cv2.COLOR_GRAY2BGR)
+        ), self._gray(image), block_size // 2)
+        return self._output(adaptive)
 
     def range_threshold(self, image, lower_value, upper_value):
         """Aplica segmentação por faixa de valores"""
-        if len(image.shape) == 3:
-            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-        else:
-            gray = image.copy()
+        gray = self._gray(image)
         
         # Cria máscara para valores dentro da faixa
         mask = cv2.inRange(gray, lower_value, upper_value)
         
         # Aplica máscara
         result = cv2.bitwise_and(gray, gray, mask=mask)
-        return cv2.cvtColor(result, cv2.COLOR_GRAY2BGR)
+        return self._output(result)
 
     def multi_otsu_threshold(self, image, num_classes=3):
         """Aplica limiarização multi-Otsu para segmentação em múltiplas classes"""
-        if len(image.shape) == 3:
-            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-        else:
-            gray = image.copy()
-        
-        # Calcula histograma
-        hist = cv2.calcHist([gray], [0], None, [256], [0, 256])
-        hist = hist.flatten()
-        
-        # Normaliza histograma
-        hist = hist / hist.sum()
-        
-        # Calcula limiares usando método de Otsu
-        thresholds = self._calculate_multi_otsu_thresholds(hist, num_classes)
-        
-        # Aplica segmentação
-        segmented = np.zeros_like(gray)
-        for i, threshold in enumerate(thresholds):
-            if i == 0:
-                mask = gray <= threshold
-            elif i == len(thresholds) - 1:
-                mask = gray > thresholds[i-1]
-            else:
-                mask = (gray > thresholds[i-1]) & (gray <= threshold)
-            segmented[mask] = int(255 * (i + 1) / num_classes)
-        
-        return cv2.cvtColor(segmented, cv2.COLOR_GRAY2BGR)
-
-    def _calculate_multi_otsu_thresholds(self, hist, num_classes):
-        """Calcula limiares para segmentação multi-Otsu"""
-        # Implementação simplificada - em produção, usar biblioteca scikit-image
-        # Para este exemplo, dividimos o histograma em partes iguais
-        total_pixels = hist.sum()
-        pixels_per_class = total_pixels / num_classes
-        
+        gray = self._gray(image)
+
+        # Limiares que maximizam a variância entre classes
+        hist = cv2.calcHist([gray], [0], None, [256], [0, 256]).ravel()
+        thresholds = self.multi_otsu_thresholds(hist, num_classes)
+
+        # Segmentação em uma única passada pela LUT
+        segmented = cv2.LUT(gray, multi_otsu_lut(thresholds, len(thresholds) + 1))
+        return self._output(segmented)
+
+    def multi_otsu_thresholds(self, hist, num_classes=3):
+        """Limiares multi-Otsu (um a menos que ``num_classes``) a partir de um histograma.
+
+        Maximizar a variância entre classes equivale a maximizar a soma de
+        S²/W das classes (W = massa, S = soma dos níveis), pois a média total
+        é fixa. Com somas de prefixo cada classe custa O(1) e a programação
+        dinâmica sobre o último nível de cada classe resolve em O(K·L²), em
+        vez das O(L^(K-1)) combinações da busca exaustiva. Um pixel com valor
+        igual ao limiar ``t`` fica na classe de baixo.
+        """
+        hist = np.asarray(hist, dtype=np.float64).ravel()
+        levels = len(hist)
+        num_classes = max(2, min(levels, int(num_classes)))
+        total = hist.sum()
+        if total > 0:
+            hist = hist / total
+
+        weight = np.concatenate(([0.0], np.cumsum(hist)))
+        moment = np.concatenate(([0.0], np.cumsum(hist * np.arange(levels))))
+        # cost[i, j]: S²/W da classe que vai do nível i ao j (classes vazias valem 0)
+        w = weight[None, 1:] - weight[:-1, None]
+        s = moment[None, 1:] - moment[:-1, None]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            cost = np.where(w > 0, s * s / w, 0.0)
+        cost[np.tril_indices(levels, -1)] = -np.inf
+
+        # best[j]: melhor soma com os níveis 0..j divididos nas classes já colocadas
+        best = cost[0]
+        choices = []
+        for _ in range(num_classes - 1):
+            # candidates[r, j]: classes anteriores até r + nova classe r+1..j
+            candidates = best[:-1, None] + cost[1:, :]
+            choice = np.argmax(candidates, axis=0)
+            best = candidates[choice, np.arange(levels)]
+            choices.append(choice)
+
         thresholds = []
-        cumulative = 0
-        for i in range(num_classes - 1):
-            cumulative += pixels_per_class
-            threshold = np.argmin(np.abs(np.cumsum(hist) - cumulative))
-            thresholds.append(threshold)
-        
-        return thresholds
+        end = levels - 1
+        for choice in reversed(choices):
+            end = int(choice[end])
+            thresholds.append(end)
+        return thresholds[::-1]
 
     def quantize_threshold(self, image, num_levels=4):
         """Quantiza a imagem em N tons de cinza (uniforme).
@@ -162,10 +192,7 @@ class ThresholdModel:
         - Aceita imagem BGR ou escala de cinza
         - Retorna imagem BGR para manter consistência
         """
-        if len(image.shape) == 3:
-            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-        else:
-            gray = image.copy()
+        gray = self._gray(image)
 
         # Garante um número válido de níveis
         try:
@@ -178,14 +205,4 @@ class ThresholdModel:
         level_size = max(1, 256 // num_levels)
         quantized = (gray // level_size) * level_size
 
-        return cv2.cvtColor(quantized.astype(np.uint8), cv2.COLOR_GRAY2BGR)
-
-    def to_tk_image(self, cv_image):
-        """Converte imagem OpenCV para formato Tkinter"""
-        if len(cv_image.shape) == 3:
-            rgb = cv2.cvtColor(cv_image, cv2.COLOR_BGR2RGB)
-        else:
-            rgb = cv_image
-        
-        img = Image.fromarray(rgb)
-        return ImageTk.PhotoImage(img)
+        return self._output(quantized.astype(np.uint8))
@@ -0,0 +1,318 @@
+"""Processamento em blocos (tiles) para imagens maiores que a memória.
+
+A imagem de origem é mapeada em memória (``.npy`` ou PGM/PPM binário) e o
+resultado é gravado em um ``.npy`` também mapeado, bloco a bloco. Cada
+bloco é lido com uma borda extra (halo) do tamanho do raio do kernel da
+operação, de modo que filtros locais (Sobel, Laplaciano, limiarização
+adaptativa) dão o mesmo resultado que na imagem inteira. Operações globais
+(Otsu, equalização, normalização do Sobel) usam duas passadas: a primeira
+acumula o histograma (ou o máximo) e a segunda aplica o resultado.
+
+O pico de memória depende só do tamanho do bloco, não da imagem.
+"""
+import mmap
+import os
+import tempfile
+
+import cv2
+import numpy as np
+
+from models.color_model import ColorModel
+from models.edge_model import EdgeModel
+from models.histogram_model import HistogramModel
+from models.operations import OPERATIONS
+from models.point_ops import PointOpChain, equalize_lut, multi_otsu_lut
+from models.threshold_model import ThresholdModel
+
+MAPPED_EXTENSIONS = ('.npy', '.pgm', '.ppm')
+
+
+def _read_pnm_header(path):
+    """Lê o cabeçalho de um PGM (P5) ou PPM (P6) binário: (largura, altura, canais, deslocamento)"""
+    with open(path, 'rb') as f:
+        fields = []
+        while len(fields) < 4:
+            line = f.readline()
+            if not line:
+                raise ValueError(f"Cabeçalho PNM inválido: {path}")
+            fields += line.split(b'#')[0].split()
+        magic, width, height, max_value = fields[:4]
+        if magic not in (b'P5', b'P6') or int(max_value) > 255:
+            raise ValueError(f"Só PGM/PPM binários de 8 bits são suportados: {path}")
+        return int(width), int(height), 3 if magic == b'P6' else 1, f.tell()
+
+
+def open_source(path, workdir=None):
+    """Abre a imagem mapeada em memória (somente leitura), em BGR como no cv2.imread.
+
+    Formatos comprimidos (PNG, JPEG...) não podem ser lidos por partes: são
+    decodificados uma vez e copiados para um ``.npy`` temporário em ``workdir``.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.npy':
+        return np.load(path, mmap_mode='r')
+    if extension in ('.pgm', '.ppm'):
+        width, height, channels, offset = _read_pnm_header(path)
+        shape = (height, width, channels) if channels == 3 else (height, width)
+        image = np.memmap(path, dtype=np.uint8, mode='r', offset=offset, shape=shape)
+        # PPM guarda RGB: a inversão é só uma visão, nada é lido agora
+        return image[:, :, ::-1] if channels == 3 else image
+
+    image = cv2.imread(path)
+    if image is None:
+        return None
+    fd, temp_path = tempfile.mkstemp(suffix='.npy', dir=workdir)
+    os.close(fd)
+    np.save(temp_path, image)
+    del image
+    source = np.load(temp_path, mmap_mode='r')
+    os.remove(temp_path)   # o mapeamento continua válido até ser liberado
+    return source
+
+
+def release(*images):
+    """Descarta da memória do processo as páginas já usadas de imagens mapeadas.
+
+    As páginas lidas ou gravadas de um arquivo mapeado continuam contando
+    como memória residente até o sistema precisar delas; liberá-las a cada
+    faixa de blocos mantém o pico limitado ao tamanho do bloco.
+    """
+    for image in images:
+        mapping = getattr(image, '_mmap', None)
+        if mapping is None or not hasattr(mmap, 'MADV_DONTNEED'):
+            continue
+        if image.flags.writeable:
+            image.flush()
+        mapping.madvise(mmap.MADV_DONTNEED)
+
+
+def create_sink(path, shape, dtype=np.uint8):
+    """Cria o ``.npy`` de saída mapeado em memória"""
+    return np.lib.format.open_memmap(path, mode='w+', dtype=dtype, shape=tuple(shape))
+
+
+def save_image(image, path, rows=1024):
+    """Grava uma imagem mapeada: ``.npy`` e PGM/PPM em faixas; outros formatos via cv2.imwrite"""
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.npy':
+        sink = create_sink(path, image.shape, image.dtype)
+        for y in range(0, image.shape[0], rows):
+            sink[y:y + rows] = image[y:y + rows]
+        sink.flush()
+        return True
+    if extension in ('.pgm', '.ppm') and image.dtype == np.uint8:
+        channels = image.shape[2] if len(image.shape) == 3 else 1
+        if (extension == '.ppm') != (channels == 3):
+            return False
+        with open(path, 'wb') as f:
+            f.write(b'%s\n%d %d\n255\n' % (b'P6' if channels == 3 else b'P5', image.shape[1], image.shape[0]))
+            for y in range(0, image.shape[0], rows):
+                strip = image[y:y + rows]
+                f.write(np.ascontiguousarray(strip[:, :, ::-1] if channels == 3 else strip).tobytes())
+        return True
+    # Codificadores do OpenCV precisam da imagem inteira (as páginas vêm do arquivo mapeado)
+    return cv2.imwrite(path, np.asarray(image))
+
+
+class TileProcessor:
+    """Executa as operações do Model bloco a bloco, de uma origem mapeada para um ``.npy`` mapeado.
+
+    ``run(nome, origem, destino, **params)`` aceita os mesmos nomes e
+    parâmetros do registro (models.operations); como lá, as bordas
+    detectadas são sobrepostas à imagem.
+    """
+
+    def __init__(self, tile_size=1024, low_memory=False, l1_magnitude=False):
+        self.tile_size = tile_size
+        self.color_model = ColorModel()
+        self.histogram_model = HistogramModel()
+        self.threshold_model = ThresholdModel()
+        # Sobel de pouca memória também nos blocos (magnitude em float32/int16)
+        self.edge_model = EdgeModel(low_memory=low_memory, l1_magnitude=l1_magnitude)
+
+        # nome: (halo(**params), função(bloco, **params)) para operações locais
+        self._local = {
+            'convert_to_rgba': (None, lambda tile: self.color_model.rgb_to_rgba(tile)),
+            'convert_to_cmyk': (None, lambda tile: self.color_model.rgb_to_cmyk(tile)),
+            'convert_to_hsv': (None, lambda tile: self.color_model.rgb_to_hsv(tile)),
+            'convert_to_lab': (None, lambda tile: self.color_model.rgb_to_lab(tile)),
+            'convert_to_gray': (None, lambda tile: self.color_model.rgb_to_gray(tile)),
+            'adjust_brightness': (None, lambda tile, brightness:
+                                  self.histogram_model.adjust_brightness(tile, brightness)),
+            'adjust_contrast': (None, lambda tile, contrast: self.histogram_model.adjust_contrast(tile, contrast)),
+            'adjust_brightness_contrast': (None, lambda tile, brightness, contrast:
+                                           self.histogram_model.adjust_brightness_contrast(tile, brightness, contrast)),
+            'apply_binary_threshold': (None, lambda tile, threshold_value:
+                                       self.threshold_model.binary_threshold(tile, threshold_value)),
+            'apply_quantize_threshold': (None, lambda tile, num_levels:
+                                         self.threshold_model.quantize_threshold(tile, num_levels)),
+            'apply_adaptive_threshold': (lambda method='mean', block_size=11: block_size // 2,
+                                         self._adaptive_threshold),
+            'apply_laplacian': (lambda ksize=3: max(1, ksize // 2), self._laplacian),
+            # A histerese do Canny segue bordas conectadas sem limite de distância:
+            # o halo folgado cobre as cadeias curtas, as longas podem diferir na costura
+            'apply_canny': (lambda threshold1=100, threshold2=200, blur_ksize=3:
+                            blur_ksize // 2 + 32, self._canny),
+        }
+        self._global = {
+            'equalize_histogram': self._equalize,
+            'apply_otsu_threshold': self._otsu,
+            'apply_multi_otsu_threshold': self._multi_otsu,
+            'apply_point_ops': self._point_ops,
+            'apply_sobel': self._sobel,
+        }
+
+    @property
+    def operations(self):
+        return sorted(set(self._local) | set(self._global))
+
+    # ========== Iteração em blocos ==========
+    def tiles(self, shape):
+        """Gera (y0, y1, x0, x1) cobrindo a imagem"""
+        height, width = shape[:2]
+        for y in range(0, height, self.tile_size):
+            for x in range(0, width, self.tile_size):
+                yield y, min(y + self.tile_size, height), x, min(x + self.tile_size, width)
+
+    def read_tile(self, source, bounds, halo=0):
+        """Lê o bloco com ``halo`` pixels extras (limitados às bordas); retorna (bloco, deslocamento)"""
+        y0, y1, x0, x1 = bounds
+        height, width = source.shape[:2]
+        ys, xs = max(0, y0 - halo), max(0, x0 - halo)
+        tile = np.ascontiguousarray(source[ys:min(height, y1 + halo), xs:min(width, x1 + halo)])
+        return tile, (y0 - ys, x0 - xs)
+
+    def map(self, source, sink_path, func, halo=0):
+        """Aplica ``func`` a cada bloco (com halo) e grava a parte central em ``sink_path``"""
+        sink = None
+        band = 0
+        for bounds in self.tiles(source.shape):
+            y0, y1, x0, x1 = bounds
+            if y0 != band:
+                release(source, sink)
+                band = y0
+            tile, (dy, dx) = self.read_tile(source, bounds, halo)
+            result = func(tile)[dy:dy + y1 - y0, dx:dx + x1 - x0]
+            if sink is None:
+                # Formato da saída (canais, tipo) definido pelo primeiro bloco
+                sink = create_sink(sink_path, source.shape[:2] + result.shape[2:], result.dtype)
+            sink[y0:y1, x0:x1] = result
+        release(source, sink)
+        return sink
+
+    def reduce(self, source, func, combine, halo=0):
+        """Primeira passada das operações globais: combina ``func(bloco central)`` de todos os blocos"""
+        total = None
+        band = 0
+        for bounds in self.tiles(source.shape):
+            y0, y1, x0, x1 = bounds
+            if y0 != band:
+                release(source)
+                band = y0
+            tile, (dy, dx) = self.read_tile(source, bounds, halo)
+            value = func(tile, (slice(dy, dy + y1 - y0), slice(dx, dx + x1 - x0)))
+            total = value if total is None else combine(total, value)
+        release(source)
+        return total
+
+    def channel_histograms(self, source):
+        """Histograma de cada canal da imagem inteira, somando os blocos"""
+        def tile_hists(tile, center):
+            tile = np.ascontiguousarray(tile[center])
+            if len(tile.shape) == 2:
+                return cv2.calcHist([tile], [0], None, [256], [0, 256]).ravel()[None]
+            return np.stack([cv2.calcHist([tile], [i], None, [256], [0, 256]).ravel()
+                             for i in range(tile.shape[2])])
+        return self.reduce(source, tile_hists, np.add)
+
+    # ========== Execução ==========
+    def run(self, name, source, sink_path, **params):
+        """Executa a operação ``name`` sobre ``source`` e devolve o ``.npy`` mapeado resultante.
+
+        Os parâmetros passam pelo registro como no Model (padrões, faixas,
+        kernels ímpares): ValueError/TypeError antes de ler qualquer bloco.
+        """
+        if name in OPERATIONS:
+            params = OPERATIONS[name].resolve(params)
+        if name in self._global:
+            return self._global[name](source, sink_path, **params)
+        if name not in self._local:
+            raise ValueError(f"Operação sem suporte em blocos: {name}")
+        halo, func = self._local[name]
+        return self.map(source, sink_path, lambda tile: func(tile, **params), halo(**params) if halo else 0)
+
+    def _gray(self, tile):
+        return self.edge_model._to_gray(tile)
+
+    def _overlay(self, tile, edges):
+        # Como no Model (derived.bgr): as bordas são desenhadas em cor sobre a base em cinza expandida
+        if tile.ndim == 2:
+            tile = cv2.cvtColor(tile, cv2.COLOR_GRAY2BGR)
+        return self.edge_model.overlay_edges_on_image(tile, edges)
+
+    def _adaptive_threshold(self, tile, method='mean', block_size=11):
+        if method == 'gaussian':
+            return self.threshold_model.adaptive_threshold_gaussian(tile, block_size=block_size)
+        return self.threshold_model.adaptive_threshold_mean(tile, block_size=block_size)
+
+    def _laplacian(self, tile, ksize=3):
+        return self._overlay(tile, self.edge_model.detect_laplacian_edges(tile, ksize=ksize))
+
+    def _canny(self, tile, threshold1=100, threshold2=200, blur_ksize=3):
+        edges = self.edge_model.detect_canny_edges(tile, threshold1, threshold2, blur_ksize)
+        return self._overlay(tile, edges)
+
+    def _equalize(self, source, sink_path):
+        # 1ª passada: histogramas; 2ª: LUT de equalização de cada canal
+        luts = [equalize_lut(hist) for hist in self.channel_histograms(source)]
+        if len(luts) == 1:
+            return self.map(source, sink_path, lambda tile: cv2.LUT(tile, luts[0]))
+        lut = np.dstack(luts).reshape(256, 1, len(luts))
+        return self.map(source, sink_path, lambda tile: cv2.LUT(tile, lut))
+
+    def _point_ops(self, source, sink_path, ops):
+        # LUTs compiladas com os histogramas da imagem inteira (só há 1ª passada se houver equalização)
+        chain = PointOpChain(ops)
+
+        def gray_histogram(luts):
+            def tile_hist(tile, center):
+                tile = PointOpChain._apply_luts(np.ascontiguousarray(tile[center]), luts)
+                return cv2.calcHist([cv2.cvtColor(tile, cv2.COLOR_BGR2GRAY)], [0], None, [256], [0, 256]).ravel()
+            return self.reduce(source, tile_hist, np.add)
+
+        sample = np.ascontiguousarray(source[:1, :1])
+        luts = chain.compile(sample, lambda: list(self.channel_histograms(source)), gray_histogram)
+        if not chain.ops:
+            return self.map(source, sink_path, lambda tile: tile.copy())
+        return self.map(source, sink_path, lambda tile: chain.apply_compiled(tile, *luts))
+
+    def _gray_histogram(self, source):
+        def gray_hist(tile, center):
+            gray = np.ascontiguousarray(self._gray(tile)[center])
+            return cv2.calcHist([gray], [0], None, [256], [0, 256]).ravel()
+        return self.reduce(source, gray_hist, np.add)
+
+    def _otsu(self, source, sink_path):
+        # 1ª passada: histograma em cinza; 2ª: limiar binário com o valor de Otsu global
+        threshold = self.threshold_model.otsu_value_from_histogram(self._gray_histogram(source))
+        return self.map(source, sink_path, lambda tile: self.threshold_model.binary_threshold(tile, threshold))
+
+    def _multi_otsu(self, source, sink_path, num_classes=3):
+        # 1ª passada: histograma em cinza; 2ª: LUT com os limiares globais
+        thresholds = self.threshold_model.multi_otsu_thresholds(self._gray_histogram(source), num_classes)
+        lut = multi_otsu_lut(thresholds)
+        return self.map(source, sink_path,
+                        lambda tile: cv2.cvtColor(cv2.LUT(self._gray(tile), lut), cv2.COLOR_GRAY2BGR))
+
+    def _sobel(self, source, sink_path, ksize=3):
+        # 1ª passada: máximo global da magnitude; 2ª: normalização por ele
+        halo = max(1, ksize // 2)
+        max_value = self.reduce(
+            source, lambda tile, center: self.edge_model.sobel_magnitude(self._gray(tile), ksize)[center].max(),
+            max, halo)
+
+        def normalized(tile):
+            edges = self.edge_model.normalize_magnitude(self.edge_model.sobel_magnitude(self._gray(tile), ksize),
+                                                        max_value)
+            return self._overlay(tile, edges)
+        return self.map(source, sink_path, normalized, halo)
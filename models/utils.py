@@ -0,0 +1,38 @@
+import cv2
+
+
+def fit_scale(shape, max_width, max_height):
+    """Fator (<= 1) para a imagem caber em max_width x max_height"""
+    height, width = shape[:2]
+    return min(1.0, max_width / float(width), max_height / float(height))
+
+
+def resize_to_scale(image, scale):
+    """Reduz a imagem pelo fator dado (INTER_AREA); fator 1 devolve a própria imagem"""
+    if image is None or scale >= 1.0:
+        return image
+    height, width = image.shape[:2]
+    size = (max(1, int(round(width * scale))), max(1, int(round(height * scale))))
+    return cv2.resize(image, size, interpolation=cv2.INTER_AREA)
+
+
+def resize_to_shape(image, shape):
+    """Reduz a imagem para as dimensões (altura, largura) de ``shape`` (INTER_AREA)"""
+    if image.shape[:2] == tuple(shape[:2]):
+        return image
+    return cv2.resize(image, (shape[1], shape[0]), interpolation=cv2.INTER_AREA)
+
+
+def scaled_kernel_size(ksize, scale, minimum=1, maximum=None):
+    """Ajusta um tamanho de kernel (ímpar) à escala da imagem.
+
+    Usado nas prévias em baixa resolução para que filtros locais cubram a
+    mesma região da cena que cobririam na resolução cheia.
+    """
+    ksize = int(round(ksize * scale))
+    if ksize % 2 == 0:
+        ksize += 1
+    ksize = max(minimum, ksize)
+    if maximum is not None:
+        ksize = min(maximum, ksize)
+    return ksize
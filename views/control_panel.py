@@ -123,9 +123,8 @@ class ControlPanel:
         apply_btn.pack(fill="x", pady=2)
 
     def _apply_quantize(self):
-        if hasattr(self.controller, 'apply_quantize_gray'):
-            n = self.num_levels_var.get()
-            self.controller.apply_quantize_gray(n)
+        if hasattr(self.controller, 'apply_command'):
+            self.controller.apply_command('quantize', num_levels=self.num_levels_var.get())
 
     def _create_log_section(self):
         """Cria seção do log"""
@@ -169,14 +168,28 @@ class ControlPanel:
 
     def _equalize_histogram(self):
         """Aplica equalização de histograma"""
-        if hasattr(self.controller, 'apply_equalization'):
-            self.controller.apply_equalization()
+        if hasattr(self.controller, 'apply_command'):
+            self.controller.apply_command('equalize')
 
     def update_histogram(self, image):
         """Atualiza o histograma"""
         if hasattr(self, 'histogram_canvas'):
             self.histogram_canvas.update_histogram(image)
 
+    def set_histogram_service(self, service):
+        """Usa o cache de histogramas dos models (``HistogramService``)"""
+        if hasattr(self, 'histogram_canvas'):
+            self.histogram_canvas.service = service
+
+    def show_histogram_data(self, histogram_data):
+        """Exibe um histograma já calculado (ex.: em segundo plano)"""
+        if hasattr(self, 'histogram_canvas'):
+            if histogram_data is None:
+                self.histogram_canvas.clear_histogram()
+                return
+            title = 'Histograma - Canais RGB' if isinstance(histogram_data, list) else 'Histograma - Escala de Cinza'
+            self.histogram_canvas.plot_histogram_data(histogram_data, title)
+
     def add_log(self, text):
         """Adiciona entrada ao log"""
         self.log_area.insert(tk.END, f"> {text}\n")
@@ -1,142 +1,241 @@
+import threading
+import time
 import tkinter as tk
-import numpy as np
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-from matplotlib.figure import Figure
+from models.profiler import profiler
+
+# Backend do matplotlib, importado na primeira vez que o painel aparece
+_BACKEND_MODULES = ('matplotlib.figure', 'matplotlib.backends.backend_tkagg')
+
+
+def _import_backend():
+    for name in _BACKEND_MODULES:
+        __import__(name)
+
 
 class HistogramCanvas:
-    def __init__(self, parent_frame):
+    """Gráfico do histograma com artistas persistentes.
+
+    Eixos, linhas, legenda e grade são criados uma única vez; cada
+    atualização só troca os dados das linhas (``set_ydata``) e redesenha
+    as linhas sobre o fundo guardado (blitting). O desenho completo só
+    acontece quando o fundo muda: escala do eixo Y, título, legenda ou
+    tamanho do widget. As atualizações são agrupadas para não passar da
+    taxa de atualização da tela (``max_fps``).
+
+    O matplotlib não é importado com a janela: quando o painel aparece
+    pela primeira vez o backend é importado em segundo plano e a figura
+    é montada no lugar de um quadro vazio do mesmo tamanho. Um histograma
+    pedido antes disso monta a figura na hora.
+
+    Os histogramas vêm do ``HistogramService`` dos models (``service``,
+    passado pelo Controller quando o Model é criado): a imagem exibida já
+    tem o seu calculado, ou derivado das LUTs, e não é relida.
+    """
+
+    # Tamanho da figura (polegadas, dpi) e do quadro que a reserva
+    FIGSIZE = (4, 3)
+    DPI = 100
+    IMPORT_POLL_MS = 20
+
+    def __init__(self, parent_frame, max_fps=60, service=None):
         self.parent_frame = parent_frame
-        
+        self.min_interval = 1.0 / max_fps
+        self.service = service
+
+        self.frame = tk.Frame(parent_frame, bg='#333',
+                              width=self.FIGSIZE[0] * self.DPI, height=self.FIGSIZE[1] * self.DPI)
+        self.frame.pack(fill="both", expand=True)
+        self.frame.bind("<Map>", self._on_first_map)
+        self._loader = None
+        self.fig = None
+        self.canvas = None
+        self.background = None
+
+        # Dados do histograma
+        self.histogram_data = None
+        self.image_type = None
+        self._pending = None
+        self._after_id = None
+        self._last_render = 0.0
+
+    def _on_first_map(self, event=None):
+        self.frame.unbind("<Map>")
+        if self.fig is None and self._loader is None:
+            self._loader = threading.Thread(target=_import_backend, name='histogram-import', daemon=True)
+            self._loader.start()
+            self._wait_for_backend()
+
+    def _wait_for_backend(self):
+        if self.fig is not None:
+            return
+        if self._loader.is_alive():
+            self.frame.after(self.IMPORT_POLL_MS, self._wait_for_backend)
+            return
+        self._build_figure()
+
+    def _build_figure(self):
+        """Cria figura, eixos e linhas persistentes (primeira vez que o gráfico é necessário)"""
+        import numpy as np
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+        from matplotlib.figure import Figure
+
         # Cria figura do matplotlib
-        self.fig = Figure(figsize=(4, 3), dpi=100, facecolor='#333')
+        self.fig = Figure(figsize=self.FIGSIZE, dpi=self.DPI, facecolor='#333')
         self.ax = self.fig.add_subplot(111)
         self.ax.set_facecolor('#333')
-        
+
         # Configurações do gráfico
         self.ax.tick_params(colors='white', labelsize=8)
         self.ax.set_xlabel('Intensidade', color='white', fontsize=9)
         self.ax.set_ylabel('Frequência', color='white', fontsize=9)
         self.ax.set_title('Histograma', color='white', fontsize=10)
-        
-        # Cria canvas do Tkinter
-        self.canvas = FigureCanvasTkAgg(self.fig, self.parent_frame)
+        self.ax.set_xlim(0, 255)
+        self.ax.set_ylim(0, 1)
+        self.ax.grid(True, alpha=0.3, color='gray')
+
+        # Linhas persistentes: B, G, R e cinza (animated = fora do fundo guardado)
+        x = np.arange(256)
+        zeros = np.zeros(256)
+        self.channel_lines = [
+            self.ax.plot(x, zeros, color=color, linewidth=1, label=label, alpha=0.8, animated=True)[0]
+            for color, label in zip(['blue', 'green', 'red'], ['Canal B', 'Canal G', 'Canal R'])
+        ]
+        self.gray_line = self.ax.plot(x, zeros, color='white', linewidth=1, animated=True)[0]
+        self.legend = self.ax.legend(handles=self.channel_lines, fontsize=8, loc='upper right')
+        self.empty_text = self.ax.text(0.5, 0.5, 'Nenhuma imagem carregada',
+                                       transform=self.ax.transAxes, ha='center', va='center',
+                                       color='gray', fontsize=12)
+        for artist in self.channel_lines + [self.gray_line, self.legend, self.empty_text]:
+            artist.set_visible(False)
+
+        # Cria canvas do Tkinter dentro do quadro reservado
+        self.canvas = FigureCanvasTkAgg(self.fig, self.frame)
         self.canvas.get_tk_widget().pack(fill="both", expand=True)
-        
-        # Dados do histograma
-        self.histogram_data = None
-        self.image_type = None
+        # Todo desenho completo (inclusive ao redimensionar) renova o fundo
+        self.canvas.mpl_connect('draw_event', self._on_draw)
 
     def update_histogram(self, image):
         """Atualiza o histograma com base na imagem fornecida"""
         if image is None:
             self.clear_histogram()
             return
-        
-        # Limpa o gráfico anterior
-        self.ax.clear()
-        self.ax.set_facecolor('#333')
-        
-        # Determina o tipo de imagem
-        if len(image.shape) == 3:
-            self._plot_color_histogram(image)
-        else:
-            self._plot_grayscale_histogram(image)
-        
-        # Atualiza o canvas
-        self.canvas.draw()
-
-    def _plot_grayscale_histogram(self, image):
-        """Plota histograma para imagem em escala de cinza"""
-        hist = cv2.calcHist([image], [0], None, [256], [0, 256])
-        self.ax.plot(hist, color='white', linewidth=1)
-        self.ax.set_xlabel('Intensidade', color='white', fontsize=9)
-        self.ax.set_ylabel('Frequência', color='white', fontsize=9)
-        self.ax.set_title('Histograma - Escala de Cinza', color='white', fontsize=10)
-        self.ax.set_xlim(0, 255)
-        self.ax.grid(True, alpha=0.3, color='gray')
 
-    def _plot_color_histogram(self, image):
-        """Plota histograma para imagem colorida (3 canais)"""
-        colors = ['blue', 'green', 'red']
-        labels = ['Canal B', 'Canal G', 'Canal R']
-        
-        for i, (color, label) in enumerate(zip(colors, labels)):
-            hist = cv2.calcHist([image], [i], None, [256], [0, 256])
-            self.ax.plot(hist, color=color, linewidth=1, label=label, alpha=0.8)
-        
-        self.ax.set_xlabel('Intensidade', color='white', fontsize=9)
-        self.ax.set_ylabel('Frequência', color='white', fontsize=9)
-        self.ax.set_title('Histograma - Canais RGB', color='white', fontsize=10)
-        self.ax.set_xlim(0, 255)
-        self.ax.legend(fontsize=8, loc='upper right')
-        self.ax.grid(True, alpha=0.3, color='gray')
+        from models.histogram_service import as_plot_data
 
-    def plot_histogram_data(self, histogram_data, title="Histograma"):
-        """Plota histograma a partir de dados fornecidos"""
-        self.ax.clear()
-        self.ax.set_facecolor('#333')
-        
+        # Todos os canais de uma vez, no mesmo formato de HistogramModel.calculate_histogram
+        histogram_data = as_plot_data(self._histograms(image))
         if isinstance(histogram_data, list):
-            # Múltiplos canais
-            colors = ['blue', 'green', 'red']
-            labels = ['Canal B', 'Canal G', 'Canal R']
-            
-            for i, (color, label) in enumerate(zip(colors, labels)):
-                if i < len(histogram_data):
-                    channel_name, hist = histogram_data[i]
-                    self.ax.plot(hist, color=color, linewidth=1, label=label, alpha=0.8)
-            
-            self.ax.legend(fontsize=8, loc='upper right')
+            self.plot_histogram_data(histogram_data, 'Histograma - Canais RGB')
         else:
-            # Canal único
-            self.ax.plot(histogram_data, color='white', linewidth=1)
-        
-        self.ax.set_xlabel('Intensidade', color='white', fontsize=9)
-        self.ax.set_ylabel('Frequência', color='white', fontsize=9)
-        self.ax.set_title(title, color='white', fontsize=10)
-        self.ax.set_xlim(0, 255)
-        self.ax.grid(True, alpha=0.3, color='gray')
-        
-        self.canvas.draw()
+            self.plot_histogram_data(histogram_data, 'Histograma - Escala de Cinza')
+
+    def _histograms(self, image):
+        # Sem o serviço dos models (widget usado avulso), um próprio, ainda com cache
+        if self.service is None:
+            from models.histogram_service import HistogramService
+            self.service = HistogramService()
+        return self.service.histograms(image)
+
+    def plot_histogram_data(self, histogram_data, title="Histograma"):
+        """Plota histograma a partir de dados fornecidos (agrupando atualizações rápidas)"""
+        self._schedule((histogram_data, title))
 
     def clear_histogram(self):
         """Limpa o histograma"""
-        self.ax.clear()
-        self.ax.set_facecolor('#333')
-        self.ax.set_xlabel('Intensidade', color='white', fontsize=9)
-        self.ax.set_ylabel('Frequência', color='white', fontsize=9)
-        self.ax.set_title('Histograma', color='white', fontsize=10)
-        self.ax.text(0.5, 0.5, 'Nenhuma imagem carregada', 
-                    transform=self.ax.transAxes, ha='center', va='center',
-                    color='gray', fontsize=12)
-        self.canvas.draw()
+        self._schedule(None)
+
+    def _schedule(self, data):
+        # Só o dado mais recente importa; no máximo um desenho por quadro
+        self._pending = data
+        if self._after_id is not None:
+            return
+        wait = self.min_interval - (time.perf_counter() - self._last_render)
+        self._after_id = self.parent_frame.after(max(0, int(wait * 1000)), self._flush)
+
+    def _flush(self):
+        self._after_id = None
+        self._last_render = time.perf_counter()
+        with profiler.span('render', 'histograma'):
+            if self.fig is None:
+                self._build_figure()
+            self._render(self._pending)
+
+    def _render(self, data):
+        if data is None:
+            self.histogram_data = None
+            self.image_type = None
+            for line in self.channel_lines + [self.gray_line]:
+                line.set_visible(False)
+            full_redraw = self._set_frame('Histograma', None, True)
+        else:
+            import numpy as np
+            histogram_data, title = data
+            self.histogram_data = histogram_data
+            if isinstance(histogram_data, list):
+                # Múltiplos canais
+                self.image_type = 'color'
+                hists = [np.ravel(hist) for _, hist in histogram_data]
+                for i, line in enumerate(self.channel_lines):
+                    line.set_visible(i < len(hists))
+                    if i < len(hists):
+                        line.set_ydata(hists[i])
+                self.gray_line.set_visible(False)
+            else:
+                # Canal único
+                self.image_type = 'gray'
+                hists = [np.ravel(histogram_data)]
+                self.gray_line.set_ydata(hists[0])
+                self.gray_line.set_visible(True)
+                for line in self.channel_lines:
+                    line.set_visible(False)
+            peak = max(float(hist.max()) for hist in hists)
+            full_redraw = self._set_frame(title, peak, False)
+
+        if full_redraw or self.background is None:
+            # O fundo mudou: desenho completo (o fundo novo é guardado em _on_draw)
+            self.canvas.draw()
+        else:
+            self.canvas.restore_region(self.background)
+            self._draw_lines()
+            self.canvas.blit(self.ax.bbox)
+
+    def _set_frame(self, title, peak, empty):
+        """Ajusta título, escala do eixo Y e legenda; True se o fundo precisa ser redesenhado"""
+        changed = False
+        if self.ax.get_title() != title:
+            self.ax.set_title(title, color='white', fontsize=10)
+            changed = True
+        if self.empty_text.get_visible() != empty:
+            self.empty_text.set_visible(empty)
+            changed = True
+        show_legend = self.image_type == 'color'
+        if self.legend.get_visible() != show_legend:
+            self.legend.set_visible(show_legend)
+            changed = True
+        if peak:
+            # Histerese: só reescala quando o pico sai da faixa [30%, 100%] do eixo
+            top = self.ax.get_ylim()[1]
+            if peak > top or peak < 0.3 * top:
+                self.ax.set_ylim(0, peak * 1.1)
+                changed = True
+        return changed
+
+    def _draw_lines(self):
+        for line in self.channel_lines + [self.gray_line]:
+            if line.get_visible():
+                self.ax.draw_artist(line)
+
+    def _on_draw(self, event):
+        self.background = self.canvas.copy_from_bbox(self.ax.bbox)
+        self._draw_lines()
 
     def get_histogram_stats(self, image):
         """Retorna estatísticas do histograma"""
         if image is None:
             return None
-        
+
+        from models.histogram_service import histogram_stats
+        hists = self._histograms(image)
         if len(image.shape) == 3:
-            stats = {}
-            colors = ['B', 'G', 'R']
-            for i, color in enumerate(colors):
-                hist = cv2.calcHist([image], [i], None, [256], [0, 256])
-                stats[color] = {
-                    'mean': np.mean(hist),
-                    'std': np.std(hist),
-                    'min': np.min(hist),
-                    'max': np.max(hist)
-                }
-            return stats
-        else:
-            hist = cv2.calcHist([image], [0], None, [256], [0, 256])
-            return {
-                'mean': np.mean(hist),
-                'std': np.std(hist),
-                'min': np.min(hist),
-                'max': np.max(hist)
-            }
-
-# Import necessário para cv2
-import cv2
+            return {color: histogram_stats(hist) for color, hist in zip('BGR', hists)}
+        return histogram_stats(hists[0])
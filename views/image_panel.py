@@ -1,26 +1,28 @@
 import tkinter as tk
-from tkinter import Label
-from PIL import Image, ImageTk
+from views.image_viewport import ImageViewport, ViewState
 
 class ImagePanel:
     def __init__(self, root):
         self.frame = tk.Frame(root, bg="#222")
+        # Zoom e posição compartilhados: os dois painéis mostram a mesma região
+        self.view_state = ViewState()
+        self._full_size = None
         
         # Frame para imagem original (lado esquerdo)
         self.original_frame = tk.Frame(self.frame, bg="#222")
         self.original_frame.pack(side="left", fill="both", expand=True, padx=5, pady=5)
         
         tk.Label(self.original_frame, text="Imagem Original", fg="white", bg="#222", font=("Arial", 10, "bold")).pack()
-        self.original_label = Label(self.original_frame, bg="#222")
-        self.original_label.pack(pady=5, fill="both", expand=True)
+        self.original_view = ImageViewport(self.original_frame, self.view_state)
+        self.original_view.canvas.pack(pady=5, fill="both", expand=True)
         
         # Frame para imagem processada (lado direito)
         self.processed_frame = tk.Frame(self.frame, bg="#222")
         self.processed_frame.pack(side="right", fill="both", expand=True, padx=5, pady=5)
         
         tk.Label(self.processed_frame, text="Imagem Processada", fg="white", bg="#222", font=("Arial", 10, "bold")).pack()
-        self.processed_label = Label(self.processed_frame, bg="#222")
-        self.processed_label.pack(pady=5, fill="both", expand=True)
+        self.processed_view = ImageViewport(self.processed_frame, self.view_state)
+        self.processed_view.canvas.pack(pady=5, fill="both", expand=True)
 
 
     def _get_max_image_size(self):
@@ -41,13 +43,27 @@ class ImagePanel:
 
     def show_original_image(self, image):
         """Exibe a imagem original no painel esquerdo"""
-        self.original_label.config(image=image)
-        self.original_label.image = image 
+        full_size = (image.shape[1], image.shape[0]) if image is not None else None
+        if full_size != self._full_size:
+            # Outra imagem: volta a ajustar ao painel
+            self.view_state.reset()
+            self._full_size = full_size
+        self.original_view.show(image)
 
-    def show_processed_image(self, image):
-        """Exibe a imagem processada no painel direito"""
-        self.processed_label.config(image=image)
-        self.processed_label.image = image 
+    def show_processed_image(self, image, interactive=False):
+        """Exibe a imagem processada no painel direito.
+
+        Uma proxy reduzida (prévia) é mostrada na mesma região da original;
+        ``interactive=True`` usa o filtro barato até a interação parar.
+        """
+        full_size = self._full_size
+        if image is not None and full_size is not None and image.shape[1] > full_size[0]:
+            full_size = None
+        self.processed_view.show(image, full_size, interactive)
+
+    def set_zoom_callback(self, callback):
+        """``callback(zoom)`` é chamado depois de cada zoom ou arraste"""
+        self.view_state.on_change = callback
 
     def show_image(self, image):
         """Método de compatibilidade - exibe na imagem processada"""
@@ -0,0 +1,114 @@
+import cv2
+import numpy as np
+from PIL import Image
+
+from models.profiler import profiler
+from models.utils import fit_scale
+
+
+class ImageRenderer:
+    """Converte arrays do OpenCV em imagens Tkinter no tamanho do painel.
+
+    É o único ponto da aplicação que cria ``ImageTk.PhotoImage``: os modelos
+    devolvem apenas ``ndarray`` e a conversão acontece uma vez, já no
+    tamanho de exibição. A imagem cheia é percorrida uma única vez (pelo
+    redimensionamento, direto no buffer BGR); a troca de canais e a cópia
+    para o PIL acontecem só na imagem já reduzida.
+    """
+
+    def __init__(self, resample=Image.Resampling.LANCZOS, interactive_interpolation=cv2.INTER_LINEAR):
+        self.resample = resample
+        # Filtro barato usado enquanto o usuário interage (ex.: arrastando um slider)
+        self.interactive_interpolation = interactive_interpolation
+
+    def display_size(self, shape, max_width=None, max_height=None):
+        """Tamanho (largura, altura) de exibição: cabe no painel, sem ampliar"""
+        height, width = shape[:2]
+        if not (max_width and max_height):
+            return width, height
+        scale = fit_scale(shape, max_width, max_height)
+        return max(1, int(round(width * scale))), max(1, int(round(height * scale)))
+
+    def prepare(self, cv_image, max_width=None, max_height=None, interactive=False):
+        """Converte BGR/BGRA/cinza em ``PIL.Image`` redimensionada (não usa Tk).
+
+        Com ``interactive=True`` a redução é um INTER_LINEAR do OpenCV;
+        senão, uma média por fator inteiro (caminho rápido do INTER_AREA)
+        até cerca de 2x o tamanho final e LANCZOS no restante.
+        """
+        if cv_image is None:
+            return None
+
+        height, width = cv_image.shape[:2]
+        size = self.display_size(cv_image.shape, max_width, max_height)
+        image = cv_image
+        if size != (width, height):
+            if interactive:
+                image = cv2.resize(image, size, interpolation=self.interactive_interpolation)
+            else:
+                factor = int(min(width / size[0], height / size[1]) // 2)
+                if factor >= 2:
+                    # Corta as sobras (< fator pixels) para a média ser exata por blocos
+                    image = cv2.resize(image[:height // factor * factor, :width // factor * factor],
+                                       (width // factor, height // factor), interpolation=cv2.INTER_AREA)
+
+        img = self._to_pil(image)
+        if img.size != size:
+            img = img.resize(size, self.resample)
+        return img
+
+    def resize_to(self, cv_image, size, interactive=False):
+        """Redimensiona para exatamente ``size`` (largura, altura) e converte para ``PIL.Image``.
+
+        Usado nos blocos do viewport, que já chegam do nível da pirâmide
+        mais próximo (fator de redução até 2x): INTER_AREA reduzindo,
+        INTER_NEAREST ampliando 2x ou mais (mostra os pixels da imagem) e o
+        filtro interativo nos demais casos ou durante a interação.
+        """
+        height, width = cv_image.shape[:2]
+        if size != (width, height):
+            if size[0] >= 2 * width:
+                interpolation = cv2.INTER_NEAREST
+            elif interactive or size[0] > width:
+                interpolation = self.interactive_interpolation
+            else:
+                interpolation = cv2.INTER_AREA
+            with profiler.span('resize', 'bloco'):
+                cv_image = cv2.resize(cv_image, size, interpolation=interpolation)
+        with profiler.span('convert', 'PIL'):
+            return self._to_pil(cv_image)
+
+    @staticmethod
+    def _to_pil(image):
+        height, width = image.shape[:2]
+        if len(image.shape) == 3:
+            if image.shape[2] == 4:  # BGRA
+                image = cv2.cvtColor(image, cv2.COLOR_BGRA2RGB)
+            else:  # BGR
+                image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+            mode = "RGB"
+        else:  # Escala de cinza
+            mode = "L"
+        # Compartilha o buffer do array (já reduzido ou convertido) em vez de copiá-lo
+        image = np.ascontiguousarray(image)
+        return Image.frombuffer(mode, (width, height), image, "raw", mode, 0, 1)
+
+    def to_photo(self, pil_image, photo=None):
+        """Cria o ``PhotoImage`` (deve ser chamado na thread do Tk).
+
+        Se ``photo`` tiver o mesmo tamanho, os pixels são copiados nele com
+        ``paste()`` e ele mesmo é devolvido, sem alocar outro.
+        """
+        from PIL import ImageTk
+
+        if pil_image is None:
+            return None
+        with profiler.span('convert', 'PhotoImage'):
+            if photo is not None and (photo.width(), photo.height()) == pil_image.size:
+                photo.paste(pil_image)
+                return photo
+            return ImageTk.PhotoImage(pil_image)
+
+    def render(self, cv_image, max_width=None, max_height=None, interactive=False):
+        """Converte o array diretamente para ``PhotoImage`` no tamanho pedido"""
+        return self.to_photo(self.prepare(cv_image, max_width, max_height, interactive))
@@ -0,0 +1,211 @@
+import tkinter as tk
+
+from models.profiler import profiler
+from views.tile_pyramid import TileCache, TilePyramid
+
+
+class ViewState:
+    """Zoom e centro compartilhados pelos viewports (original e processada mostram a mesma região).
+
+    As coordenadas são da imagem em resolução cheia; ``zoom`` é pixels de
+    tela por pixel da imagem cheia, ou None para ajustar a imagem ao painel.
+    """
+
+    def __init__(self):
+        self.zoom = None
+        self.center = None
+        self.viewports = []
+        # Chamado com o zoom efetivo depois de cada zoom/arraste
+        self.on_change = None
+
+    def reset(self):
+        self.zoom = None
+        self.center = None
+
+    def changed(self, zoom, interactive=True):
+        for viewport in self.viewports:
+            viewport.render(interactive)
+        if self.on_change is not None:
+            self.on_change(zoom)
+
+
+class ImageViewport:
+    """Canvas com zoom (roda do mouse) e arraste, desenhado a partir de uma TilePyramid.
+
+    Só os blocos visíveis no nível da pirâmide adequado ao zoom viram
+    ``PhotoImage``, e eles ficam em um LRU (TileCache): arrastar só
+    reposiciona blocos prontos. Durante a interação os blocos usam o filtro
+    barato do ImageRenderer; ``idle_ms`` depois da última mudança os
+    visíveis são refeitos em qualidade total. ``PhotoImage`` que saem do LRU
+    são reaproveitados com ``paste()`` por blocos do mesmo tamanho. Duplo
+    clique volta a ajustar a imagem ao painel. Sem ``renderer``, um
+    ImageRenderer é criado na primeira imagem (OpenCV e PIL ficam fora da
+    abertura da janela).
+    """
+
+    ZOOM_STEP = 1.25
+    MAX_ZOOM = 32.0
+    # Máximo de ``PhotoImage`` guardados para reaproveitamento
+    MAX_SPARE = 64
+
+    def __init__(self, parent, state, renderer=None, tile_size=256, max_tiles=512, idle_ms=200):
+        self.canvas = tk.Canvas(parent, bg="#222", highlightthickness=0)
+        self._renderer = renderer
+        self.state = state
+        self.tile_size = tile_size
+        self.idle_ms = idle_ms
+        self.image = None
+        self.full_size = None
+        self._pyramid = None
+        self._tiles = TileCache(max_tiles)
+        self._spare = {}
+        self._refine_id = None
+        self._drag = None
+        state.viewports.append(self)
+
+        self.canvas.bind("<Configure>", lambda event: self.render())
+        self.canvas.bind("<ButtonPress-1>", self._start_drag)
+        self.canvas.bind("<B1-Motion>", self._drag_to)
+        self.canvas.bind("<Double-Button-1>", self._fit)
+        self.canvas.bind("<MouseWheel>", lambda event: self._zoom_at(event, event.delta > 0))
+        # No X11 a roda do mouse chega como botões 4 e 5
+        self.canvas.bind("<Button-4>", lambda event: self._zoom_at(event, True))
+        self.canvas.bind("<Button-5>", lambda event: self._zoom_at(event, False))
+
+    @property
+    def renderer(self):
+        if self._renderer is None:
+            from views.image_renderer import ImageRenderer
+            self._renderer = ImageRenderer()
+        return self._renderer
+
+    def show(self, image, full_size=None, interactive=False):
+        """Exibe ``image`` no zoom atual.
+
+        ``full_size`` (largura, altura) é o tamanho da imagem cheia quando
+        ``image`` é uma proxy reduzida, para a região exibida não mudar.
+        """
+        if image is not self.image:
+            self._recycle(self._tiles.clear())
+            self.image = image
+            self._pyramid = TilePyramid(image, self.tile_size) if image is not None else None
+        if image is not None:
+            self.full_size = full_size or (image.shape[1], image.shape[0])
+        self.render(interactive)
+
+    def zoom(self):
+        """Zoom efetivo (pixels de tela por pixel da imagem cheia)"""
+        return self.state.zoom or self.fit_zoom()
+
+    def fit_zoom(self):
+        """Zoom que mostra a imagem inteira no painel, sem ampliar"""
+        width, height = self.full_size
+        view_width, view_height = self._viewport_size()
+        return min(1.0, view_width / width, view_height / height)
+
+    def render(self, interactive=False):
+        """Redesenha os blocos visíveis"""
+        with profiler.span('render', 'viewport', interactive=interactive):
+            self._render(interactive)
+
+    def _render(self, interactive):
+        self._cancel_refine()
+        self.canvas.delete("tile")
+        if self.image is None:
+            return
+        zoom = self.zoom()
+        origin = self._origin(zoom)
+        # Pixels de tela por pixel de ``image`` (a proxy tem menos pixels que a imagem cheia)
+        image_zoom = zoom * self.full_size[0] / self.image.shape[1]
+        index = self._pyramid.level_for_scale(image_zoom)
+        scale = image_zoom * (1 << index)
+        tiles = self._pyramid.visible_tiles(index, scale, origin, self._viewport_size())
+
+        # Primeiro marca os blocos já prontos como usados, para o LRU não descartá-los
+        placed, missing = [], []
+        for column, row, x, y, width, height in tiles:
+            photo = self._tiles.get((index, scale, column, row, True))
+            if photo is None and interactive:
+                photo = self._tiles.get((index, scale, column, row, False))
+            if photo is None:
+                missing.append((column, row, x, y, width, height))
+            else:
+                placed.append((x, y, photo))
+        for column, row, x, y, width, height in missing:
+            photo = self._render_tile(index, column, row, (width, height), interactive)
+            self._recycle(self._tiles.put((index, scale, column, row, not interactive), photo))
+            placed.append((x, y, photo))
+
+        for x, y, photo in placed:
+            self.canvas.create_image(x, y, anchor="nw", image=photo, tags="tile")
+        if interactive and missing:
+            self._refine_id = self.canvas.after(self.idle_ms, self.render)
+
+    def _render_tile(self, index, column, row, size, interactive):
+        pil_image = self.renderer.resize_to(self._pyramid.tile(index, column, row), size, interactive)
+        spare = self._spare.get(size)
+        return self.renderer.to_photo(pil_image, spare.pop() if spare else None)
+
+    def _recycle(self, photos):
+        count = sum(len(spare) for spare in self._spare.values())
+        for photo in photos[:max(0, self.MAX_SPARE - count)]:
+            self._spare.setdefault((photo.width(), photo.height()), []).append(photo)
+
+    def _cancel_refine(self):
+        if self._refine_id is not None:
+            self.canvas.after_cancel(self._refine_id)
+            self._refine_id = None
+
+    def _viewport_size(self):
+        return max(1, self.canvas.winfo_width()), max(1, self.canvas.winfo_height())
+
+    def _clamped_center(self, zoom, center):
+        """Centro efetivo: imagem menor que o painel fica centralizada; maior não deixa sobrar borda"""
+        center = center or (self.full_size[0] / 2, self.full_size[1] / 2)
+        clamped = []
+        for size, view, value in zip(self.full_size, self._viewport_size(), center):
+            half = view / 2 / zoom
+            clamped.append(size / 2 if size <= 2 * half else min(max(value, half), size - half))
+        return tuple(clamped)
+
+    def _origin(self, zoom):
+        """Posição (inteira) na tela do canto da imagem"""
+        center = self._clamped_center(zoom, self.state.center)
+        return tuple(int(round(view / 2 - value * zoom)) for view, value in zip(self._viewport_size(), center))
+
+    def _start_drag(self, event):
+        if self.image is not None:
+            self._drag = (event.x, event.y, self._clamped_center(self.zoom(), self.state.center))
+
+    def _drag_to(self, event):
+        if self._drag is None or self.image is None:
+            return
+        x, y, (center_x, center_y) = self._drag
+        zoom = self.zoom()
+        self.state.center = self._clamped_center(
+            zoom, (center_x - (event.x - x) / zoom, center_y - (event.y - y) / zoom))
+        self.state.changed(zoom)
+
+    def _zoom_at(self, event, zoom_in):
+        """Zoom mantendo sob o cursor o mesmo ponto da imagem"""
+        if self.image is None:
+            return
+        zoom = self.zoom()
+        new_zoom = min(self.MAX_ZOOM, zoom * self.ZOOM_STEP if zoom_in else zoom / self.ZOOM_STEP)
+        if new_zoom <= self.fit_zoom():
+            self.state.reset()
+            self.state.changed(self.fit_zoom())
+            return
+        origin_x, origin_y = self._origin(zoom)
+        point_x, point_y = (event.x - origin_x) / zoom, (event.y - origin_y) / zoom
+        view_width, view_height = self._viewport_size()
+        self.state.zoom = new_zoom
+        self.state.center = self._clamped_center(
+            new_zoom, (point_x + (view_width / 2 - event.x) / new_zoom,
+                       point_y + (view_height / 2 - event.y) / new_zoom))
+        self.state.changed(new_zoom)
+
+    def _fit(self, event=None):
+        if self.image is not None:
+            self.state.reset()
+            self.state.changed(self.fit_zoom())
@@ -1,4 +1,7 @@
 import tkinter as tk
+from models.operations import (ADJUSTMENTS_MENU, COLOR_MENU, COMMANDS, EDGES_MENU, SEGMENTATION_MENU,
+                               menu_commands)
+from models.profiler import profiler
 
 class MenuBar:
     def __init__(self, root, controller):
@@ -8,45 +11,51 @@ class MenuBar:
         # Menu Arquivo
         file_menu = tk.Menu(self.menubar, tearoff=0)
         file_menu.add_command(label="Abrir", command=controller.open_image)
+        file_menu.add_command(label="Próxima imagem da pasta", accelerator="Page Down",
+                              command=controller.open_next_image)
+        file_menu.add_command(label="Imagem anterior da pasta", accelerator="Page Up",
+                              command=controller.open_previous_image)
         file_menu.add_command(label="Salvar como...", command=controller.save_image)
         file_menu.add_separator()
+        file_menu.add_command(label="Exportar receita...", command=controller.export_recipe)
+        file_menu.add_command(label="Aplicar receita...", command=controller.apply_recipe)
+        file_menu.add_separator()
         file_menu.add_command(label="Sair", command=root.quit)
         self.menubar.add_cascade(label="Arquivo", menu=file_menu)
 
-        # Menu Conversão de Cores
-        color_menu = tk.Menu(self.menubar, tearoff=0)
-        color_menu.add_command(label="RGB → RGBA", command=controller.convert_to_rgba)
-        color_menu.add_command(label="RGB → CMYK", command=controller.convert_to_cmyk)
-        color_menu.add_command(label="RGB → HSV", command=controller.convert_to_hsv)
-        color_menu.add_command(label="RGB → LAB", command=controller.convert_to_lab)
-        color_menu.add_separator()
-        color_menu.add_command(label="Converter para tons de cinza", command=controller.convert_to_gray)
-        self.menubar.add_cascade(label="Conversão de Cores", menu=color_menu)
-
-        # Menu Ajustes
-        adjustments_menu = tk.Menu(self.menubar, tearoff=0)
-        adjustments_menu.add_command(label="Ajustar Brilho", command=controller.show_brightness_dialog)
-        adjustments_menu.add_command(label="Ajustar Contraste", command=controller.show_contrast_dialog)
-        adjustments_menu.add_command(label="Brilho e Contraste", command=controller.show_brightness_contrast_dialog)
-        adjustments_menu.add_separator()
-        adjustments_menu.add_command(label="Equalizar Histograma", command=controller.apply_equalization)
-        self.menubar.add_cascade(label="Ajustes", menu=adjustments_menu)
+        # Menu Editar
+        edit_menu = tk.Menu(self.menubar, tearoff=0)
+        edit_menu.add_command(label="Desfazer", accelerator="Ctrl+Z", command=controller.undo)
+        edit_menu.add_command(label="Refazer", accelerator="Ctrl+Y", command=controller.redo)
+        self.menubar.add_cascade(label="Editar", menu=edit_menu)
 
-        # Menu Segmentação
-        segmentation_menu = tk.Menu(self.menubar, tearoff=0)
-        segmentation_menu.add_command(label="Limiarização Binária", command=controller.show_binary_threshold_dialog)
-        segmentation_menu.add_command(label="Limiarização Otsu", command=controller.apply_otsu_threshold)
-        segmentation_menu.add_command(label="Limiarização Adaptativa (Média)", command=controller.apply_adaptive_threshold_mean)
-        segmentation_menu.add_command(label="Limiarização Adaptativa (Gaussiana)", command=controller.apply_adaptive_threshold_gaussian)
-        self.menubar.add_cascade(label="Segmentação", menu=segmentation_menu)
+        # Menu Desempenho
+        performance_menu = tk.Menu(self.menubar, tearoff=0)
+        self.profiling_var = tk.BooleanVar(value=profiler.enabled)
+        performance_menu.add_checkbutton(label="Medir tempos das ações", variable=self.profiling_var,
+                                         command=lambda: controller.set_profiling(self.profiling_var.get()))
+        performance_menu.add_command(label="Resumo dos tempos", command=controller.show_profile_summary)
+        performance_menu.add_command(label="Exportar trace (Chrome)...", command=controller.export_profile_trace)
+        performance_menu.add_command(label="Limpar medições", command=controller.clear_profile)
+        self.menubar.add_cascade(label="Desempenho", menu=performance_menu)
 
-        # Menu Detecção de Bordas
-        edges_menu = tk.Menu(self.menubar, tearoff=0)
-        edges_menu.add_command(label="Aplicar Detecção (Sobel)", command=controller.show_sobel_dialog)
-        self.menubar.add_cascade(label="Detecção de Bordas", menu=edges_menu)
+        # Menus das operações, montados a partir do registro (models.operations)
+        self.operation_menus = {}
+        for menu in (COLOR_MENU, ADJUSTMENTS_MENU, SEGMENTATION_MENU, EDGES_MENU):
+            self.operation_menus[menu] = self._add_command_menu(menu, menu_commands(menu))
+        adjustments_menu = self.operation_menus[ADJUSTMENTS_MENU]
+        adjustments_menu.add_separator()
+        adjustments_menu.add_command(label="Aplicar prévias em resolução total", command=controller.commit_preview)
 
         # Menu Filtros (mantido para compatibilidade)
-        filter_menu = tk.Menu(self.menubar, tearoff=0)
-        filter_menu.add_command(label="Converter para tons de cinza", command=controller.convert_to_gray)
-        filter_menu.add_command(label="Equalizar histograma", command=controller.apply_equalization)
-        self.menubar.add_cascade(label="Filtros", menu=filter_menu)
+        self._add_command_menu("Filtros", [COMMANDS['gray'], COMMANDS['equalize']])
+
+    def _add_command_menu(self, label, commands):
+        menu = tk.Menu(self.menubar, tearoff=0)
+        for command in commands:
+            # Sem separador no topo (ex.: Filtros começa por um comando que tem separador)
+            if command.separator and menu.index("end") is not None:
+                menu.add_separator()
+            menu.add_command(label=command.label, command=lambda key=command.key: self.controller.run_command(key))
+        self.menubar.add_cascade(label=label, menu=menu)
+        return menu
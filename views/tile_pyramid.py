@@ -0,0 +1,111 @@
+import math
+from collections import OrderedDict
+
+from models.profiler import profiler
+
+
+class TilePyramid:
+    """Pirâmide multirresolução de uma imagem, dividida em blocos e construída sob demanda.
+
+    O nível 0 é a própria imagem; cada nível seguinte tem metade da largura
+    e da altura do anterior (média de 2x2 pixels, caminho rápido do
+    INTER_AREA). Um nível só é calculado na primeira vez que é pedido, a
+    partir do nível imediatamente abaixo. Não usa Tk.
+    """
+
+    def __init__(self, image, tile_size=256):
+        self.image = image
+        self.tile_size = tile_size
+        self._levels = [image]
+        # Último nível: o primeiro que cabe em um bloco
+        height, width = image.shape[:2]
+        self.max_level = 0
+        while max(width, height) > tile_size and min(width, height) >= 2:
+            width, height = width // 2, height // 2
+            self.max_level += 1
+
+    def level(self, index):
+        """Imagem do nível ``index`` (0 = resolução cheia), calculada na primeira chamada"""
+        index = max(0, min(index, self.max_level))
+        while len(self._levels) <= index:
+            # OpenCV só é necessário quando há imagem (fora da abertura da janela)
+            import cv2
+            previous = self._levels[-1]
+            height, width = previous.shape[0] // 2, previous.shape[1] // 2
+            # Descarta a última linha/coluna ímpar para a redução ser exatamente 2x
+            with profiler.span('resize', 'pirâmide', level=len(self._levels)):
+                self._levels.append(cv2.resize(previous[:height * 2, :width * 2], (width, height),
+                                               interpolation=cv2.INTER_AREA))
+        return self._levels[index]
+
+    def level_for_scale(self, scale):
+        """Nível mais reduzido que ainda tem ao menos um pixel por pixel de tela na escala ``scale``"""
+        if scale >= 1.0:
+            return 0
+        return max(0, min(self.max_level, int(math.floor(math.log2(1.0 / scale)))))
+
+    def tile(self, index, column, row):
+        """Bloco (coluna, linha) do nível ``index``; os da borda podem ser menores"""
+        size = self.tile_size
+        return self.level(index)[row * size:(row + 1) * size, column * size:(column + 1) * size]
+
+    def visible_tiles(self, index, scale, origin, viewport):
+        """Blocos do nível ``index`` que aparecem no viewport.
+
+        ``scale`` são pixels de tela por pixel do nível e ``origin`` a
+        posição (inteira) na tela do canto do nível. Retorna
+        (coluna, linha, x, y, largura, altura) na tela; as bordas são
+        arredondadas a partir do canto do nível, então os blocos encostam
+        sem frestas e o tamanho de cada um não depende da posição.
+        """
+        level = self.level(index)
+        height, width = level.shape[:2]
+        size = self.tile_size
+        left, top = origin
+        view_width, view_height = viewport
+        columns = range(max(0, int(-left / scale) // size),
+                        min(math.ceil(width / size), int((view_width - left) / scale) // size + 1))
+        rows = range(max(0, int(-top / scale) // size),
+                     min(math.ceil(height / size), int((view_height - top) / scale) // size + 1))
+        tiles = []
+        for row in rows:
+            y0 = round(row * size * scale)
+            y1 = round(min((row + 1) * size, height) * scale)
+            for column in columns:
+                x0 = round(column * size * scale)
+                x1 = round(min((column + 1) * size, width) * scale)
+                if x1 > x0 and y1 > y0:
+                    tiles.append((column, row, left + x0, top + y0, x1 - x0, y1 - y0))
+        return tiles
+
+
+class TileCache:
+    """LRU de blocos já renderizados, limitado em número de blocos"""
+
+    def __init__(self, max_tiles=512):
+        self.max_tiles = max_tiles
+        self._tiles = OrderedDict()
+
+    def get(self, key):
+        tile = self._tiles.get(key)
+        if tile is not None:
+            self._tiles.move_to_end(key)
+        return tile
+
+    def put(self, key, tile):
+        """Guarda o bloco; retorna os que saíram do cache (para reaproveitamento)"""
+        self._tiles[key] = tile
+        self._tiles.move_to_end(key)
+        evicted = []
+        while len(self._tiles) > self.max_tiles:
+            evicted.append(self._tiles.popitem(last=False)[1])
+        return evicted
+
+    def clear(self):
+        """Esvazia o cache; retorna os blocos que estavam nele"""
+        tiles = list(self._tiles.values())
+        self._tiles.clear()
+        return tiles
+
+    def __len__(self):
+        return len(self._tiles)